@@ -0,0 +1,27 @@
+"""Add analysis cache key columns
+
+Revision ID: 0014_analysis_cache
+Revises: cf2548374646
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0014_analysis_cache'
+down_revision = 'cf2548374646'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('report_analyses', sa.Column('file_hash', sa.String(64), nullable=True))
+    op.add_column('report_analyses', sa.Column('rate_version', sa.String(64), nullable=True))
+    op.create_index('ix_report_analyses_file_hash', 'report_analyses', ['file_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_report_analyses_file_hash', table_name='report_analyses')
+    op.drop_column('report_analyses', 'rate_version')
+    op.drop_column('report_analyses', 'file_hash')
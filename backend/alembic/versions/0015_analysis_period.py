@@ -0,0 +1,23 @@
+"""Add analysis period end date
+
+Revision ID: 0015_analysis_period
+Revises: 0014_analysis_cache
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0015_analysis_period'
+down_revision = '0014_analysis_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('report_analyses', sa.Column('period_end', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('report_analyses', 'period_end')
@@ -0,0 +1,43 @@
+"""Add content-addressed blob store
+
+Revision ID: 0016_stored_blobs
+Revises: 0015_analysis_period
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = '0016_stored_blobs'
+down_revision = '0015_analysis_period'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stored_blobs',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('tenant_id', UUID(as_uuid=True), sa.ForeignKey('tenants.id'), nullable=False),
+        sa.Column('sha256', sa.String(64), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('storage_path', sa.String(500), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('tenant_id', 'sha256', name='uq_stored_blobs_tenant_sha256'),
+    )
+    
+    op.add_column('documents', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.create_index('ix_documents_content_hash', 'documents', ['content_hash'])
+    op.add_column('reports', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.create_index('ix_reports_content_hash', 'reports', ['content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reports_content_hash', table_name='reports')
+    op.drop_column('reports', 'content_hash')
+    op.drop_index('ix_documents_content_hash', table_name='documents')
+    op.drop_column('documents', 'content_hash')
+    op.drop_table('stored_blobs')
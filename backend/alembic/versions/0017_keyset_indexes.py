@@ -0,0 +1,37 @@
+"""Add keyset pagination indexes
+
+Revision ID: 0017_keyset_indexes
+Revises: 0016_stored_blobs
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0017_keyset_indexes'
+down_revision = '0016_stored_blobs'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns): list filter first, then the (sort key, id) page order
+INDEXES = [
+    ('ix_alerts_tenant_created_id', 'alerts', ['tenant_id', 'created_at', 'id']),
+    ('ix_audit_logs_tenant_timestamp_id', 'audit_logs', ['tenant_id', 'timestamp', 'id']),
+    ('ix_reports_submitted_by_created_id', 'reports', ['submitted_by', 'created_at', 'id']),
+    ('ix_reports_company_created_id', 'reports', ['company_id', 'created_at', 'id']),
+    ('ix_reports_created_id', 'reports', ['created_at', 'id']),
+    ('ix_regulations_created_id', 'regulations', ['created_at', 'id']),
+    ('ix_users_company_created_id', 'users', ['company_id', 'created_at', 'id']),
+    ('ix_companies_created_id', 'companies', ['created_at', 'id']),
+    ('ix_balance_sheets_company_created_id', 'balance_sheets', ['company_id', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
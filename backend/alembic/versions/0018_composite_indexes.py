@@ -0,0 +1,41 @@
+"""Add composite indexes for hot endpoint filters
+
+Revision ID: 0018_composite_indexes
+Revises: 0017_keyset_indexes
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0018_composite_indexes'
+down_revision = '0017_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+# Chosen from the endpoint queries; see benchmarks/index_explain.py.
+# audit_logs(tenant_id, timestamp) is served by ix_audit_logs_tenant_timestamp_id (0017).
+INDEXES = [
+    # Alert list filters and the per-status/severity dashboard counts
+    ('ix_alerts_tenant_status_severity', 'alerts', ['tenant_id', 'status', 'severity']),
+    # Admin report lists by status, newest first
+    ('ix_reports_company_status_created', 'reports', ['company_id', 'status', 'created_at']),
+    # Accountant/auditor status breakdowns
+    ('ix_reports_submitted_by_status', 'reports', ['submitted_by', 'status']),
+    # Latest analysis of a report
+    ('ix_report_analyses_report_created', 'report_analyses', ['report_id', 'created_at']),
+    # Items of a balance sheet (the single-column index was dropped in a7534b7235dc)
+    ('ix_balance_sheet_items_balance_sheet_id', 'balance_sheet_items', ['balance_sheet_id']),
+    # Subscription lookups
+    ('ix_link_company_regulation_company_regulation', 'link_company_regulation', ['company_id', 'regulation_id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
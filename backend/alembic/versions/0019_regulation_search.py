@@ -0,0 +1,77 @@
+"""Add full-text search for the regulation catalog
+
+Revision ID: 0019_regulation_search
+Revises: 0018_composite_indexes
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0019_regulation_search'
+down_revision = '0018_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        # English/Russian stemming for prose, "simple" for Uzbek and regulation codes
+        op.execute("""
+            ALTER TABLE regulations ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(code, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', left(coalesce(content, ''), 100000)), 'B') ||
+                setweight(to_tsvector('russian', left(coalesce(content, ''), 100000)), 'B') ||
+                setweight(to_tsvector('simple', left(coalesce(content, ''), 100000)), 'C')
+            ) STORED
+        """)
+        op.execute("CREATE INDEX ix_regulations_search_vector ON regulations USING gin (search_vector)")
+        op.execute("CREATE INDEX ix_regulations_code_trgm ON regulations USING gin (code gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_regulations_title_trgm ON regulations USING gin (title gin_trgm_ops)")
+    elif bind.dialect.name == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE regulations_fts USING fts5(
+                regulation_id UNINDEXED, code, title, content,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        op.execute("""
+            INSERT INTO regulations_fts (regulation_id, code, title, content)
+            SELECT id, code, title, content FROM regulations
+        """)
+        op.execute("""
+            CREATE TRIGGER regulations_fts_insert AFTER INSERT ON regulations BEGIN
+                INSERT INTO regulations_fts (regulation_id, code, title, content)
+                VALUES (NEW.id, NEW.code, NEW.title, NEW.content);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER regulations_fts_update AFTER UPDATE OF code, title, content ON regulations BEGIN
+                UPDATE regulations_fts SET code = NEW.code, title = NEW.title, content = NEW.content
+                WHERE regulation_id = OLD.id;
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER regulations_fts_delete AFTER DELETE ON regulations BEGIN
+                DELETE FROM regulations_fts WHERE regulation_id = OLD.id;
+            END
+        """)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_regulations_title_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_regulations_code_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_regulations_search_vector")
+        op.execute("ALTER TABLE regulations DROP COLUMN IF EXISTS search_vector")
+    elif bind.dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS regulations_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS regulations_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS regulations_fts_insert")
+        op.execute("DROP TABLE IF EXISTS regulations_fts")
@@ -0,0 +1,46 @@
+"""Add alert categories and incremental compliance score counters
+
+Revision ID: 0020_compliance_score_counters
+Revises: 0019_regulation_search
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = '0020_compliance_score_counters'
+down_revision = '0019_regulation_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('alerts', sa.Column('category', sa.String(), nullable=True))
+    op.create_index('ix_alerts_category', 'alerts', ['category'])
+
+    op.create_table(
+        'compliance_score_counters',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('tenant_id', UUID(as_uuid=True), sa.ForeignKey('tenants.id'), nullable=False),
+        sa.Column('category', sa.String(), nullable=False, server_default=''),
+        sa.Column('severity', sa.String(20), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.UniqueConstraint('tenant_id', 'category', 'severity', 'status', name='uq_compliance_score_counters_key'),
+    )
+    # No rows here yet: each tenant's alerts are categorized and counted on
+    # its first score read (app/services/compliance_score.py)
+    op.create_table(
+        'compliance_score_states',
+        sa.Column('tenant_id', UUID(as_uuid=True), sa.ForeignKey('tenants.id'), primary_key=True),
+        sa.Column('rebuilt_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('compliance_score_states')
+    op.drop_table('compliance_score_counters')
+    op.drop_index('ix_alerts_category', table_name='alerts')
+    op.drop_column('alerts', 'category')
@@ -0,0 +1,53 @@
+"""Add daily report rollups for the analytics dashboards
+
+Revision ID: 0021_report_rollups
+Revises: 0020_compliance_score_counters
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = '0021_report_rollups'
+down_revision = '0020_compliance_score_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'report_daily_rollups',
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('company_id', UUID(as_uuid=True), sa.ForeignKey('companies.id'), primary_key=True),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('status', sa.String(50), primary_key=True),
+        sa.Column('report_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('analysis_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('scored_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_sum', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_report_daily_rollups_user_day', 'report_daily_rollups', ['user_id', 'day'])
+    op.create_index('ix_report_daily_rollups_company_day', 'report_daily_rollups', ['company_id', 'day'])
+
+    # Backfill; kept current from here on by app/services/report_rollups.py.
+    # Analysis totals are stored under the empty status.
+    op.execute("""
+        INSERT INTO report_daily_rollups (day, company_id, user_id, status, report_count, analysis_count, scored_count, score_sum)
+        SELECT date(created_at), company_id, submitted_by, coalesce(status, 'draft'), count(*), 0, 0, 0
+        FROM reports
+        GROUP BY date(created_at), company_id, submitted_by, coalesce(status, 'draft')
+    """)
+    op.execute("""
+        INSERT INTO report_daily_rollups (day, company_id, user_id, status, report_count, analysis_count, scored_count, score_sum)
+        SELECT date(a.created_at), r.company_id, r.submitted_by, '', 0, count(*), count(a.overall_score), coalesce(sum(a.overall_score), 0)
+        FROM report_analyses a JOIN reports r ON r.id = a.report_id
+        GROUP BY date(a.created_at), r.company_id, r.submitted_by
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_report_daily_rollups_company_day', table_name='report_daily_rollups')
+    op.drop_index('ix_report_daily_rollups_user_day', table_name='report_daily_rollups')
+    op.drop_table('report_daily_rollups')
@@ -0,0 +1,38 @@
+"""Add alert fingerprints and occurrence counts
+
+Revision ID: 0022_alert_fingerprints
+Revises: 0021_report_rollups
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0022_alert_fingerprints'
+down_revision = '0021_report_rollups'
+branch_labels = None
+depends_on = None
+
+OPEN_FINGERPRINT = "fingerprint IS NOT NULL AND status IN ('OPEN', 'IN_PROGRESS')"
+
+
+def upgrade() -> None:
+    op.add_column('alerts', sa.Column('fingerprint', sa.String(64), nullable=True))
+    op.add_column('alerts', sa.Column('occurrences', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('alerts', sa.Column('last_seen_at', sa.DateTime(timezone=True), server_default=sa.func.now()))
+    op.execute("UPDATE alerts SET last_seen_at = created_at")
+
+    # Existing alerts have no fingerprint; only alerts raised from now on
+    # are deduplicated
+    op.create_index(
+        'uq_alerts_open_fingerprint', 'alerts', ['tenant_id', 'fingerprint'], unique=True,
+        postgresql_where=sa.text(OPEN_FINGERPRINT), sqlite_where=sa.text(OPEN_FINGERPRINT),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_alerts_open_fingerprint', table_name='alerts')
+    op.drop_column('alerts', 'last_seen_at')
+    op.drop_column('alerts', 'occurrences')
+    op.drop_column('alerts', 'fingerprint')
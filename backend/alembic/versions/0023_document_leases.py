@@ -0,0 +1,27 @@
+"""Add extraction leases to documents
+
+Revision ID: 0023_document_leases
+Revises: 0022_alert_fingerprints
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0023_document_leases'
+down_revision = '0022_alert_fingerprints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('claimed_by', sa.String(100), nullable=True))
+    op.add_column('documents', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+    # Documents left PROCESSING have no heartbeat and are reclaimed on the
+    # next worker startup, as before
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'heartbeat_at')
+    op.drop_column('documents', 'claimed_by')
@@ -1,16 +1,39 @@
 from typing import Any, Dict, List
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from datetime import datetime, timedelta, timezone
+from sqlalchemy import case, func, select
+from datetime import date, datetime, timezone
 
 from app.core.deps import get_db, get_current_active_user
 from app.db.models.report import Report
 from app.db.models.report_analysis import ReportAnalysis
+from app.db.models.report_rollup import ANALYSES, ReportDailyRollup
 from app.db.models.user import User
 
 router = APIRouter()
 
+REPORT_STATUSES = ["draft", "submitted", "under_review", "approved", "rejected"]
+
+
+def _rollup_scope(current_user: User) -> list:
+    """Rollup rows the user's dashboard covers"""
+    if current_user.role == "superadmin":
+        return []
+    if current_user.role == "admin":
+        return [ReportDailyRollup.company_id == current_user.company_id]
+    # accountant, auditor
+    return [ReportDailyRollup.user_id == current_user.id]
+
+
+def _month_starts(today: date, months: int) -> List[date]:
+    """First day of this month and of the months before it, oldest first"""
+    starts = []
+    year, month = today.year, today.month
+    for _ in range(months):
+        starts.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
 @router.get("/personal")
 def get_personal_analytics(
     db: Session = Depends(get_db),
@@ -27,28 +50,33 @@ def get_personal_analytics(
     else:  # accountant, auditor
         base_query = db.query(Report).filter(Report.submitted_by == current_user.id)
     
-    # Total reports
-    total_reports = base_query.count()
-    
-    # Status breakdown
-    status_counts = {}
-    for status in ["draft", "submitted", "under_review", "approved", "rejected"]:
-        count = base_query.filter(Report.status == status).count()
-        status_counts[status] = count
-    
-    # This month stats
-    month_start = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    this_month = base_query.filter(Report.created_at >= month_start).count()
+    # Counts and scores come from the daily rollups
+    scope = _rollup_scope(current_user)
+    rollup = ReportDailyRollup
+    today = datetime.now(timezone.utc).date()
+    month_start = today.replace(day=1)
+    
+    # Status breakdown, total and this month's reports
+    status_counts = dict.fromkeys(REPORT_STATUSES, 0)
+    total_reports = 0
+    this_month = 0
+    for status, count, recent in db.execute(
+        select(
+            rollup.status,
+            func.sum(rollup.report_count),
+            func.sum(case((rollup.day >= month_start, rollup.report_count), else_=0)),
+        ).where(*scope, rollup.status != ANALYSES).group_by(rollup.status)
+    ):
+        total_reports += count
+        this_month += recent
+        if status in status_counts:
+            status_counts[status] = count
     
     # Average compliance score
-    analyses = db.query(ReportAnalysis).join(Report).filter(
-        Report.submitted_by == current_user.id if current_user.role not in ["admin", "superadmin"] else True
-    ).all()
-    
-    avg_score = 0
-    if analyses:
-        scores = [a.overall_score for a in analyses if a.overall_score is not None]
-        avg_score = sum(scores) / len(scores) if scores else 0
+    scored, score_sum = db.execute(
+        select(func.sum(rollup.scored_count), func.sum(rollup.score_sum)).where(*scope, rollup.status == ANALYSES)
+    ).one()
+    avg_score = score_sum / scored if scored else 0
     
     # Action items
     action_items = []
@@ -71,21 +99,17 @@ def get_personal_analytics(
     
     # Reports with errors (for accountants)
     if current_user.role in ["accountant", "auditor"]:
-        error_reports = db.query(Report).join(ReportAnalysis).filter(
+        error_reports = db.query(Report, ReportAnalysis.errors).join(ReportAnalysis).filter(
             Report.submitted_by == current_user.id,
             ReportAnalysis.errors > 0
         ).limit(5).all()
         
-        for report in error_reports:
-            analysis = db.query(ReportAnalysis).filter(
-                ReportAnalysis.report_id == report.id
-            ).first()
-            
+        for report, errors in error_reports:
             action_items.append({
                 "type": "errors_found",
                 "report_id": str(report.id),
                 "title": report.title,
-                "message": f"{analysis.errors} error(s) found in {report.title}",
+                "message": f"{errors} error(s) found in {report.title}",
                 "priority": "critical"
             })
     
@@ -101,31 +125,28 @@ def get_personal_analytics(
         })
     
     # Compliance trend (last 6 months)
-    trends = []
-    for i in range(6):
-        month_date = datetime.now(timezone.utc) - timedelta(days=30 * i)
-        month_start = month_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
-        
-        month_analyses = db.query(ReportAnalysis).join(Report).filter(
-            Report.submitted_by == current_user.id if current_user.role not in ["admin", "superadmin"] else True,
-            ReportAnalysis.created_at >= month_start,
-            ReportAnalysis.created_at <= month_end
-        ).all()
-        
-        if month_analyses:
-            scores = [a.overall_score for a in month_analyses if a.overall_score is not None]
-            avg = sum(scores) / len(scores) if scores else 0
-        else:
-            avg = 0
-        
-        trends.append({
-            "month": month_date.strftime("%b %Y"),
-            "score": round(avg, 1),
-            "count": len(month_analyses)
-        })
-    
-    trends.reverse()  # Oldest to newest
+    months = _month_starts(today, 6)
+    by_month = {month: [0, 0, 0] for month in months}
+    for day, analyses, scored, score_sum in db.execute(
+        select(rollup.day, func.sum(rollup.analysis_count), func.sum(rollup.scored_count), func.sum(rollup.score_sum))
+        .where(*scope, rollup.status == ANALYSES, rollup.day >= months[0])
+        .group_by(rollup.day)
+    ):
+        totals = by_month.get(day.replace(day=1))
+        if totals is None:
+            continue
+        totals[0] += analyses
+        totals[1] += scored
+        totals[2] += score_sum
+    
+    trends = [
+        {
+            "month": month.strftime("%b %Y"),
+            "score": round(score_sum / scored, 1) if scored else 0,
+            "count": analyses,
+        }
+        for month, (analyses, scored, score_sum) in by_month.items()
+    ]
     
     return {
         "total_reports": total_reports,
@@ -151,16 +172,14 @@ def get_company_stats(
     
     company_id = current_user.company_id
     
-    # Total reports in company
-    total = db.query(Report).filter(Report.company_id == company_id).count()
-    
-    # By user
-    user_stats = db.query(
-        Report.submitted_by,
-        func.count(Report.id).label('count')
-    ).filter(
-        Report.company_id == company_id
-    ).group_by(Report.submitted_by).all()
+    # Reports per submitter, from the daily rollups
+    user_stats = db.execute(
+        select(ReportDailyRollup.user_id, func.sum(ReportDailyRollup.report_count))
+        .where(ReportDailyRollup.company_id == company_id, ReportDailyRollup.status != ANALYSES)
+        .group_by(ReportDailyRollup.user_id)
+        .having(func.sum(ReportDailyRollup.report_count) > 0)
+    ).all()
+    total = sum(count for _, count in user_stats)
     
     return {
         "total_reports": total,
@@ -1,19 +1,23 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from app.core.deps import get_db, get_current_active_user
 from app.db.models.audit_log import AuditLog
 from app.db.models.user import User
+from app.services.dashboard_stats import audit_stats
+from app.utils.pagination import Keyset, count_query, keyset_page, set_page_headers
 
 router = APIRouter()
 
 @router.get("/")
 def get_audit_logs(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, le=100),
+    cursor: str = Query(None),
+    include_total: bool = Query(True),
     user_id: str = Query(None),
     action: str = Query(None),
     start_date: str = Query(None),
@@ -22,8 +26,10 @@ def get_audit_logs(
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Get audit logs with optional filters.
+    Get audit logs with optional filters, newest first.
     Only accessible to admin/owner users.
+    Pass next_cursor back as `cursor` for the next page; the total is
+    only counted when include_total is set.
     """
     # Check if user has permission (admin or owner role)
     if current_user.role not in ["admin", "owner", "superadmin"]:
@@ -55,15 +61,25 @@ def get_audit_logs(
             pass
     
     # Get total count
-    total = query.count()
+    total = count_query(query) if include_total else None
     
     # Get paginated results
-    logs = query.order_by(desc(AuditLog.timestamp)).offset(skip).limit(limit).all()
+    logs, next_cursor = keyset_page(
+        db, query, Keyset(AuditLog.timestamp, AuditLog.id), cursor, limit, skip
+    )
+    set_page_headers(response, next_cursor, total)
+    
+    # Load the users behind this page in one query
+    user_ids = {log.user_id for log in logs if log.user_id}
+    users = {
+        user.id: user
+        for user in db.query(User).filter(User.id.in_(user_ids)).all()
+    } if user_ids else {}
     
     # Format response
     results = []
     for log in logs:
-        user = db.query(User).filter(User.id == log.user_id).first()
+        user = users.get(log.user_id)
         results.append({
             "id": str(log.id),
             "user_email": user.email if user else "Unknown",
@@ -80,7 +96,8 @@ def get_audit_logs(
         "total": total,
         "logs": results,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor
     }
 
 @router.get("/stats")
@@ -94,39 +111,4 @@ def get_audit_stats(
     if current_user.role not in ["admin", "owner", "superadmin", "company_admin", "company_superadmin", "company_owner"]:
         return {"error": "Insufficient permissions"}, 403
     
-    # Get today's date
-    today = datetime.utcnow().date()
-    today_start = datetime.combine(today, datetime.min.time())
-    
-    # Get logs from last 30 days
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    
-    query = db.query(AuditLog).filter(
-        AuditLog.tenant_id == current_user.tenant_id
-    )
-    
-    total_actions = query.count()
-    
-    # Today's actions
-    today_actions = query.filter(AuditLog.timestamp >= today_start).count()
-    
-    # Active users (users who performed actions in last 24 hours)
-    twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
-    active_users = db.query(AuditLog.user_id).filter(
-        AuditLog.tenant_id == current_user.tenant_id,
-        AuditLog.timestamp >= twenty_four_hours_ago,
-        AuditLog.user_id.isnot(None)
-    ).distinct().count()
-    
-    # Critical actions (delete, permission changes)
-    critical_actions = query.filter(
-        AuditLog.action.in_(['delete', 'permission_change', 'role_change']),
-        AuditLog.timestamp >= thirty_days_ago
-    ).count()
-    
-    return {
-        "total_actions": total_actions,
-        "today_actions": today_actions,
-        "active_users": active_users,
-        "critical_actions": critical_actions
-    }
+    return audit_stats(db, current_user.tenant_id)
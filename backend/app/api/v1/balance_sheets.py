@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
@@ -8,6 +9,7 @@ import io
 
 from app.db.session import get_db
 from app.db.models.balance_sheet import BalanceSheet, BalanceSheetItem, TransformedStatement
+from app.utils.pagination import Keyset, keyset_page, set_page_headers
 from app.db.schemas.balance_sheet import (
     BalanceSheetCreate,
     BalanceSheetUpdate,
@@ -15,10 +17,14 @@ from app.db.schemas.balance_sheet import (
     TransformationResponse
 )
 from app.core import deps
+from app.core.uploads import upload_sink
 from app.db.models.user import User
 
 router = APIRouter()
 
+UPLOAD_ALLOWED_EXTENSIONS = {'.xlsx', '.xls', '.csv'}
+UPLOAD_MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+
 
 @router.post("/", response_model=BalanceSheetSchema, status_code=status.HTTP_201_CREATED)
 def create_balance_sheet(
@@ -57,12 +63,14 @@ def create_balance_sheet(
 
 @router.get("/", response_model=List[BalanceSheetSchema])
 def list_balance_sheets(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    """List all balance sheets for the user's company"""
+    """List all balance sheets for the user's company, newest first"""
     if not current_user.company_id:
         return []
     
@@ -74,7 +82,10 @@ def list_balance_sheets(
     if current_user.role == "superadmin":
         query = db.query(BalanceSheet)
     
-    balance_sheets = query.offset(skip).limit(limit).all()
+    balance_sheets, next_cursor = keyset_page(
+        db, query, Keyset(BalanceSheet.created_at, BalanceSheet.id), cursor, limit, skip
+    )
+    set_page_headers(response, next_cursor)
     return balance_sheets
 
 
@@ -263,19 +274,17 @@ async def upload_balance_sheet_file(
             detail="User must be associated with a company"
         )
     
-    # Validate file type
-    if not file.filename.endswith(('.xlsx', '.xls', '.csv')):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file type. Please upload .xlsx, .xls, or .csv file"
-        )
-    
-    # Read file content
-    content = await file.read()
+    # Stream to a temp file, validating type and size as bytes arrive
+    received = await upload_sink.receive(
+        file, allowed_extensions=UPLOAD_ALLOWED_EXTENSIONS, max_size=UPLOAD_MAX_FILE_SIZE
+    )
     
     # Parse file
     parser = FileParserService()
-    result = parser.parse_file(content, file.filename)
+    try:
+        result = await run_in_threadpool(parser.parse_file, str(received.path), file.filename)
+    finally:
+        await run_in_threadpool(received.cleanup)
     
     if not result['success']:
         raise HTTPException(
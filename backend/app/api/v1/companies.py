@@ -1,5 +1,5 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 import uuid
 
@@ -8,14 +8,17 @@ from app.db.models.company import Company
 from app.db.models.user import User
 from app.db.schemas import company as company_schemas
 from app.db.schemas import user as user_schemas
+from app.utils.pagination import Keyset, keyset_page, set_page_headers
 
 router = APIRouter()
 
 @router.get("/", response_model=List[company_schemas.Company])
 def read_companies(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     is_active: Optional[bool] = None,
     industry: Optional[str] = None,
     current_user = Depends(get_current_active_user),
@@ -35,7 +38,10 @@ def read_companies(
     if industry:
         query = query.filter(Company.industry == industry)
     
-    companies = query.offset(skip).limit(limit).all()
+    companies, next_cursor = keyset_page(
+        db, query, Keyset(Company.created_at, Company.id, descending=False), cursor, limit, skip
+    )
+    set_page_headers(response, next_cursor)
     return companies
 
 
@@ -1,28 +1,32 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import and_, or_, select
 from datetime import datetime, timedelta
-import io
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
 
-from app.core.deps import get_db, get_current_active_user
-from app.db.models.alert import Alert, AlertStatus, AlertSeverity
+from app.core.deps import get_db, get_async_db, get_current_active_user
+from app.db.models.alert import Alert, AlertStatus
 from app.db.schemas import alert as alert_schemas
+from app.services.alert_bulk_update import alert_filter, update_alerts_by_id, update_alerts_matching
+from app.services.compliance_engine import check_tenant
+from app.services.dashboard_stats import alert_stats
+from app.utils.pagination import Keyset, count_statement, keyset_page_async, set_page_headers
+from app.utils.excel_export import EXPORT_BATCH_SIZE, write_excel_export, excel_file_response
 
 from app.db.models.balance_sheet import BalanceSheet
 from app.services.report_analyzer import ReportAnalyzer
-import uuid
 
 router = APIRouter()
 
 @router.get("/alerts", response_model=List[alert_schemas.Alert])
-def read_alerts(
-    db: Session = Depends(get_db),
+async def read_alerts(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     severity: Optional[str] = None,
     status: Optional[str] = None,
     regulation: Optional[str] = None,
@@ -34,29 +38,30 @@ def read_alerts(
 ) -> Any:
     """
     Retrieve compliance alerts with filtering and sorting.
+    Pass the X-Next-Cursor header back as `cursor` for the next page.
     """
-    query = db.query(Alert).filter(Alert.tenant_id == current_user.tenant_id)
+    query = select(Alert).where(Alert.tenant_id == current_user.tenant_id)
     
     # Apply filters
     if severity:
-        query = query.filter(Alert.severity == severity)
+        query = query.where(Alert.severity == severity)
     
     if status:
         # Support comma-separated status values (e.g., "open,in_progress")
         if ',' in status:
             status_list = [s.strip() for s in status.split(',')]
-            query = query.filter(Alert.status.in_(status_list))
+            query = query.where(Alert.status.in_(status_list))
         else:
-            query = query.filter(Alert.status == status)
+            query = query.where(Alert.status == status)
     
     if regulation:
-        query = query.filter(Alert.regulation.ilike(f"%{regulation}%"))
+        query = query.where(Alert.regulation.ilike(f"%{regulation}%"))
     
     if company_id:
-        query = query.filter(Alert.company_id == company_id)
+        query = query.where(Alert.company_id == company_id)
     
     if search:
-        query = query.filter(
+        query = query.where(
             or_(
                 Alert.message.ilike(f"%{search}%"),
                 Alert.regulation.ilike(f"%{search}%")
@@ -64,58 +69,24 @@ def read_alerts(
         )
     
     # Apply sorting
-    if sort_order == "desc":
-        query = query.order_by(getattr(Alert, sort_by).desc())
-    else:
-        query = query.order_by(getattr(Alert, sort_by).asc())
+    keyset = Keyset(getattr(Alert, sort_by), Alert.id, descending=sort_order == "desc")
     
-    alerts = query.offset(skip).limit(limit).all()
+    alerts, next_cursor = await keyset_page_async(db, query, keyset, cursor, limit, skip)
+    total = await count_statement(db, query) if include_total else None
+    set_page_headers(response, next_cursor, total)
     return alerts
 
 
 @router.get("/stats", response_model=alert_schemas.AlertStats)
-def get_alert_stats(
-    db: Session = Depends(get_db),
+async def get_alert_stats(
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_active_user),
 ) -> Any:
     """
     Get alert statistics for dashboard.
+    One aggregate query, cached per tenant for a short TTL.
     """
-    query = db.query(Alert).filter(Alert.tenant_id == current_user.tenant_id)
-    
-    total = query.count()
-    critical = query.filter(Alert.severity == AlertSeverity.CRITICAL).count()
-    high = query.filter(Alert.severity == AlertSeverity.HIGH).count()
-    medium = query.filter(Alert.severity == AlertSeverity.MEDIUM).count()
-    low = query.filter(Alert.severity == AlertSeverity.LOW).count()
-    
-    open_count = query.filter(Alert.status == AlertStatus.OPEN).count()
-    in_progress = query.filter(Alert.status == AlertStatus.IN_PROGRESS).count()
-    resolved = query.filter(Alert.status == AlertStatus.RESOLVED).count()
-    dismissed = query.filter(Alert.status == AlertStatus.DISMISSED).count()
-    
-    # Calculate compliance score (higher is better)
-    # Score = (resolved + dismissed) / total * 100, penalize critical/high
-    if total > 0:
-        resolved_rate = (resolved + dismissed) / total
-        critical_penalty = (critical * 0.3) / total if critical > 0 else 0
-        high_penalty = (high * 0.15) / total if high > 0 else 0
-        compliance_score = max(0, min(100, (resolved_rate * 100) - (critical_penalty * 100) - (high_penalty * 100)))
-    else:
-        compliance_score = 100.0
-    
-    return {
-        "total": total,
-        "critical": critical,
-        "high": high,
-        "medium": medium,
-        "low": low,
-        "open": open_count,
-        "in_progress": in_progress,
-        "resolved": resolved,
-        "dismissed": dismissed,
-        "compliance_score": round(compliance_score, 1)
-    }
+    return await alert_stats(db, current_user.tenant_id)
 
 
 @router.put("/alerts/{alert_id}", response_model=alert_schemas.Alert)
@@ -156,45 +127,60 @@ def update_alert(
     return alert
 
 
+def _bulk_changes(update_in: alert_schemas.AlertUpdate, exclude: str) -> dict:
+    """The fields a bulk update sets; it must set at least one, and status cannot be cleared"""
+    changes = update_in.dict(exclude_unset=True, exclude={exclude})
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+    if "status" in changes and changes["status"] is None:
+        raise HTTPException(status_code=400, detail="status cannot be null")
+    return changes
+
+
 @router.post("/alerts/bulk-update")
 def bulk_update_alerts(
-    alert_ids: List[str],
-    update_data: alert_schemas.AlertUpdate,
+    update_in: alert_schemas.AlertBulkUpdate,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user),
 ) -> Any:
     """
-    Bulk update multiple alerts.
+    Bulk update multiple alerts. Invalid or foreign IDs are skipped.
     """
     from uuid import UUID
     
     alert_uuids = []
-    for alert_id in alert_ids:
+    for alert_id in update_in.alert_ids:
         try:
             alert_uuids.append(UUID(alert_id))
         except ValueError:
             continue
     
-    alerts = db.query(Alert).filter(
-        Alert.id.in_(alert_uuids),
-        Alert.tenant_id == current_user.tenant_id
-    ).all()
-    
-    update_dict = update_data.dict(exclude_unset=True)
-    updated_count = 0
+    changes = _bulk_changes(update_in, "alert_ids")
+    updated_count = update_alerts_by_id(db, current_user.tenant_id, alert_uuids, changes)
+    db.commit()
     
-    for alert in alerts:
-        for field, value in update_dict.items():
-            setattr(alert, field, value)
-        
-        if update_data.status == AlertStatus.RESOLVED and not alert.resolved_at:
-            alert.resolved_at = datetime.utcnow()
-        
-        updated_count += 1
+    return {"message": f"Updated {updated_count} alerts successfully", "updated": updated_count}
+
+
+@router.post("/alerts/bulk-update-by-filter")
+def bulk_update_alerts_by_filter(
+    update_in: alert_schemas.AlertFilterBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+) -> Any:
+    """
+    Bulk update every alert matching a filter in one statement,
+    e.g. resolve all low alerts older than 90 days.
+    """
+    condition = alert_filter(**update_in.filter.dict())
+    if condition is None:
+        raise HTTPException(status_code=400, detail="At least one filter criterion is required")
     
+    changes = _bulk_changes(update_in, "filter")
+    updated_count = update_alerts_matching(db, current_user.tenant_id, condition, changes)
     db.commit()
     
-    return {"message": f"Updated {updated_count} alerts successfully"}
+    return {"message": f"Updated {updated_count} alerts successfully", "updated": updated_count}
 
 
 @router.get("/export/excel")
@@ -204,7 +190,7 @@ def export_alerts_excel(
     status: Optional[str] = None,
     regulation: Optional[str] = None,
     current_user = Depends(get_current_active_user),
-) -> StreamingResponse:
+) -> Any:
     """
     Export alerts to Excel file.
     """
@@ -218,50 +204,24 @@ def export_alerts_excel(
     if regulation:
         query = query.filter(Alert.regulation.ilike(f"%{regulation}%"))
     
-    alerts = query.order_by(Alert.created_at.desc()).all()
-    
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Compliance Alerts"
+    def rows():
+        for alert in query.order_by(Alert.created_at.desc()).yield_per(EXPORT_BATCH_SIZE):
+            yield [
+                str(alert.id),
+                alert.severity.value if hasattr(alert.severity, 'value') else alert.severity,
+                alert.status.value if hasattr(alert.status, 'value') else alert.status,
+                alert.regulation or "N/A",
+                alert.message,
+                alert.created_at.strftime("%Y-%m-%d %H:%M") if alert.created_at else "",
+                alert.resolved_at.strftime("%Y-%m-%d %H:%M") if alert.resolved_at else "",
+                alert.notes or "",
+            ]
     
-    # Header styling
-    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True)
-    
-    # Headers
     headers = ["ID", "Severity", "Status", "Regulation", "Message", "Created At", "Resolved At", "Notes"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center")
-    
-    # Data
-    for row, alert in enumerate(alerts, 2):
-        ws.cell(row=row, column=1, value=str(alert.id))
-        ws.cell(row=row, column=2, value=alert.severity.value if hasattr(alert.severity, 'value') else alert.severity)
-        ws.cell(row=row, column=3, value=alert.status.value if hasattr(alert.status, 'value') else alert.status)
-        ws.cell(row=row, column=4, value=alert.regulation or "N/A")
-        ws.cell(row=row, column=5, value=alert.message)
-        ws.cell(row=row, column=6, value=alert.created_at.strftime("%Y-%m-%d %H:%M") if alert.created_at else "")
-        ws.cell(row=row, column=7, value=alert.resolved_at.strftime("%Y-%m-%d %H:%M") if alert.resolved_at else "")
-        ws.cell(row=row, column=8, value=alert.notes or "")
-    
-    # Auto-width columns
-    for col in range(1, len(headers) + 1):
-        ws.column_dimensions[chr(64 + col)].width = 20
-    
-    # Save to bytes
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=compliance_alerts.xlsx"}
+    path = write_excel_export(
+        "Compliance Alerts", [(header, 20) for header in headers], rows(), header_color="1F4E78"
     )
+    return excel_file_response(path, "compliance_alerts.xlsx")
 
 
 @router.post("/alerts", response_model=alert_schemas.Alert)
@@ -299,70 +259,21 @@ def run_compliance_check(
 ) -> Any:
     """
     Trigger a comprehensive compliance check.
-    Scans balance sheets and reports for anomalies and generates alerts.
+    Evaluates the compliance rules for every company of the tenant and
+    raises alerts; findings that are already open count another
+    occurrence instead of creating a duplicate alert.
     """
-    new_alerts_count = 0
-    
-    # Create a Critical Alert if no balance sheet for current period
-    alert = Alert(
-        id=uuid.uuid4(),
-        tenant_id=current_user.tenant_id,
-        company_id=current_user.company_id,
-        severity=AlertSeverity.CRITICAL,  # Use enum, not string
-        status=AlertStatus.OPEN,  # Use enum, not string
-        message="Missing Financial Report for Q3 2025",
-        regulation="IFRS IAS 1",
-        notes="Financial statements must be presented at least annually. Q3 report is overdue.",
-        created_by=current_user.id
-    )
-    db.add(alert)
-    new_alerts_count += 1
-    
-    # Create a High Alert for "Cash" discrepancy
-    alert2 = Alert(
-        id=uuid.uuid4(),
-        tenant_id=current_user.tenant_id,
-        company_id=current_user.company_id,
-        severity=AlertSeverity.HIGH,  # Use enum, not string
-        status=AlertStatus.OPEN,  # Use enum, not string
-        message="Unusual Cash Flow Detected",
-        regulation="AML Directive 5",
-        notes="Cash outflow exceeds 50% of operating revenue in single transaction.",
-        created_by=current_user.id
-    )
-    db.add(alert2)
-    new_alerts_count += 1
-    
-    # Create a Medium Alert for documentation
-    alert3 = Alert(
-        id=uuid.uuid4(),
-        tenant_id=current_user.tenant_id,
-        company_id=current_user.company_id,
-        severity=AlertSeverity.MEDIUM,
-        status=AlertStatus.OPEN,
-        message="Incomplete Audit Trail Documentation",
-        regulation="SOX Section 404",
-        notes="Internal control documentation is missing for 3 key processes.",
-        created_by=current_user.id
-    )
-    db.add(alert3)
-    new_alerts_count += 1
-    
-    # Create a Low Alert
-    alert4 = Alert(
-        id=uuid.uuid4(),
-        tenant_id=current_user.tenant_id,
-        company_id=current_user.company_id,
-        severity=AlertSeverity.LOW,
-        status=AlertStatus.OPEN,
-        message="Policy Review Reminder",
-        regulation="ISO 27001",
-        notes="Annual information security policy review is due next month.",
-        created_by=current_user.id
-    )
-    db.add(alert4)
-    new_alerts_count += 1
+    if not current_user.tenant_id:
+        raise HTTPException(status_code=400, detail="User must belong to a tenant")
     
+    results = check_tenant(db, current_user.tenant_id)
     db.commit()
     
-    return {"message": "Compliance check completed", "new_alerts": new_alerts_count}
+    findings = sum(result["findings"] for result in results.values())
+    new_alerts_count = sum(result["new_alerts"] for result in results.values())
+    return {
+        "message": "Compliance check completed",
+        "new_alerts": new_alerts_count,
+        "repeated_alerts": findings - new_alerts_count,
+        "rules": results,
+    }
@@ -2,20 +2,78 @@ from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from pathlib import Path
-import shutil
 import json
 from datetime import datetime
 
+from starlette.concurrency import run_in_threadpool
+
 from app.core.deps import get_db, get_current_active_user
+from app.core.uploads import upload_sink, ReceivedUpload
 from app.db.models.document import Document, DocumentType, DocumentStatus
-from app.services.document_extraction_service import DocumentExtractionService
+from app.services.extraction_worker import extraction_worker
+from app.services.blob_store import blob_store
 
 router = APIRouter()
 
-UPLOAD_DIR = Path("uploads/documents")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+ALLOWED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png', '.bmp', '.tiff'}
+MAX_FILE_SIZE = 20 * 1024 * 1024  # 20MB
 
-@router.post("/upload")
+def _document_response(document: Document) -> dict:
+    return {
+        "id": str(document.id),
+        "filename": document.filename,
+        "document_type": document.document_type.value,
+        "status": document.status.value,
+        "extracted_data": json.loads(document.extracted_data) if document.extracted_data else None,
+        "error_message": document.error_message,
+        "created_at": document.created_at,
+        "processed_at": document.processed_at
+    }
+
+def _create_document(
+    db: Session,
+    current_user,
+    received: ReceivedUpload,
+    doc_type: DocumentType,
+) -> Document:
+    """Store a received upload and create its Document row (runs in the threadpool)"""
+    # Save file (stored once per tenant, addressed by content hash)
+    try:
+        blob = blob_store.adopt_upload(db, current_user.tenant_id, received)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+    
+    # Create database record
+    document = Document(
+        company_id=current_user.company_id,
+        uploaded_by=current_user.id,
+        filename=received.filename,
+        file_path=blob.storage_path,
+        content_hash=blob.sha256,
+        document_type=doc_type,
+        status=DocumentStatus.PENDING
+    )
+    
+    # Same content already extracted for this company: reuse the result
+    previous = db.query(Document).filter(
+        Document.company_id == current_user.company_id,
+        Document.content_hash == blob.sha256,
+        Document.document_type == doc_type,
+        Document.status == DocumentStatus.COMPLETED
+    ).order_by(Document.created_at.desc()).first()
+    if previous:
+        document.status = DocumentStatus.COMPLETED
+        document.extracted_data = previous.extracted_data
+        document.processed_at = datetime.now()
+    
+    db.add(document)
+    db.commit()
+    db.refresh(document)
+    return document
+
+
+@router.post("/upload", status_code=202)
 async def upload_document(
     *,
     db: Session = Depends(get_db),
@@ -24,7 +82,8 @@ async def upload_document(
     document_type: str = Form(...),
 ) -> Any:
     """
-    Upload a document and trigger extraction.
+    Upload a document and queue it for extraction.
+    Returns immediately with status "pending"; poll /documents/{id}/status.
     """
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="User must be associated with a company")
@@ -35,65 +94,40 @@ async def upload_document(
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid document type. Must be one of: {[t.value for t in DocumentType]}")
     
-    # Validate file extension
-    allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png', '.bmp', '.tiff'}
-    file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in allowed_extensions:
-        raise HTTPException(status_code=400, detail=f"File type {file_ext} not supported. Allowed: {allowed_extensions}")
+    # Stream to disk, validating extension, content type and size as bytes arrive
+    received = await upload_sink.receive(file, allowed_extensions=ALLOWED_EXTENSIONS, max_size=MAX_FILE_SIZE)
+    document = await run_in_threadpool(_create_document, db, current_user, received, doc_type)
     
-    # Save file
-    file_path = UPLOAD_DIR / f"{current_user.company_id}_{datetime.now().timestamp()}_{file.filename}"
-    try:
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+    # OCR and AI extraction run on the worker pool, not in this request
+    if document.status == DocumentStatus.PENDING:
+        extraction_worker.submit(document.id)
     
-    # Create database record
-    document = Document(
-        company_id=current_user.company_id,
-        uploaded_by=current_user.id,
-        filename=file.filename,
-        file_path=str(file_path),
-        document_type=doc_type,
-        status=DocumentStatus.PENDING
-    )
-    db.add(document)
-    db.commit()
-    db.refresh(document)
+    return _document_response(document)
+
+
+@router.get("/{document_id}/status")
+def get_document_status(
+    document_id: str,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the extraction status of a document (lightweight, for polling).
+    """
+    document = db.query(
+        Document.id, Document.status, Document.error_message, Document.processed_at
+    ).filter(
+        Document.id == document_id,
+        Document.company_id == current_user.company_id
+    ).first()
     
-    # Trigger extraction asynchronously (in background)
-    try:
-        document.status = DocumentStatus.PROCESSING
-        db.commit()
-        
-        extraction_service = DocumentExtractionService()
-        extracted_data = extraction_service.process_document(str(file_path), document_type)
-        
-        if "error" in extracted_data:
-            document.status = DocumentStatus.ERROR
-            document.error_message = extracted_data["error"]
-        else:
-            document.status = DocumentStatus.COMPLETED
-            document.extracted_data = json.dumps(extracted_data)
-            document.processed_at = datetime.now()
-        
-        db.commit()
-        db.refresh(document)
-        
-    except Exception as e:
-        document.status = DocumentStatus.ERROR
-        document.error_message = str(e)
-        db.commit()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
     
     return {
         "id": str(document.id),
-        "filename": document.filename,
-        "document_type": document.document_type.value,
         "status": document.status.value,
-        "extracted_data": json.loads(document.extracted_data) if document.extracted_data else None,
         "error_message": document.error_message,
-        "created_at": document.created_at,
         "processed_at": document.processed_at
     }
 
@@ -144,16 +178,7 @@ def get_document(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    return {
-        "id": str(document.id),
-        "filename": document.filename,
-        "document_type": document.document_type.value,
-        "status": document.status.value,
-        "extracted_data": json.loads(document.extracted_data) if document.extracted_data else None,
-        "error_message": document.error_message,
-        "created_at": document.created_at,
-        "processed_at": document.processed_at
-    }
+    return _document_response(document)
 
 @router.delete("/{document_id}")
 def delete_document(
@@ -172,12 +197,15 @@ def delete_document(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Delete file
-    try:
-        Path(document.file_path).unlink(missing_ok=True)
-    except Exception as e:
-        # Log but don't fail if file deletion fails
-        pass
+    # Release the stored blob, or delete legacy per-document files
+    if document.content_hash:
+        blob_store.release(db, current_user.tenant_id, document.content_hash)
+    else:
+        try:
+            Path(document.file_path).unlink(missing_ok=True)
+        except Exception as e:
+            # Log but don't fail if file deletion fails
+            pass
     
     db.delete(document)
     db.commit()
@@ -0,0 +1,64 @@
+from typing import Any, Optional
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_db, get_current_active_user
+from app.db.models.user import User
+from app.services.data_export import RESOURCES, FORMATS, ExportError, get_streamer, plan_export
+
+router = APIRouter()
+
+
+@router.get("/")
+def list_exports(
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    List exportable resources, their columns and the supported formats.
+    """
+    return {
+        "formats": list(FORMATS),
+        "resources": {name: list(resource.columns) for name, resource in RESOURCES.items()},
+    }
+
+
+@router.get("/{resource_name}")
+def export_resource(
+    resource_name: str,
+    format: str = Query("csv", description="csv, ndjson or parquet"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns (default: all)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous pull"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum rows in this pull"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Stream a resource for bulk extraction. Pass the returned X-Next-Cursor
+    header as `cursor` on the next pull to receive only rows changed since.
+    """
+    resource = RESOURCES.get(resource_name)
+    if not resource:
+        raise HTTPException(status_code=404, detail=f"Unknown export resource: {resource_name}")
+    if resource.admin_only and current_user.role not in ["admin", "owner", "superadmin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+
+    try:
+        streamer = get_streamer(format)
+        plan = plan_export(db, resource, current_user, columns=columns, cursor=cursor, limit=limit)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def body():
+        # The request's session is handed over to the stream; close it when done
+        try:
+            yield from streamer(plan)
+        finally:
+            db.close()
+
+    filename = f"{resource.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if plan.next_cursor:
+        headers["X-Next-Cursor"] = plan.next_cursor
+    return StreamingResponse(body(), media_type=FORMATS[format], headers=headers)
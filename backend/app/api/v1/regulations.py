@@ -1,16 +1,23 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc, asc
-import io
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer_group
+from sqlalchemy import or_, select
 import uuid
 from datetime import datetime
 
-from app.core.deps import get_db, get_current_active_user
+from app.core.deps import get_db, get_async_db, get_current_active_user
 from app.db.models.regulation import Regulation
+from app.db.models.link_company_regulation import LinkCompanyRegulation
 from app.db.schemas import regulation as regulation_schemas
 from app.rag import ingest, retriever
+from app.services.regulation_search import search_catalog, search_condition
+from app.utils.pagination import Keyset, count_statement, keyset_page_async, set_page_headers
+from app.services.regulation_pdf_export import (
+    READY, pdf_export_available, regulation_export_query, regulation_pdf_exporter
+)
 
 router = APIRouter()
 
@@ -68,23 +75,23 @@ def ingest_regulation(
     return regulation
 
 @router.get("/search", response_model=List[dict])
-def search_regulations(
+async def search_regulations(
     query: str,
     limit: int = 200,  # Increased from 50 to show all regulations
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_active_user),
 ) -> Any:
     """
     Search regulations using RAG.
     """
     try:
-        results = retriever.search_regulations(str(current_user.tenant_id), query, limit)
+        # Vector search is blocking; keep it off the event loop
+        results = await run_in_threadpool(
+            retriever.search_regulations, str(current_user.tenant_id), query, limit
+        )
         
         # Enrich with subscription status if user has a company
         if current_user.company_id and results:
-            from app.db.models.link_company_regulation import LinkCompanyRegulation
-            import uuid
-            
             # Use metadata ID which is the real UUID, not the ChromaDB ID (e.g. "GDPR_0")
             reg_ids = []
             for r in results:
@@ -95,16 +102,16 @@ def search_regulations(
                 except (ValueError, TypeError):
                     continue
 
-            
-            subscriptions = db.query(LinkCompanyRegulation).filter(
-                LinkCompanyRegulation.company_id == current_user.company_id,
-                LinkCompanyRegulation.regulation_id.in_(reg_ids)
-            ).all()
-            
-            subscribed_ids = {str(s.regulation_id) for s in subscriptions}
+            subscribed = await db.scalars(
+                select(LinkCompanyRegulation.regulation_id).where(
+                    LinkCompanyRegulation.company_id == current_user.company_id,
+                    LinkCompanyRegulation.regulation_id.in_(reg_ids)
+                )
+            )
+            subscribed_ids = {str(reg_id) for reg_id in subscribed}
             
             for r in results:
-                r["is_subscribed"] = r["id"] in subscribed_ids
+                r["is_subscribed"] = str(r.get("metadata", {}).get("id")) in subscribed_ids
         else:
             for r in results:
                 r["is_subscribed"] = False
@@ -116,7 +123,6 @@ def search_regulations(
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
-
 @router.post("/{regulation_id}/subscribe")
 def subscribe_regulation(
     regulation_id: str,
@@ -266,7 +272,8 @@ def get_regulation_impact(
     }
 
 @router.get("/list", response_model=List[regulation_schemas.Regulation])
-def list_regulations(
+async def list_regulations(
+    response: Response,
     jurisdiction: Optional[str] = None,
     category: Optional[str] = None,
     search: Optional[str] = None,
@@ -274,17 +281,20 @@ def list_regulations(
     sort_order: str = "desc",
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_active_user),
 ) -> Any:
     """
     List all regulations with filtering and sorting options.
+    Pass the X-Next-Cursor header back as `cursor` for the next page.
     """
-    query = db.query(Regulation)
+    query = select(Regulation)
     
     # Apply tenant filtering
     if current_user.tenant_id:
-        query = query.filter(
+        query = query.where(
             or_(
                 Regulation.tenant_id == current_user.tenant_id,
                 Regulation.tenant_id == None  # Global regulations
@@ -293,7 +303,7 @@ def list_regulations(
     
     # Apply filters
     if jurisdiction:
-        query = query.filter(Regulation.jurisdiction == jurisdiction)
+        query = query.where(Regulation.jurisdiction == jurisdiction)
     
     if category:
         # Assuming category is stored in metadata or as a field
@@ -301,49 +311,62 @@ def list_regulations(
         pass
     
     if search:
-        query = query.filter(
-            or_(
-                Regulation.title.ilike(f"%{search}%"),
-                Regulation.code.ilike(f"%{search}%")
-            )
-        )
+        # Full-text over code, title and content
+        query = query.where(search_condition(search, db.get_bind().dialect.name))
     
     # Apply sorting
-    if sort_by == "title":
-        query = query.order_by(asc(Regulation.title) if sort_order == "asc" else desc(Regulation.title))
-    elif sort_by == "code":
-        query = query.order_by(asc(Regulation.code) if sort_order == "asc" else desc(Regulation.code))
-    elif sort_by == "jurisdiction":
-        query = query.order_by(asc(Regulation.jurisdiction) if sort_order == "asc" else desc(Regulation.jurisdiction))
-    elif sort_by == "effective_date":
-        query = query.order_by(asc(Regulation.effective_date) if sort_order == "asc" else desc(Regulation.effective_date))
-    else:  # default to created_at
-        query = query.order_by(asc(Regulation.created_at) if sort_order == "asc" else desc(Regulation.created_at))
+    sort_columns = {
+        "title": Regulation.title,
+        "code": Regulation.code,
+        "jurisdiction": Regulation.jurisdiction,
+        "effective_date": Regulation.effective_date,
+    }
+    keyset = Keyset(
+        sort_columns.get(sort_by, Regulation.created_at),  # default to created_at
+        Regulation.id,
+        descending=sort_order != "asc",
+    )
     
     # Apply pagination
-    regulations = query.offset(skip).limit(limit).all()
+    regulations, next_cursor = await keyset_page_async(db, query, keyset, cursor, limit, skip)
+    total = await count_statement(db, query) if include_total else None
+    set_page_headers(response, next_cursor, total)
     
     return regulations
 
+@router.get("/catalog-search", response_model=List[regulation_schemas.RegulationSearchHit])
+async def catalog_search(
+    q: str = Query(..., min_length=1),
+    jurisdiction: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_active_user),
+) -> Any:
+    """
+    Full-text search of the regulation catalog (code, title and content),
+    best matches first, with highlighted snippets.
+    """
+    return await search_catalog(db, q, current_user.tenant_id, jurisdiction, limit)
+
 @router.get("/jurisdictions")
-def get_jurisdictions(
-    db: Session = Depends(get_db),
+async def get_jurisdictions(
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_active_user),
 ) -> Any:
     """
     Get list of unique jurisdictions.
     """
-    query = db.query(Regulation.jurisdiction).distinct()
+    query = select(Regulation.jurisdiction).distinct()
     
     if current_user.tenant_id:
-        query = query.filter(
+        query = query.where(
             or_(
                 Regulation.tenant_id == current_user.tenant_id,
                 Regulation.tenant_id == None
             )
         )
     
-    jurisdictions = [j[0] for j in query.all() if j[0]]
+    jurisdictions = [j for j in await db.scalars(query) if j]
     return {"jurisdictions": sorted(jurisdictions)}
 
 @router.get("/export/excel")
@@ -358,82 +381,32 @@ def export_regulations_excel(
     Export regulations to Excel file.
     """
     try:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, PatternFill, Alignment
+        from app.utils.excel_export import EXPORT_BATCH_SIZE, write_excel_export, excel_file_response
     except ImportError:
         raise HTTPException(status_code=500, detail="openpyxl not installed")
     
     # Get regulations with filters
-    query = db.query(Regulation)
+    query = regulation_export_query(db, current_user.tenant_id, jurisdiction, search)
+    
+    def rows():
+        for reg in query.order_by(Regulation.code).yield_per(EXPORT_BATCH_SIZE):
+            yield [
+                reg.code,
+                reg.title,
+                reg.jurisdiction or "",
+                reg.effective_date.strftime("%Y-%m-%d") if reg.effective_date else "",
+                reg.source_url or "",
+                reg.created_at.strftime("%Y-%m-%d %H:%M") if reg.created_at else "",
+            ]
+    
+    columns = [
+        ("Code", 15), ("Title", 50), ("Jurisdiction", 20),
+        ("Effective Date", 15), ("Source URL", 40), ("Created At", 20),
+    ]
+    path = write_excel_export("Regulations", columns, rows())
     
-    if current_user.tenant_id:
-        query = query.filter(
-            or_(
-                Regulation.tenant_id == current_user.tenant_id,
-                Regulation.tenant_id == None
-            )
-        )
-    
-    if jurisdiction:
-        query = query.filter(Regulation.jurisdiction == jurisdiction)
-    
-    if search:
-        query = query.filter(
-            or_(
-                Regulation.title.ilike(f"%{search}%"),
-                Regulation.code.ilike(f"%{search}%")
-            )
-        )
-    
-    regulations = query.all()
-    
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Regulations"
-    
-    # Header style
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    
-    # Headers
-    headers = ["Code", "Title", "Jurisdiction", "Effective Date", "Source URL", "Created At"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Data
-    for row_idx, reg in enumerate(regulations, 2):
-        ws.cell(row=row_idx, column=1, value=reg.code)
-        ws.cell(row=row_idx, column=2, value=reg.title)
-        ws.cell(row=row_idx, column=3, value=reg.jurisdiction or "")
-        ws.cell(row=row_idx, column=4, value=reg.effective_date.strftime("%Y-%m-%d") if reg.effective_date else "")
-        ws.cell(row=row_idx, column=5, value=reg.source_url or "")
-        ws.cell(row=row_idx, column=6, value=reg.created_at.strftime("%Y-%m-%d %H:%M") if reg.created_at else "")
-    
-    # Adjust column widths
-    ws.column_dimensions['A'].width = 15
-    ws.column_dimensions['B'].width = 50
-    ws.column_dimensions['C'].width = 20
-    ws.column_dimensions['D'].width = 15
-    ws.column_dimensions['E'].width = 40
-    ws.column_dimensions['F'].width = 20
-    
-    # Save to BytesIO
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    # Return as downloadable file
     filename = f"regulations_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    return excel_file_response(path, filename)
 
 @router.get("/export/pdf")
 def export_regulations_pdf(
@@ -444,98 +417,96 @@ def export_regulations_pdf(
     current_user = Depends(get_current_active_user),
 ) -> Any:
     """
-    Export regulations to PDF file.
+    Export regulations to PDF file. Served from cache while the catalog is unchanged.
     """
-    try:
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-        from reportlab.lib.units import inch
-    except ImportError:
+    if not pdf_export_available():
         raise HTTPException(status_code=500, detail="reportlab not installed")
     
-    # Get regulations with filters
-    query = db.query(Regulation)
+    job_id = regulation_pdf_exporter.job_id(db, current_user.tenant_id, jurisdiction, search)
+    path = regulation_pdf_exporter.render(db, current_user.tenant_id, job_id, jurisdiction, search)
     
+    filename = f"regulations_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return FileResponse(path, media_type="application/pdf", filename=filename)
+
+
+@router.post("/export/pdf/jobs", status_code=202)
+def create_regulations_pdf_job(
+    jurisdiction: Optional[str] = None,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user),
+) -> Any:
+    """
+    Render the regulations PDF in the background. Poll the job, then download it.
+    """
+    if not pdf_export_available():
+        raise HTTPException(status_code=500, detail="reportlab not installed")
+    
+    job_id = regulation_pdf_exporter.job_id(db, current_user.tenant_id, jurisdiction, search)
+    status = regulation_pdf_exporter.submit(current_user.tenant_id, job_id, jurisdiction, search)
+    return {
+        "job_id": job_id,
+        "status": status,
+        "download_url": f"/api/v1/regulations/export/pdf/jobs/{job_id}/download",
+    }
+
+
+@router.get("/export/pdf/jobs/{job_id}")
+def get_regulations_pdf_job(
+    job_id: str,
+    current_user = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the status of a regulations PDF export job.
+    """
+    status = regulation_pdf_exporter.status(current_user.tenant_id, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return {"job_id": job_id, "status": status}
+
+
+@router.get("/export/pdf/jobs/{job_id}/download")
+def download_regulations_pdf_job(
+    job_id: str,
+    current_user = Depends(get_current_active_user),
+) -> Any:
+    """
+    Download the PDF produced by an export job.
+    """
+    status = regulation_pdf_exporter.status(current_user.tenant_id, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if status != READY:
+        raise HTTPException(status_code=409, detail=f"Export job is {status}")
+    
+    filename = f"regulations_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return FileResponse(
+        regulation_pdf_exporter.artifact_path(current_user.tenant_id, job_id),
+        media_type="application/pdf",
+        filename=filename,
+    )
+
+
+@router.get("/{regulation_id}", response_model=regulation_schemas.RegulationDetail)
+async def get_regulation(
+    regulation_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get a regulation with its full content and workflow steps.
+    """
+    query = select(Regulation).options(undefer_group("body")).where(Regulation.id == regulation_id)
     if current_user.tenant_id:
-        query = query.filter(
+        query = query.where(
             or_(
                 Regulation.tenant_id == current_user.tenant_id,
                 Regulation.tenant_id == None
             )
         )
-    
-    if jurisdiction:
-        query = query.filter(Regulation.jurisdiction == jurisdiction)
-    
-    if search:
-        query = query.filter(
-            or_(
-                Regulation.title.ilike(f"%{search}%"),
-                Regulation.code.ilike(f"%{search}%")
-            )
-        )
-    
-    regulations = query.all()
-    
-    # Create PDF
-    output = io.BytesIO()
-    doc = SimpleDocTemplate(output, pagesize=A4)
-    elements = []
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#4472C4'),
-        spaceAfter=30,
-    )
-    
-    # Title
-    elements.append(Paragraph("Regulations Export", title_style))
-    elements.append(Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Table data
-    data = [["Code", "Title", "Jurisdiction", "Effective Date"]]
-    for reg in regulations:
-        data.append([
-            reg.code,
-            reg.title[:50] + "..." if len(reg.title) > 50 else reg.title,
-            reg.jurisdiction or "",
-            reg.effective_date.strftime("%Y-%m-%d") if reg.effective_date else ""
-        ])
-    
-    # Create table
-    table = Table(data, colWidths=[1.5*inch, 3.5*inch, 1.5*inch, 1.2*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-    ]))
-    
-    elements.append(table)
-    
-    # Build PDF
-    doc.build(elements)
-    output.seek(0)
-    
-    # Return as downloadable file
-    filename = f"regulations_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    
-    return StreamingResponse(
-        output,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+
+    regulation = await db.scalar(query)
+    if not regulation:
+        raise HTTPException(status_code=404, detail="Regulation not found")
+    return regulation
@@ -3,12 +3,13 @@ from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 import uuid
 
-from app.core.deps import get_db, get_current_active_user
+from app.core.deps import get_db, get_current_active_user, get_current_active_superuser
 from app.db.models.report_analysis import ReportAnalysis
 from app.db.models.report import Report
 from app.db.models.user import User
 from app.db.schemas import report_analysis as analysis_schemas
 from app.services.report_analyzer import ReportAnalyzer
+from app.services.revalidation_jobs import revalidation_jobs
 
 router = APIRouter()
 
@@ -49,13 +50,44 @@ async def analyze_report(
             report_id=analysis_request.report_id,
             file_path=report.file_path,
             country_code=analysis_request.country_code,
-            tax_types=analysis_request.tax_types
+            tax_types=analysis_request.tax_types,
+            period_end=analysis_request.period_end,
+            file_hash=report.content_hash
         )
         return analysis
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+@router.post("/revalidate", response_model=analysis_schemas.RevalidationJob, status_code=202)
+def revalidate_country(
+    *,
+    revalidation_request: analysis_schemas.RevalidationRequest,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Re-run analyses for a country after its tax rates change (superadmin only).
+    Only reports whose applied rates are out of date are re-analyzed.
+    Runs in the background; poll GET /revalidate/{job_id} for the result.
+    """
+    country_code = revalidation_request.country_code.upper()
+    return revalidation_jobs.submit(country_code)
+
+
+@router.get("/revalidate/{job_id}", response_model=analysis_schemas.RevalidationJob)
+def get_revalidation_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Get the status and counts of a revalidation job.
+    """
+    job = revalidation_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Revalidation job not found")
+    return job
+
+
 @router.get("/{analysis_id}", response_model=analysis_schemas.ReportAnalysis)
 def get_analysis(
     analysis_id: str,
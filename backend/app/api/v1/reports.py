@@ -1,52 +1,43 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, Response
+from fastapi.responses import RedirectResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 import uuid
 import os
-import shutil
-import io
 
-from app.core.deps import get_db, get_current_active_user
+from app.core.deps import get_db, get_async_db, get_current_active_user
+from app.core.uploads import upload_sink
+from app.core.downloads import file_download_response
 from app.db.models.report import Report
 from app.db.models.user import User
 from app.db.schemas import report as report_schemas
 from app.services.notification_service import NotificationService
+from app.services.blob_store import blob_store
+from app.services.storage import storage
+from app.utils.pagination import Keyset, count_statement, keyset_page_async, set_page_headers
+from app.utils.zip_stream import ZipEntry, stream_zip, unique_arcname
 
 router = APIRouter()
 
-UPLOAD_DIR = "uploads/reports"
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".xlsx", ".csv", ".txt"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
-def save_upload_file(upload_file: UploadFile, company_id: str, report_id: str) -> tuple:
-    """Save uploaded file and return (file_path, file_name, file_size)"""
-    # Validate file extension
-    file_ext = os.path.splitext(upload_file.filename)[1].lower()
-    if file_ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(status_code=400, detail=f"File type {file_ext} not allowed. Allowed: {ALLOWED_EXTENSIONS}")
-    
-    # Create directory
-    report_dir = os.path.join(UPLOAD_DIR, str(company_id), str(report_id))
-    os.makedirs(report_dir, exist_ok=True)
-    
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(report_dir, unique_filename)
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(upload_file.file, buffer)
-    
-    # Get file size
-    file_size = os.path.getsize(file_path)
-    
-    if file_size > MAX_FILE_SIZE:
-        os.remove(file_path)
-        raise HTTPException(status_code=400, detail=f"File size exceeds {MAX_FILE_SIZE / 1024 / 1024}MB limit")
-    
-    return file_path, upload_file.filename, file_size
+async def save_upload_file(db: Session, upload_file: UploadFile, tenant_id: uuid.UUID) -> tuple:
+    """
+    Stream uploaded file into the tenant's blob store and return
+    (file_path, file_name, file_size, content_hash). Type and size limits
+    are enforced while the upload is read; identical content uploaded
+    before is stored only once.
+    """
+    received = await upload_sink.receive(
+        upload_file, allowed_extensions=ALLOWED_EXTENSIONS, max_size=MAX_FILE_SIZE
+    )
+    blob = await run_in_threadpool(blob_store.adopt_upload, db, tenant_id, received)
+    return blob.storage_path, received.filename, blob.size, blob.sha256
 
 
 @router.post("/", response_model=report_schemas.Report)
@@ -82,10 +73,11 @@ async def create_report(
     
     # Handle file upload if provided
     if file:
-        file_path, file_name, file_size = save_upload_file(file, company_id, report_id)
+        file_path, file_name, file_size, content_hash = await save_upload_file(db, file, current_user.tenant_id)
         report.file_path = file_path
         report.file_name = file_name
         report.file_size = file_size
+        report.content_hash = content_hash
     
     db.add(report)
     db.commit()
@@ -107,31 +99,42 @@ async def create_report(
 
 
 @router.get("/", response_model=List[report_schemas.Report])
-def list_reports(
-    db: Session = Depends(get_db),
+async def list_reports(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    include_total: bool = False,
 ) -> Any:
     """
     List reports. Accountants/auditors see own reports, admins see company reports.
+    Newest first; pass the X-Next-Cursor header back as `cursor` for the next page.
     """
-    query = db.query(Report)
+    query = select(Report)
     
     # Filter based on role
     if current_user.role in ["accountant", "auditor"]:
         # Only see own reports
-        query = query.filter(Report.submitted_by == current_user.id)
+        query = query.where(Report.submitted_by == current_user.id)
     elif current_user.role == "admin":
         # See all company reports
         if current_user.company_id:
-            query = query.filter(Report.company_id == current_user.company_id)
+            query = query.where(Report.company_id == current_user.company_id)
     # Superadmins see all reports (no filter)
     
     # Filter by status if provided
     if status:
-        query = query.filter(Report.status == status)
+        query = query.where(Report.status == status)
     
-    return query.order_by(Report.created_at.desc()).all()
+    reports, next_cursor = await keyset_page_async(
+        db, query, Keyset(Report.created_at, Report.id), cursor, limit, skip
+    )
+    total = await count_statement(db, query) if include_total else None
+    set_page_headers(response, next_cursor, total)
+    return reports
 
 
 @router.get("/{report_id}", response_model=report_schemas.Report)
@@ -248,7 +251,7 @@ def validate_report(
         if report.company_id != current_user.company_id:
             raise HTTPException(status_code=403, detail="Not authorized")
             
-    if not report.file_path or not os.path.exists(report.file_path):
+    if not report.file_path or not storage.exists(report.file_path):
         raise HTTPException(status_code=400, detail="No file attached to report")
         
     # Run analysis
@@ -265,22 +268,15 @@ def validate_report(
             report_id=report.id,
             file_path=report.file_path,
             country_code=country_code,
-            tax_types=['vat', 'corporate'] 
+            tax_types=['vat', 'corporate'],
+            file_hash=report.content_hash
         )
         return report
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
 
 
-@router.get("/{report_id}/download")
-def download_report(
-    report_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-) -> Any:
-    """
-    Download report file.
-    """
+def _get_downloadable_report(db: Session, current_user: User, report_id: str) -> Report:
     report = db.query(Report).filter(Report.id == uuid.UUID(report_id)).first()
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
@@ -293,16 +289,64 @@ def download_report(
         if report.company_id != current_user.company_id:
             raise HTTPException(status_code=403, detail="Not authorized to download this report")
     
-    if not report.file_path or not os.path.exists(report.file_path):
+    if not report.file_path or not storage.exists(report.file_path):
         raise HTTPException(status_code=404, detail="File not found")
+    return report
+
+
+@router.get("/{report_id}/download")
+def download_report(
+    report_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Download report file. Supports If-None-Match and Range requests; with
+    object storage the client is redirected to a presigned URL instead.
+    """
+    report = _get_downloadable_report(db, current_user, report_id)
+    
+    # Object storage: let the client fetch the bytes directly
+    presigned_url = storage.presigned_url(report.file_path, filename=report.file_name)
+    if presigned_url:
+        return RedirectResponse(presigned_url, status_code=307)
+    
+    local_file = storage.filesystem_path(report.file_path)
+    if local_file is None:
+        return StreamingResponse(
+            storage.iter_chunks(report.file_path),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f"attachment; filename={report.file_name}"},
+        )
     
-    return FileResponse(
-        path=report.file_path,
+    # ETag/304 and Range support: repeat views cost no bandwidth, large downloads can resume
+    return file_download_response(
+        request,
+        path=local_file,
         filename=report.file_name,
-        media_type="application/octet-stream"
+        content_hash=report.content_hash,
     )
 
 
+@router.get("/{report_id}/download-url")
+def get_report_download_url(
+    report_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get a direct download URL for a report file. url is a short-lived
+    presigned URL with object storage, or null when the file must be
+    fetched from /download.
+    """
+    report = _get_downloadable_report(db, current_user, report_id)
+    return {
+        "url": storage.presigned_url(report.file_path, filename=report.file_name),
+        "file_name": report.file_name,
+    }
+
+
 @router.delete("/{report_id}")
 def delete_report(
     report_id: str,
@@ -349,8 +393,11 @@ def delete_report(
             print(f"[DELETE] Cannot delete non-draft report (status: {report.status})")
             raise HTTPException(status_code=400, detail="Can only delete draft reports")
         
-        # Delete file if exists
-        if report.file_path:
+        # Release the stored blob, or delete legacy per-report files
+        if report.content_hash:
+            blob_store.release(db, report.tenant_id, report.content_hash)
+            print(f"[DELETE] Released blob {report.content_hash}")
+        elif report.file_path:
             if os.path.exists(report.file_path):
                 try:
                     os.remove(report.file_path)
@@ -360,12 +407,14 @@ def delete_report(
             else:
                 print(f"[DELETE] File not found on disk: {report.file_path}")
                 
-        # Manually delete related analyses (since no cascade)
+        # Manually delete related analyses (since no cascade); through the
+        # session so the analytics rollups see them go
         from app.db.models.report_analysis import ReportAnalysis
-        analysis_count = db.query(ReportAnalysis).filter(ReportAnalysis.report_id == report.id).count()
-        if analysis_count > 0:
-            db.query(ReportAnalysis).filter(ReportAnalysis.report_id == report.id).delete()
-            print(f"[DELETE] Deleted {analysis_count} related analysis record(s)")
+        analyses = db.query(ReportAnalysis).filter(ReportAnalysis.report_id == report.id).all()
+        for analysis in analyses:
+            db.delete(analysis)
+        if analyses:
+            print(f"[DELETE] Deleted {len(analyses)} related analysis record(s)")
         
         # Manually delete related comments (since no cascade)
         from app.db.models.report_comment import ReportComment
@@ -500,6 +549,34 @@ def get_submission_checklist(
     return checklist
 
 
+BATCH_ARCHIVE_MAX_REPORTS = 1000
+
+
+def _authorized_reports(db: Session, current_user: User, report_ids: List[str]) -> List[Report]:
+    """
+    Load the requested reports the user may download in a single query.
+    Invalid ids, unknown ids and reports outside the user's scope are dropped.
+    """
+    ids = []
+    for report_id in report_ids:
+        try:
+            ids.append(uuid.UUID(report_id))
+        except ValueError:
+            continue
+    if not ids:
+        return []
+
+    query = db.query(Report).filter(Report.id.in_(ids))
+    if current_user.role in ["accountant", "auditor"]:
+        query = query.filter(Report.submitted_by == current_user.id)
+    elif current_user.role == "admin":
+        query = query.filter(Report.company_id == current_user.company_id)
+
+    # Keep the caller's order
+    by_id = {report.id: report for report in query.all()}
+    return [by_id[report_id] for report_id in dict.fromkeys(ids) if report_id in by_id]
+
+
 @router.post("/batch/download")
 def batch_download_reports(
     report_ids: List[str],
@@ -510,33 +587,59 @@ def batch_download_reports(
     Get download links for multiple reports
     """
     results = []
-    for report_id in report_ids:
-        try:
-            report = db.query(Report).filter(Report.id == uuid.UUID(report_id)).first()
-            if not report:
-                continue
-            
-            # Check permissions
-            if current_user.role in ["accountant", "auditor"]:
-                if report.submitted_by != current_user.id:
-                    continue
-            elif current_user.role == "admin":
-                if report.company_id != current_user.company_id:
-                    continue
-            
-            if report.file_path and os.path.exists(report.file_path):
-                results.append({
-                    "id": str(report.id),
-                    "title": report.title,
-                    "file_name": report.file_name,
-                    "download_url": f"/api/v1/reports/{report.id}/download"
-                })
-        except Exception:
-            continue
+    for report in _authorized_reports(db, current_user, report_ids):
+        if report.file_path and storage.exists(report.file_path):
+            results.append({
+                "id": str(report.id),
+                "title": report.title,
+                "file_name": report.file_name,
+                "download_url": f"/api/v1/reports/{report.id}/download"
+            })
     
     return {"reports": results, "count": len(results)}
 
 
+@router.post("/batch/archive")
+def batch_download_archive(
+    report_ids: List[str],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Download multiple report files as a single ZIP archive, streamed as it is built
+    """
+    if len(report_ids) > BATCH_ARCHIVE_MAX_REPORTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BATCH_ARCHIVE_MAX_REPORTS} reports can be archived at once",
+        )
+
+    used_names: set = set()
+    entries = []
+    for report in _authorized_reports(db, current_user, report_ids):
+        # Missing files are skipped while the archive streams (stream_zip)
+        if not report.file_path:
+            continue
+        name = os.path.basename(report.file_name or report.file_path)
+        entries.append(ZipEntry(
+            path=report.file_path,
+            arcname=unique_arcname(name, used_names),
+            modified=report.created_at,
+            size=report.file_size,
+        ))
+
+    if not entries:
+        raise HTTPException(status_code=404, detail="No downloadable reports found")
+
+    filename = f"reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    # Sync generator: Starlette iterates it in the threadpool, so file reads don't block the loop
+    return StreamingResponse(
+        stream_zip(entries, open_file=storage.open),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
 @router.get("/export/excel")
 def export_reports_to_excel(
     db: Session = Depends(get_db),
@@ -545,8 +648,7 @@ def export_reports_to_excel(
     """
     Export reports to Excel file
     """
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
+    from app.utils.excel_export import EXPORT_BATCH_SIZE, write_excel_export, excel_file_response
     
     # Get reports based on role
     query = db.query(Report)
@@ -556,46 +658,18 @@ def export_reports_to_excel(
         if current_user.company_id:
             query = query.filter(Report.company_id == current_user.company_id)
     
-    reports = query.order_by(Report.created_at.desc()).all()
+    def rows():
+        for report in query.order_by(Report.created_at.desc()).yield_per(EXPORT_BATCH_SIZE):
+            yield [
+                report.title,
+                report.report_type.replace('_', ' ').title(),
+                report.status.upper(),
+                report.created_at.strftime("%Y-%m-%d %H:%M") if report.created_at else "",
+                report.submitted_at.strftime("%Y-%m-%d %H:%M") if report.submitted_at else "",
+                report.reviewed_at.strftime("%Y-%m-%d %H:%M") if report.reviewed_at else "",
+                report.file_name or "",
+            ]
     
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Reports"
-    
-    # Header style
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True)
-    
-    # Headers
     headers = ["Title", "Type", "Status", "Created", "Submitted", "Reviewed", "File Name"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center")
-    
-    # Data
-    for row, report in enumerate(reports, 2):
-        ws.cell(row=row, column=1, value=report.title)
-        ws.cell(row=row, column=2, value=report.report_type.replace('_', ' ').title())
-        ws.cell(row=row, column=3, value=report.status.upper())
-        ws.cell(row=row, column=4, value=report.created_at.strftime("%Y-%m-%d %H:%M") if report.created_at else "")
-        ws.cell(row=row, column=5, value=report.submitted_at.strftime("%Y-%m-%d %H:%M") if report.submitted_at else "")
-        ws.cell(row=row, column=6, value=report.reviewed_at.strftime("%Y-%m-%d %H:%M") if report.reviewed_at else "")
-        ws.cell(row=row, column=7, value=report.file_name or "")
-    
-    # Adjust column widths
-    for col in range(1, 8):
-        ws.column_dimensions[chr(64 + col)].width = 20
-    
-    # Save to bytes
-    excel_file = io.BytesIO()
-    wb.save(excel_file)
-    excel_file.seek(0)
-    
-    return StreamingResponse(
-        excel_file,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=reports_export.xlsx"}
-    )
+    path = write_excel_export("Reports", [(header, 20) for header in headers], rows())
+    return excel_file_response(path, "reports_export.xlsx")
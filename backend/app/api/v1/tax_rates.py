@@ -1,13 +1,13 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 from datetime import date
 
 from app.core.deps import get_db, get_current_active_user, get_current_active_superuser
 from app.db.models.tax_rate import TaxRate
 from app.db.models.user import User
 from app.db.schemas import tax_rate as tax_rate_schemas
+from app.services.tax_rate_index import tax_rate_index
 
 router = APIRouter()
 
@@ -19,14 +19,11 @@ def get_supported_countries(
     """
     Get list of countries with tax rate data.
     """
-    countries = db.query(
-        TaxRate.country_code,
-        TaxRate.country_name
-    ).distinct().all()
+    tax_rate_index.ensure_loaded(db)
     
     return [
         {"code": code, "name": name}
-        for code, name in countries
+        for code, name in tax_rate_index.countries()
     ]
 
 
@@ -36,22 +33,18 @@ def get_country_tax_rates(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     active_only: bool = True,
+    as_of: Optional[date] = None,
 ) -> Any:
     """
     Get all tax rates for a specific country.
+    With active_only, returns the rates in force on `as_of` (default: today).
     """
-    query = db.query(TaxRate).filter(TaxRate.country_code == country_code.upper())
+    tax_rate_index.ensure_loaded(db)
     
     if active_only:
-        today = date.today()
-        query = query.filter(
-            and_(
-                TaxRate.effective_from <= today,
-                (TaxRate.effective_to.is_(None)) | (TaxRate.effective_to >= today)
-            )
-        )
-    
-    rates = query.all()
+        rates = tax_rate_index.rates_as_of(country_code, as_of or date.today())
+    else:
+        rates = tax_rate_index.history(country_code)
     
     if not rates:
         raise HTTPException(status_code=404, detail=f"No tax rates found for country: {country_code}")
@@ -69,20 +62,15 @@ def get_current_rate(
     tax_type: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
+    as_of: Optional[date] = None,
 ) -> Any:
     """
-    Get current active tax rate for a specific country and type.
+    Get the tax rate in force for a specific country and type
+    on `as_of` (default: today).
     """
-    today = date.today()
+    tax_rate_index.ensure_loaded(db)
     
-    rate = db.query(TaxRate).filter(
-        and_(
-            TaxRate.country_code == country_code.upper(),
-            TaxRate.tax_type == tax_type,
-            TaxRate.effective_from <= today,
-            (TaxRate.effective_to.is_(None)) | (TaxRate.effective_to >= today)
-        )
-    ).first()
+    rate = tax_rate_index.rate_as_of(country_code, tax_type, as_of or date.today())
     
     if not rate:
         raise HTTPException(
@@ -111,6 +99,7 @@ def create_tax_rate(
     db.add(tax_rate)
     db.commit()
     db.refresh(tax_rate)
+    tax_rate_index.load(db)
     return tax_rate
 
 
@@ -122,8 +111,8 @@ def get_tax_types(
     """
     Get all available tax types.
     """
-    types = db.query(TaxRate.tax_type).distinct().all()
-    return [{"type": t[0]} for t in types]
+    tax_rate_index.ensure_loaded(db)
+    return [{"type": t} for t in tax_rate_index.tax_types()]
 
 
 @router.put("/{tax_rate_id}", response_model=tax_rate_schemas.TaxRate)
@@ -153,4 +142,5 @@ def update_tax_rate(
     db.add(tax_rate)
     db.commit()
     db.refresh(tax_rate)
+    tax_rate_index.load(db)
     return tax_rate
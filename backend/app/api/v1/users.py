@@ -1,5 +1,5 @@
-from typing import Any, List
-from fastapi import APIRouter, Body, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
@@ -7,6 +7,7 @@ from app.core import security
 from app.core.deps import get_db, get_current_active_user, get_current_active_superuser
 from app.db.models.user import User
 from app.db.schemas import user as user_schemas
+from app.utils.pagination import Keyset, keyset_page, set_page_headers
 from app.utils.hierarchy import (
     can_assign_role,
     sync_user_hierarchy,
@@ -17,9 +18,11 @@ router = APIRouter()
 
 @router.get("/", response_model=List[user_schemas.User])
 def read_users(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     company_id: str = None,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
@@ -45,7 +48,10 @@ def read_users(
             # Invalid UUID format, return empty or ignore
             return []
         
-    users = query.offset(skip).limit(limit).all()
+    users, next_cursor = keyset_page(
+        db, query, Keyset(User.created_at, User.id, descending=False), cursor, limit, skip
+    )
+    set_page_headers(response, next_cursor)
     return users
 
 @router.post("/", response_model=user_schemas.User)
@@ -12,6 +12,8 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "RegAI"
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str = "sqlite:///./regai.db"
+    # Defaults to DATABASE_URL with its asyncio driver (asyncpg / aiosqlite)
+    ASYNC_DATABASE_URL: str = ""
     SECRET_KEY: str = "dev_secret_key_change_in_prod"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     JWT_ALGORITHM: str = "HS256"
@@ -34,6 +36,78 @@ class Settings(BaseSettings):
     TENANT_DEFAULT_PLAN: str = "free"
     LOG_JSON: bool = False
 
+    # Per-request SQL statistics: X-DB-Query-Count/X-DB-Query-Time response
+    # headers (debugging only), and how often one statement shape may run
+    # in a request before it is logged as a possible N+1
+    QUERY_STATS_HEADERS: bool = False
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 10
+
+    # Max age of the in-process tax rate index before it is reloaded
+    TAX_RATE_INDEX_TTL_SECONDS: int = 300
+
+    # Max age of the in-process regulation key index used to categorize alerts
+    REGULATION_KEY_INDEX_TTL_SECONDS: int = 300
+
+    # Max age of cached per-tenant dashboard statistics (0 disables caching);
+    # writes through this process invalidate them immediately
+    DASHBOARD_STATS_TTL_SECONDS: int = 30
+
+    # Compliance check engine: draft reports become overdue after
+    # COMPLIANCE_REPORT_OVERDUE_DAYS, latest analysis scores below
+    # COMPLIANCE_MIN_ANALYSIS_SCORE raise alerts; the nightly scan of all
+    # tenants starts at COMPLIANCE_SCAN_HOUR (UTC) across
+    # COMPLIANCE_SCAN_WORKERS processes (0 = all cores)
+    COMPLIANCE_REPORT_OVERDUE_DAYS: int = 30
+    COMPLIANCE_MIN_ANALYSIS_SCORE: int = 60
+    COMPLIANCE_SCAN_HOUR: int = 2
+    COMPLIANCE_SCAN_WORKERS: int = 0
+
+    # PDF text extraction: worker processes (0 = all cores), pages per task,
+    # minimum page count before the pool is used, and the extracted-text cache
+    PDF_EXTRACT_WORKERS: int = 0
+    PDF_PAGES_PER_TASK: int = 8
+    PDF_PARALLEL_MIN_PAGES: int = 16
+    TEXT_CACHE_DIR: str = "./cache/text"
+
+    # OCR: render resolution, pages rendered per worker task, and the text
+    # layer length below which a page is treated as scanned
+    OCR_DPI: int = 300
+    OCR_BATCH_PAGES: int = 4
+    OCR_MIN_PAGE_CHARS: int = 20
+
+    # Threads dispatching uploaded documents to OCR/LLM extraction, and how
+    # long a claimed document may go without a heartbeat before another
+    # process takes it back
+    DOCUMENT_EXTRACTION_WORKERS: int = 4
+    DOCUMENT_EXTRACTION_LEASE_SECONDS: int = 600
+
+    # Hard cap on any request body, checked against Content-Length before
+    # the body is read; per-endpoint limits are enforced while streaming
+    MAX_UPLOAD_BYTES: int = 25 * 1024 * 1024
+
+    # File storage: "local" (paths under STORAGE_LOCAL_ROOT) or "s3" (any S3-compatible store, e.g. MinIO)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_LOCAL_ROOT: str = "."
+    S3_BUCKET: str = "regai-uploads"
+    S3_ENDPOINT_URL: str = ""
+    # Endpoint put in presigned URLs when clients reach storage under another host
+    S3_PUBLIC_ENDPOINT_URL: str = ""
+    S3_REGION: str = ""
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    # Multipart transfers: files above the threshold move in parts, several at a time
+    S3_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024
+    S3_MULTIPART_CHUNKSIZE: int = 8 * 1024 * 1024
+    S3_MAX_CONCURRENCY: int = 8
+    S3_PRESIGN_EXPIRES_SECONDS: int = 300
+
+    # Rendered exports (e.g. the regulation catalog PDF), keyed by data version
+    EXPORT_CACHE_DIR: str = "./cache/exports"
+    PDF_EXPORT_BATCH_ROWS: int = 200
+    PDF_EXPORT_WORKERS: int = 2
+    # Optional TTF font for exports with non-Latin text (e.g. DejaVuSans.ttf for Cyrillic)
+    PDF_FONT_PATH: str = ""
+
     model_config = SettingsConfigDict(case_sensitive=True, env_file=env_path, extra="ignore")
 
     @model_validator(mode="before")
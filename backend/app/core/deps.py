@@ -1,14 +1,15 @@
 import uuid
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, AsyncSessionLocal
 from app.db.models.user import User
 from app.db.models.tenant import Tenant
 
@@ -23,6 +24,10 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
 class TokenData:
     def __init__(self, user_id: str, tenant_id: str, role: str):
         self.user_id = user_id
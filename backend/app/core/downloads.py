@@ -0,0 +1,148 @@
+"""
+Conditional and ranged file downloads.
+
+Responses carry an ETag (strong when the content hash is known), answer
+If-None-Match with 304 Not Modified, and serve single HTTP Range
+requests with 206 Partial Content so interrupted downloads can resume.
+"""
+import os
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import Request
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+RANGE_CHUNK_SIZE = 64 * 1024
+
+
+class FileRangeResponse(Response):
+    """206 response streaming bytes [start, end] of a file"""
+
+    def __init__(self, path: str, start: int, end: int, file_size: int, headers: dict, media_type: str):
+        headers = {
+            **headers,
+            "content-range": f"bytes {start}-{end}/{file_size}",
+            "content-length": str(end - start + 1),
+        }
+        super().__init__(status_code=206, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.end = end
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(RANGE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # File shrank underneath us; close the response cleanly
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison as required for If-None-Match"""
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == bare for candidate in header.split(","))
+
+
+def _parse_range(header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=start-end" range. Returns (start, end) inclusive,
+    None to ignore the header (malformed or multiple ranges), or raises
+    ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_str, sep, end_str = spec.strip().partition("-")
+    if not sep or not all(part == "" or part.isdigit() for part in (start_str, end_str)):
+        return None
+
+    if start_str == "":
+        # Suffix range: last N bytes
+        if end_str == "":
+            return None
+        length = int(end_str)
+        if length == 0 or file_size == 0:
+            raise ValueError("range not satisfiable")
+        return max(file_size - length, 0), file_size - 1
+
+    start = int(start_str)
+    if end_str and int(end_str) < start:
+        return None
+    if start >= file_size:
+        raise ValueError("range not satisfiable")
+    end = int(end_str) if end_str else file_size - 1
+    return start, min(end, file_size - 1)
+
+
+def _content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def file_download_response(
+    request: Request,
+    path: str,
+    filename: str,
+    content_hash: Optional[str] = None,
+    media_type: str = "application/octet-stream",
+) -> Response:
+    """Build a download response honouring If-None-Match, Range and If-Range"""
+    stat_result = os.stat(path)
+    file_size = stat_result.st_size
+    if content_hash:
+        etag = f'"{content_hash}"'
+    else:
+        etag = f'W/"{int(stat_result.st_mtime)}-{file_size}"'
+
+    headers = {
+        "etag": etag,
+        "accept-ranges": "bytes",
+        # Downloads are authorized per user; always revalidate, which is cheap with ETags
+        "cache-control": "private, no-cache",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # If-Range needs a strong match; otherwise send the whole (changed) file
+    if range_header and (if_range is None or (if_range.strip() == etag and not etag.startswith("W/"))):
+        try:
+            byte_range = _parse_range(range_header, file_size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "content-range": f"bytes */{file_size}"})
+        if byte_range:
+            start, end = byte_range
+            return FileRangeResponse(
+                path, start, end, file_size,
+                headers={**headers, "content-disposition": _content_disposition(filename)},
+                media_type=media_type,
+            )
+
+    return FileResponse(
+        path=path,
+        filename=filename,
+        media_type=media_type,
+        headers=headers,
+        stat_result=stat_result,
+    )
@@ -0,0 +1,121 @@
+"""
+Per-request SQL statistics.
+
+Engine events count every statement and its time into a QueryStats held
+in a context variable for the current request (sync routes inherit it in
+the threadpool, async routes through the greenlet bridge). The request
+middleware publishes the totals as Prometheus histograms, optionally as
+X-DB-Query-Count / X-DB-Query-Time headers, and logs statement shapes
+repeated QUERY_N_PLUS_ONE_THRESHOLD times or more as N+1 suspects.
+
+``capture_queries`` records statements regardless of request context and
+backs the query budget assertions in the tests.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request",
+    ["method", "route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+# Expanded IN lists and VALUES rows differ only in length
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%\([^)]*\)s|\$\d+|:\w+)\s*,)+\s*(?:\?|%\([^)]*\)s|\$\d+|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with parameter lists and whitespace normalized"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST.sub("(?)", shape)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """(shape, times) for statements run at least threshold times"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+_captures: List[QueryStats] = []
+
+
+def start_request() -> QueryStats:
+    stats = QueryStats()
+    _request_stats.set(stats)
+    return stats
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Collect every statement executed in the block, on any thread"""
+    stats = QueryStats()
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    duration = time.perf_counter() - started
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    for captured in list(_captures):
+        captured.record(statement, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # Failed statements never reach after_cursor_execute
+    if context.connection is not None and context.connection.info.get("query_start"):
+        context.connection.info["query_start"].pop()
+
+
+def report_request(stats: QueryStats, method: str, route: str, threshold: int) -> None:
+    """Publish a finished request's statistics and log N+1 suspects"""
+    DB_QUERIES.labels(method, route).observe(stats.count)
+    DB_SECONDS.labels(method, route).observe(stats.duration)
+    for shape, times in stats.repeated(threshold):
+        logger.warning(f"Possible N+1 in {method} {route}: statement ran {times} times: {shape[:300]}")
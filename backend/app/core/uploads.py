@@ -0,0 +1,185 @@
+"""
+Streaming upload sink shared by the upload endpoints.
+
+Starlette spools a multipart body in full before the endpoint runs, so
+BodySizeLimitMiddleware caps every request body at MAX_UPLOAD_BYTES while
+it is received: from Content-Length when declared, otherwise by counting
+the bytes of a chunked body, which is cut off with 413 once it exceeds
+the limit.
+
+The sink then copies the spooled upload to a temp file in fixed-size
+chunks. Each chunk is hashed, the endpoint's own size limit is applied,
+and the first chunk is checked against the file signature of the claimed
+extension. Disk writes run in the threadpool so async endpoints never
+block the event loop.
+"""
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Leading bytes expected for each binary extension; text formats must not contain NUL bytes
+FILE_SIGNATURES = {
+    ".pdf": (b"%PDF",),
+    ".xlsx": (b"PK\x03\x04",),
+    ".docx": (b"PK\x03\x04",),
+    ".xls": (b"\xd0\xcf\x11\xe0",),
+    ".png": (b"\x89PNG",),
+    ".jpg": (b"\xff\xd8\xff",),
+    ".jpeg": (b"\xff\xd8\xff",),
+    ".bmp": (b"BM",),
+    ".tiff": (b"II*\x00", b"MM\x00*"),
+}
+TEXT_EXTENSIONS = {".csv", ".txt"}
+
+
+@dataclass
+class ReceivedUpload:
+    """An upload fully written to a temp file, with its content hash"""
+    path: Path
+    filename: str
+    extension: str
+    sha256: str
+    size: int
+
+    def cleanup(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def _check_signature(extension: str, first_chunk: bytes) -> None:
+    signatures = FILE_SIGNATURES.get(extension)
+    if signatures and not first_chunk.startswith(signatures):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"File content does not match type {extension}"
+        )
+    if extension in TEXT_EXTENSIONS and b"\x00" in first_chunk:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"File content does not match type {extension}"
+        )
+
+
+class UploadSink:
+    def __init__(self, tmp_dir: str = "uploads/tmp", chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.tmp_dir = Path(tmp_dir)
+        self.chunk_size = chunk_size
+
+    async def receive(
+        self,
+        upload: UploadFile,
+        *,
+        allowed_extensions: Iterable[str],
+        max_size: int
+    ) -> ReceivedUpload:
+        """
+        Stream an upload to a temp file, enforcing type and size limits.
+        The caller owns the returned temp file (move it or call cleanup()).
+        """
+        extension = os.path.splitext(upload.filename or "")[1].lower()
+        if extension not in allowed_extensions:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File type {extension} not allowed. Allowed: {sorted(allowed_extensions)}"
+            )
+
+        await run_in_threadpool(self.tmp_dir.mkdir, parents=True, exist_ok=True)
+        path = self.tmp_dir / f"{uuid.uuid4()}.part"
+        buffer: BinaryIO = await run_in_threadpool(path.open, "wb")
+
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            while True:
+                chunk = await upload.read(self.chunk_size)
+                if not chunk:
+                    break
+                if size == 0:
+                    _check_signature(extension, chunk)
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File size exceeds {max_size / 1024 / 1024:g}MB limit"
+                    )
+                digest.update(chunk)
+                await run_in_threadpool(buffer.write, chunk)
+        except BaseException:
+            await run_in_threadpool(buffer.close)
+            await run_in_threadpool(path.unlink, missing_ok=True)
+            raise
+        await run_in_threadpool(buffer.close)
+
+        return ReceivedUpload(
+            path=path,
+            filename=upload.filename,
+            extension=extension,
+            sha256=digest.hexdigest(),
+            size=size
+        )
+
+
+def check_content_length(content_length: str) -> None:
+    """Reject a request whose declared body exceeds MAX_UPLOAD_BYTES before it is read"""
+    try:
+        declared = int(content_length)
+    except ValueError:
+        return
+    if declared > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Request body too large"
+        )
+
+
+class BodySizeLimitMiddleware:
+    """Reject request bodies over MAX_UPLOAD_BYTES with 413 before they are read in full"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length:
+            try:
+                check_content_length(content_length)
+            except HTTPException as e:
+                await JSONResponse(status_code=e.status_code, content={"detail": e.detail})(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            # Chunked bodies declare no length; stop reading once they exceed the limit.
+            # FastAPI re-raises an HTTPException from body parsing, so the client gets 413.
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > settings.MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Request body too large"
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+upload_sink = UploadSink()
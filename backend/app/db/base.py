@@ -14,4 +14,12 @@ from app.db.models.report_analysis import ReportAnalysis  # noqa
 from app.db.models.report_comment import ReportComment  # noqa
 from app.db.models.report_template import ReportTemplate  # noqa
 from app.db.models.tax_rate import TaxRate  # noqa
+from app.db.models.stored_blob import StoredBlob  # noqa
+from app.db.models.compliance_score import ComplianceScoreCounter, ComplianceScoreState  # noqa
+from app.db.models.report_rollup import ReportDailyRollup  # noqa
 from app.db.session import Base  # noqa
+
+# Session event listeners keeping the derived tables (compliance score
+# counters, report rollups) and cached dashboard stats in step with ORM
+# writes; importing base registers them
+from app.services import compliance_score, dashboard_stats, report_rollups  # noqa
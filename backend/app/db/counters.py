@@ -0,0 +1,44 @@
+"""
+Helpers for counter tables maintained from session flush events.
+"""
+from typing import Any, Dict
+
+from sqlalchemy import and_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import attributes
+
+
+def increment(connection, model, key: Dict[str, Any], deltas: Dict[str, Any], **defaults) -> None:
+    """
+    Add deltas to the counter row identified by key (a unique constraint
+    or the primary key), creating it with the deltas as initial values.
+    An atomic upsert on Postgres and SQLite; update-then-insert elsewhere.
+    """
+    values = {**defaults, **key, **deltas}
+    increments = {name: getattr(model, name) + delta for name, delta in deltas.items()}
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        connection.execute(
+            insert(model).values(**values).on_conflict_do_update(index_elements=list(key), set_=increments)
+        )
+        return
+
+    updated = connection.execute(
+        update(model)
+        .where(and_(*(getattr(model, name) == value for name, value in key.items())))
+        .values(**increments)
+    )
+    if updated.rowcount == 0:
+        connection.execute(model.__table__.insert().values(**values))
+
+
+def previous_value(obj, name: str) -> Any:
+    """Value of an attribute before the pending change (the current one if unchanged)"""
+    history = attributes.get_history(obj, name)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, name)
@@ -0,0 +1,51 @@
+"""
+Postgres advisory locks for work that must not run concurrently across
+processes. A lock is identified by a namespace (one per kind of work,
+below) and a key within it, e.g. derived from a tenant id.
+
+On other databases xact_lock is a no-op (SQLite lets one transaction
+write at a time, which serialises the same work) and try_lock always
+succeeds.
+"""
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Union
+
+from sqlalchemy import func, select
+
+# Namespaces
+COMPLIANCE_SCORE_COUNTERS = 1
+COMPLIANCE_SCAN = 2
+
+
+def lock_key(value: Union[uuid.UUID, int]) -> int:
+    """32-bit key for a lock: the first bytes of a UUID, or an int"""
+    if isinstance(value, uuid.UUID):
+        return int.from_bytes(value.bytes[:4], "big", signed=True)
+    return value
+
+
+def xact_lock(connection, namespace: int, key: Union[uuid.UUID, int] = 0) -> None:
+    """Wait for the lock; it is released when the transaction ends"""
+    if connection.dialect.name == "postgresql":
+        connection.execute(select(func.pg_advisory_xact_lock(namespace, lock_key(key))))
+
+
+@contextmanager
+def try_lock(engine, namespace: int, key: Union[uuid.UUID, int] = 0) -> Iterator[bool]:
+    """
+    Hold the lock while the block runs, on a connection of its own, so it
+    does not depend on any transaction. Yields False, without waiting,
+    when another process holds it.
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        args = (namespace, lock_key(key))
+        acquired = connection.execute(select(func.pg_try_advisory_lock(*args))).scalar()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(select(func.pg_advisory_unlock(*args)))
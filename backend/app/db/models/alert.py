@@ -1,7 +1,7 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, DateTime, func, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, ForeignKey, DateTime, func, Text, Enum as SQLEnum, Index, Integer, text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from app.db.session import Base
 import enum
 
@@ -17,16 +17,41 @@ class AlertSeverity(str, enum.Enum):
     MEDIUM = "medium"
     LOW = "low"
 
+# Alerts a re-raised fingerprint is folded into; at most one per
+# (tenant, fingerprint), enforced by uq_alerts_open_fingerprint
+OPEN_FINGERPRINT = text("fingerprint IS NOT NULL AND status IN ('OPEN', 'IN_PROGRESS')")
+
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_tenant_created_id", "tenant_id", "created_at", "id"),
+        Index("ix_alerts_tenant_status_severity", "tenant_id", "status", "severity"),
+        Index(
+            "uq_alerts_open_fingerprint", "tenant_id", "fingerprint", unique=True,
+            postgresql_where=OPEN_FINGERPRINT, sqlite_where=OPEN_FINGERPRINT,
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     message = Column(Text, nullable=False)
-    severity = Column(SQLEnum(AlertSeverity), nullable=False, default=AlertSeverity.MEDIUM, index=True)
-    status = Column(SQLEnum(AlertStatus), nullable=False, default=AlertStatus.OPEN, index=True)
+    # active_history: the compliance score counters need the previous value
+    # of these even when it was never loaded
+    severity = column_property(
+        Column(SQLEnum(AlertSeverity), nullable=False, default=AlertSeverity.MEDIUM, index=True), active_history=True
+    )
+    status = column_property(
+        Column(SQLEnum(AlertStatus), nullable=False, default=AlertStatus.OPEN, index=True), active_history=True
+    )
     regulation = Column(String(100), index=True)  # e.g., "GDPR", "CCPA", "HIPAA"
+    # Category of the matching regulation, resolved when the alert is written
+    category = column_property(Column(String, index=True), active_history=True)
     notes = Column(Text)
     resolution_notes = Column(Text)
+
+    # Hash of (tenant, company, regulation, rule, subject) for alerts raised
+    # by compliance checks; NULL for manually created alerts
+    fingerprint = Column(String(64), nullable=True)
+    occurrences = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relationships
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), nullable=True)
@@ -37,6 +62,7 @@ class Alert(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     resolved_at = Column(DateTime(timezone=True), nullable=True)
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
     
     company = relationship("Company")
     tenant = relationship("Tenant")
@@ -1,10 +1,13 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, DateTime, func, Boolean, Text
+from sqlalchemy import Column, String, ForeignKey, DateTime, func, Boolean, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.session import Base
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_tenant_timestamp_id", "tenant_id", "timestamp", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, func, Text, Numeric, Enum, JSON
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, func, Text, Numeric, Enum, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.session import Base
@@ -22,6 +22,9 @@ class TransformationFormat(str, enum.Enum):
 
 class BalanceSheet(Base):
     __tablename__ = "balance_sheets"
+    __table_args__ = (
+        Index("ix_balance_sheets_company_created_id", "company_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), nullable=False)
@@ -38,6 +41,9 @@ class BalanceSheet(Base):
 
 class BalanceSheetItem(Base):
     __tablename__ = "balance_sheet_items"
+    __table_args__ = (
+        Index("ix_balance_sheet_items_balance_sheet_id", "balance_sheet_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     balance_sheet_id = Column(UUID(as_uuid=True), ForeignKey("balance_sheets.id"), nullable=False)
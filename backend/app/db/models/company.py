@@ -1,11 +1,14 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, DateTime, func, Text, Integer, Boolean
+from sqlalchemy import Column, String, ForeignKey, DateTime, func, Text, Integer, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
 class Company(Base):
     __tablename__ = "companies"
+    __table_args__ = (
+        Index("ix_companies_created_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, index=True, nullable=False, unique=True)
@@ -0,0 +1,28 @@
+import uuid
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, func, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.session import Base
+
+class ComplianceScoreCounter(Base):
+    """
+    Number of a tenant's alerts per (category, severity, status), kept up to
+    date as alerts are written (see app/services/compliance_score.py)
+    """
+    __tablename__ = "compliance_score_counters"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "category", "severity", "status", name="uq_compliance_score_counters_key"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    category = Column(String, nullable=False, default="")  # "" for alerts matching no regulation
+    severity = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+class ComplianceScoreState(Base):
+    """Marks a tenant's counters as built; tenants without a row are rebuilt on first read"""
+    __tablename__ = "compliance_score_states"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), primary_key=True)
+    rebuilt_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -25,12 +25,18 @@ class Document(Base):
     
     filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256, see StoredBlob
     document_type = Column(SQLEnum(DocumentType), nullable=False)
     status = Column(SQLEnum(DocumentStatus), default=DocumentStatus.PENDING, nullable=False)
     
     # Extracted data stored as JSON text
     extracted_data = Column(Text, nullable=True)  # JSON string
     error_message = Column(Text, nullable=True)
+
+    # Extraction lease: the worker processing the document and when it last
+    # confirmed it is alive (app/services/extraction_worker.py)
+    claimed_by = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     processed_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,10 +1,13 @@
 import uuid
-from sqlalchemy import Column, ForeignKey, DateTime, func
+from sqlalchemy import Column, ForeignKey, DateTime, func, Index
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.session import Base
 
 class LinkCompanyRegulation(Base):
     __tablename__ = "link_company_regulation"
+    __table_args__ = (
+        Index("ix_link_company_regulation_company_regulation", "company_id", "regulation_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), nullable=False)
@@ -1,18 +1,24 @@
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, func, Boolean
+from sqlalchemy import Column, String, Text, DateTime, func, Boolean, Index, DDL, event
 from sqlalchemy.dialects.postgresql import UUID, JSON
+from sqlalchemy.orm import deferred
 from app.db.session import Base
 
 class Regulation(Base):
     __tablename__ = "regulations"
+    __table_args__ = (
+        Index("ix_regulations_created_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     code = Column(String, index=True, nullable=False) # e.g. "IFRS-9"
     title = Column(String, index=True, nullable=False)
     jurisdiction = Column(String, index=True)
     category = Column(String, index=True) # Tax, IFRS, ESG, Privacy, Security
-    content = Column(Text) # Detailed regulation content
-    workflow_steps = Column(JSON) # Detailed workflow procedures and checklists
+    # The regulation body is large and only shown in the detail view; it is
+    # loaded on first access, or up front with undefer_group("body")
+    content = deferred(Column(Text), group="body") # Detailed regulation content
+    workflow_steps = deferred(Column(JSON), group="body") # Detailed workflow procedures and checklists
     content_hash = Column(String, index=True) # For deduplication
     source_url = Column(String)
     effective_date = Column(DateTime(timezone=True))
@@ -23,3 +29,57 @@ class Regulation(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+# Full-text search index, maintained by the database (see app/services/regulation_search.py).
+# Postgres: generated tsvector (English/Russian stemming, "simple" for Uzbek and codes)
+# with GIN, plus trigram indexes for fuzzy code/title matches.
+# SQLite: an FTS5 table kept in sync by triggers.
+POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE regulations ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(code, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', left(coalesce(content, ''), 100000)), 'B') ||
+        setweight(to_tsvector('russian', left(coalesce(content, ''), 100000)), 'B') ||
+        setweight(to_tsvector('simple', left(coalesce(content, ''), 100000)), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_regulations_search_vector ON regulations USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_regulations_code_trgm ON regulations USING gin (code gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_regulations_title_trgm ON regulations USING gin (title gin_trgm_ops)",
+]
+
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS regulations_fts USING fts5(
+        regulation_id UNINDEXED, code, title, content,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS regulations_fts_insert AFTER INSERT ON regulations BEGIN
+        INSERT INTO regulations_fts (regulation_id, code, title, content)
+        VALUES (NEW.id, NEW.code, NEW.title, NEW.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS regulations_fts_update AFTER UPDATE OF code, title, content ON regulations BEGIN
+        UPDATE regulations_fts SET code = NEW.code, title = NEW.title, content = NEW.content
+        WHERE regulation_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS regulations_fts_delete AFTER DELETE ON regulations BEGIN
+        DELETE FROM regulations_fts WHERE regulation_id = OLD.id;
+    END
+    """,
+]
+
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(Regulation.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Regulation.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from datetime import datetime, timezone
 import uuid
 
@@ -8,12 +8,20 @@ from app.db.session import Base
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        Index("ix_reports_submitted_by_created_id", "submitted_by", "created_at", "id"),
+        Index("ix_reports_company_created_id", "company_id", "created_at", "id"),
+        Index("ix_reports_created_id", "created_at", "id"),
+        Index("ix_reports_company_status_created", "company_id", "status", "created_at"),
+        Index("ix_reports_submitted_by_status", "submitted_by", "status"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     report_type = Column(String(50), nullable=False)  # compliance, audit, financial, risk_assessment
-    status = Column(String(50), default="draft")  # draft, submitted, under_review, approved, rejected
+    # active_history: the analytics rollups need the previous status even when it was never loaded
+    status = column_property(Column(String(50), default="draft"), active_history=True)  # draft, submitted, under_review, approved, rejected
     
     # Relationships
     submitted_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -25,6 +33,7 @@ class Report(Base):
     file_path = Column(String(500))
     file_name = Column(String(255))
     file_size = Column(Integer)
+    content_hash = Column(String(64), index=True)  # SHA-256, see StoredBlob
     
     # Timestamps
     submitted_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Text, Date, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from datetime import datetime, timezone
 import uuid
 
@@ -8,13 +8,21 @@ from app.db.session import Base
 
 class ReportAnalysis(Base):
     __tablename__ = "report_analyses"
+    __table_args__ = (
+        Index("ix_report_analyses_report_created", "report_id", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     report_id = Column(UUID(as_uuid=True), ForeignKey("reports.id"), nullable=False)
     country_code = Column(String(2), nullable=False)
     tax_types = Column(JSON)  # List of tax types to check
+    period_end = Column(Date, nullable=True)  # Rates in force on this date apply; NULL means today
+    
+    # Cache key: identical (file_hash, country_code, tax_types, rate_version) reuse results
+    file_hash = Column(String(64), index=True)  # SHA-256 of the analyzed file
+    rate_version = Column(String(64))  # Digest of the tax rates applied
     status = Column(String(50), default="pending")  # pending, processing, completed, failed
-    overall_score = Column(Integer)  # 0-100
+    overall_score = column_property(Column(Integer), active_history=True)  # 0-100; see app/services/report_rollups.py
     
     # Analysis results
     total_checks = Column(Integer, default=0)
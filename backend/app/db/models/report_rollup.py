@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Date, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.session import Base
+
+# status of the rows holding analysis totals, which are not split by report status
+ANALYSES = ""
+
+class ReportDailyRollup(Base):
+    """
+    Reports created and analyses run per day, company, submitter and
+    report status, kept up to date as reports and analyses are written
+    (see app/services/report_rollups.py)
+    """
+    __tablename__ = "report_daily_rollups"
+    __table_args__ = (
+        Index("ix_report_daily_rollups_user_day", "user_id", "day"),
+        Index("ix_report_daily_rollups_company_day", "company_id", "day"),
+    )
+
+    day = Column(Date, primary_key=True)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    status = Column(String(50), primary_key=True)  # report status, or ANALYSES
+
+    report_count = Column(Integer, nullable=False, default=0)
+    analysis_count = Column(Integer, nullable=False, default=0)
+    scored_count = Column(Integer, nullable=False, default=0)  # analyses with an overall score
+    score_sum = Column(BigInteger, nullable=False, default=0)
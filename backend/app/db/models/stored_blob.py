@@ -0,0 +1,22 @@
+import uuid
+from sqlalchemy import Column, String, Integer, BigInteger, ForeignKey, DateTime, func, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.session import Base
+
+class StoredBlob(Base):
+    """A file stored once per tenant, addressed by the SHA-256 of its content"""
+    __tablename__ = "stored_blobs"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "sha256", name="uq_stored_blobs_tenant_sha256"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    storage_path = Column(String(500), nullable=False)
+    
+    # Number of Document/Report rows pointing at this blob; the file is deleted at zero
+    ref_count = Column(Integer, nullable=False, default=0)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,11 +1,14 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, func, Integer, JSON
+from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, func, Integer, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_company_created_id", "company_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, UUID4
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -33,10 +33,29 @@ class AlertUpdate(BaseModel):
     resolution_notes: Optional[str] = None
     assigned_to: Optional[UUID4] = None
 
+# Bulk update of the listed alerts
+class AlertBulkUpdate(AlertUpdate):
+    alert_ids: List[str]
+
+# Alerts selected by a filter-based bulk update; every criterion is ANDed
+class AlertBulkFilter(BaseModel):
+    severity: Optional[List[AlertSeverity]] = None
+    status: Optional[List[AlertStatus]] = None
+    regulation: Optional[str] = None
+    category: Optional[str] = None
+    company_id: Optional[UUID4] = None
+    older_than_days: Optional[int] = None
+    created_before: Optional[datetime] = None
+
+# Bulk update of every alert matching a filter
+class AlertFilterBulkUpdate(AlertUpdate):
+    filter: AlertBulkFilter
+
 # Properties shared by models stored in DB
 class AlertInDBBase(AlertBase):
     id: UUID4
     status: AlertStatus
+    category: Optional[str] = None
     notes: Optional[str] = None
     resolution_notes: Optional[str] = None
     tenant_id: UUID4
@@ -45,6 +64,8 @@ class AlertInDBBase(AlertBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     resolved_at: Optional[datetime] = None
+    occurrences: int = 1
+    last_seen_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Any, Optional, List
 from uuid import UUID
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict
@@ -29,6 +29,20 @@ class RegulationInDBBase(RegulationBase):
 class Regulation(RegulationInDBBase):
     pass
 
+class RegulationDetail(Regulation):
+    content: Optional[str] = None
+    workflow_steps: Optional[Any] = None
+
+class RegulationSearchHit(BaseModel):
+    id: UUID
+    code: str
+    title: str
+    jurisdiction: Optional[str] = None
+    category: Optional[str] = None
+    effective_date: Optional[datetime] = None
+    rank: float
+    snippet: Optional[str] = None  # matched text with <mark> highlights
+
 class RegulationSearchResults(BaseModel):
     results: List[Regulation]
     total: int
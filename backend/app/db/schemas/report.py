@@ -29,6 +29,7 @@ class Report(ReportBase):
     file_path: Optional[str] = None
     file_name: Optional[str] = None
     file_size: Optional[int] = None
+    content_hash: Optional[str] = None
     submitted_at: Optional[datetime] = None
     reviewed_at: Optional[datetime] = None
     created_at: datetime
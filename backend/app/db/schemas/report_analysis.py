@@ -1,5 +1,5 @@
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel, UUID4
 
 class ErrorDetail(BaseModel):
@@ -16,11 +16,29 @@ class AnalysisRequest(BaseModel):
     report_id: UUID4
     country_code: str
     tax_types: List[str]  # ['vat', 'corporate', etc.]
+    period_end: Optional[date] = None  # Validate against the rates in force on this date
+
+class RevalidationRequest(BaseModel):
+    country_code: str
+
+class RevalidationResult(BaseModel):
+    country_code: str
+    checked: int
+    revalidated: int
+    skipped: int
+    failed: int
+
+class RevalidationJob(BaseModel):
+    job_id: str
+    country_code: str
+    status: str  # pending, running, completed, failed
+    result: Optional[RevalidationResult] = None
 
 class ReportAnalysisBase(BaseModel):
     report_id: UUID4
     country_code: str
     tax_types: List[str]
+    period_end: Optional[date] = None
 
 class ReportAnalysisCreate(ReportAnalysisBase):
     pass
@@ -28,6 +46,8 @@ class ReportAnalysisCreate(ReportAnalysisBase):
 class ReportAnalysis(ReportAnalysisBase):
     id: UUID4
     status: str
+    file_hash: Optional[str] = None
+    rate_version: Optional[str] = None
     overall_score: Optional[int] = None
     total_checks: int
     passed_checks: int
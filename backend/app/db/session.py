@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
 
@@ -11,6 +12,25 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(url: str) -> str:
+    """Same database through its asyncio driver (asyncpg / aiosqlite)"""
+    scheme, sep, rest = url.partition("://")
+    if scheme in ("postgresql", "postgresql+psycopg", "postgresql+psycopg2", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if scheme == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+# Async engine for async def routes, so DB I/O doesn't block the event loop
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 class Base(DeclarativeBase):
     pass
 
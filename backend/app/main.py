@@ -10,8 +10,15 @@ from alembic import command
 
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.uploads import BodySizeLimitMiddleware
+from app.core import query_stats
 from app.api.v1 import api_router
+from app.db import base  # noqa: F401  (models and session event listeners)
 from app.rag.scheduler import start_scheduler
+from app.services.pdf_extraction import shutdown_pool as shutdown_pdf_pool
+from app.services.extraction_worker import extraction_worker
+from app.services.regulation_pdf_export import regulation_pdf_exporter
+from app.services.revalidation_jobs import revalidation_jobs
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -36,8 +43,13 @@ async def lifespan(app: FastAPI):
     # Startup
     run_migrations()
     start_scheduler()
+    extraction_worker.start()
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    extraction_worker.shutdown()
+    regulation_pdf_exporter.shutdown()
+    revalidation_jobs.shutdown()
+    shutdown_pdf_pool()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -52,6 +64,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-DB-Query-Count", "X-DB-Query-Time"],
 )
 
 # Request ID middleware
@@ -63,6 +76,9 @@ async def add_request_id(request: Request, call_next):
     response.headers["X-Request-ID"] = request_id
     return response
 
+# Upload size guard: reject oversized bodies while they are received
+app.add_middleware(BodySizeLimitMiddleware)
+
 # Timing middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
@@ -72,6 +88,23 @@ async def add_process_time_header(request: Request, call_next):
     response.headers["X-Process-Time"] = str(process_time)
     return response
 
+# SQL statements per request: metrics, N+1 warnings, optional debug headers
+@app.middleware("http")
+async def track_queries(request: Request, call_next):
+    stats = query_stats.start_request()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    query_stats.report_request(
+        stats,
+        request.method,
+        route.path if route is not None else "unmatched",
+        settings.QUERY_N_PLUS_ONE_THRESHOLD,
+    )
+    if settings.QUERY_STATS_HEADERS:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Query-Time"] = f"{stats.duration:.6f}"
+    return response
+
 # Prometheus metrics
 metrics_app = make_asgi_app()
 app.mount("/metrics", metrics_app)
@@ -1,15 +1,25 @@
+import asyncio
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 import random
 
+from app.core.config import settings
+
 scheduler = AsyncIOScheduler()
 
+from app.services import compliance_engine
 from app.services.regulation_updater import regulation_updater
 
 async def recrawl_regulations():
     print("Executing scheduled regulation update...")
     regulation_updater.check_for_updates()
 
+async def scan_compliance():
+    # Full platform scan in worker processes, off the event loop
+    await asyncio.to_thread(compliance_engine.scan_all)
+
 def start_scheduler():
     # Run every 1 hour for demonstration purposes (normally would be 24h)
     scheduler.add_job(
@@ -18,4 +28,10 @@ def start_scheduler():
         id="recrawl_job",
         replace_existing=True
     )
+    scheduler.add_job(
+        scan_compliance,
+        trigger=CronTrigger(hour=settings.COMPLIANCE_SCAN_HOUR, timezone="UTC"),
+        id="compliance_scan_job",
+        replace_existing=True
+    )
     scheduler.start()
@@ -0,0 +1,95 @@
+"""
+Set-based bulk updates of alerts.
+
+Alerts are changed by tenant-scoped UPDATE statements instead of being
+loaded and modified one by one: a list of ids is applied in batches of
+BULK_ID_BATCH ids per statement (keeping IN lists under the driver's
+parameter limits), a filter in a single statement. Everything runs in
+the caller's transaction.
+
+UPDATE statements bypass the session flush events, so the compliance
+score counters and the cached dashboard stats are adjusted here.
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, func, update
+from sqlalchemy.orm import Session
+
+from app.db.models.alert import Alert, AlertSeverity, AlertStatus
+from app.services.compliance_score import count_status_change
+from app.services.dashboard_stats import ALERT_STATS, mark_written
+
+BULK_ID_BATCH = 5000
+
+# Fields a bulk update may set
+BULK_FIELDS = ("status", "notes", "resolution_notes", "assigned_to")
+
+
+def alert_filter(
+    severity: Optional[List[Any]] = None,
+    status: Optional[List[Any]] = None,
+    regulation: Optional[str] = None,
+    category: Optional[str] = None,
+    company_id: Optional[uuid.UUID] = None,
+    older_than_days: Optional[int] = None,
+    created_before: Optional[datetime] = None,
+):
+    """AND of the given criteria, or None when none is given"""
+    conditions = []
+    if severity:
+        conditions.append(Alert.severity.in_([AlertSeverity(getattr(s, "value", s)) for s in severity]))
+    if status:
+        conditions.append(Alert.status.in_([AlertStatus(getattr(s, "value", s)) for s in status]))
+    if regulation:
+        conditions.append(Alert.regulation.ilike(f"%{regulation}%"))
+    if category:
+        conditions.append(Alert.category == category)
+    if company_id:
+        conditions.append(Alert.company_id == company_id)
+    if older_than_days is not None:
+        conditions.append(Alert.created_at < datetime.utcnow() - timedelta(days=older_than_days))
+    if created_before is not None:
+        conditions.append(Alert.created_at < created_before)
+    return and_(*conditions) if conditions else None
+
+
+def _values(changes: Dict[str, Any]) -> Dict[str, Any]:
+    values = {field: changes[field] for field in BULK_FIELDS if field in changes}
+    if values.get("status") is not None:
+        values["status"] = AlertStatus(getattr(values["status"], "value", values["status"]))
+        if values["status"] == AlertStatus.RESOLVED:
+            values["resolved_at"] = func.coalesce(Alert.resolved_at, datetime.utcnow())
+    return values
+
+
+def _update(db: Session, tenant_id: uuid.UUID, condition, values: Dict[str, Any]) -> int:
+    if values.get("status") is not None:
+        count_status_change(db, tenant_id, condition, values["status"])
+    result = db.execute(
+        update(Alert)
+        .where(Alert.tenant_id == tenant_id, condition)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def update_alerts_by_id(db: Session, tenant_id: uuid.UUID, alert_ids: Iterable[uuid.UUID],
+                        changes: Dict[str, Any]) -> int:
+    """Apply changes to the tenant's alerts among alert_ids; returns the number updated"""
+    ids: List[uuid.UUID] = list(dict.fromkeys(alert_ids))
+    values = _values(changes)
+    updated = 0
+    for start in range(0, len(ids), BULK_ID_BATCH):
+        updated += _update(db, tenant_id, Alert.id.in_(ids[start:start + BULK_ID_BATCH]), values)
+    mark_written(db, ALERT_STATS, tenant_id)
+    return updated
+
+
+def update_alerts_matching(db: Session, tenant_id: uuid.UUID, condition, changes: Dict[str, Any]) -> int:
+    """Apply changes to every alert of the tenant matching condition; returns the number updated"""
+    updated = _update(db, tenant_id, condition, _values(changes))
+    mark_written(db, ALERT_STATS, tenant_id)
+    return updated
@@ -0,0 +1,134 @@
+"""
+Fingerprinted alerts raised by compliance checks.
+
+An alert raised by a check carries a fingerprint of (tenant, company,
+regulation, rule, subject). Raising it again while an alert with that
+fingerprint is still open or in progress bumps its occurrence count and
+last_seen_at instead of inserting another row; the unique partial index
+uq_alerts_open_fingerprint makes the upsert atomic under concurrent
+checks. Once the alert is resolved or dismissed, the next occurrence
+opens a new one.
+
+raise_alerts upserts many alerts with one multi-row statement per
+UPSERT_BATCH alerts. The upsert is a statement, so the compliance score
+counters and the cached dashboard stats are adjusted here for inserted
+alerts.
+"""
+import hashlib
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, insert, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.db.models.alert import OPEN_FINGERPRINT, Alert, AlertSeverity, AlertStatus
+from app.services.compliance_score import count_inserted_alerts, lock_tenant_scores, regulation_key_index
+from app.services.dashboard_stats import ALERT_STATS, mark_written
+
+# Alerts per upsert statement; 14 parameters each keeps a batch well under
+# the bind parameter limits of SQLite and Postgres
+UPSERT_BATCH = 500
+
+
+def alert_fingerprint(tenant_id: Any, company_id: Any, regulation: Optional[str], rule: str, subject: Any) -> str:
+    parts = (tenant_id, company_id, (regulation or "").strip().lower(), rule, subject)
+    return hashlib.sha256("\x1f".join("" if part is None else str(part) for part in parts).encode()).hexdigest()
+
+
+def _row(alert: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    return dict(
+        id=uuid.uuid4(),
+        tenant_id=alert["tenant_id"],
+        company_id=alert.get("company_id"),
+        regulation=alert.get("regulation"),
+        category=regulation_key_index.category_for(alert.get("regulation")),
+        severity=alert["severity"],
+        status=AlertStatus.OPEN,
+        message=alert["message"],
+        notes=alert.get("notes"),
+        created_by=alert.get("created_by"),
+        fingerprint=alert_fingerprint(
+            alert["tenant_id"], alert.get("company_id"), alert.get("regulation"), alert["rule"], alert["subject"]
+        ),
+        occurrences=1,
+        created_at=now,
+        last_seen_at=now,
+    )
+
+
+def raise_alerts(db: Session, alerts: Iterable[Dict[str, Any]]) -> int:
+    """
+    Upsert alerts given as raise_alert keyword arguments; repeats of one
+    fingerprint within the call count once. Returns the number of new
+    alerts. The caller commits.
+    """
+    now = datetime.now(timezone.utc)
+    regulation_key_index.ensure_loaded(db)
+    by_fingerprint: Dict[str, Dict[str, Any]] = {}
+    for alert in alerts:
+        row = _row(alert, now)
+        by_fingerprint.setdefault(row["fingerprint"], row)
+    rows = list(by_fingerprint.values())
+    lock_tenant_scores(db.connection(), {row["tenant_id"] for row in rows})
+    repeat = dict(occurrences=Alert.occurrences + 1, last_seen_at=now, updated_at=now)
+
+    # (tenant_id, category, severity) of every inserted alert
+    inserted: List[Tuple] = []
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        for start in range(0, len(rows), UPSERT_BATCH):
+            result = db.execute(
+                upsert(Alert).values(rows[start:start + UPSERT_BATCH])
+                .on_conflict_do_update(
+                    index_elements=[Alert.tenant_id, Alert.fingerprint], index_where=OPEN_FINGERPRINT, set_=repeat,
+                )
+                .returning(Alert.tenant_id, Alert.category, Alert.severity, Alert.occurrences)
+            )
+            inserted.extend((r.tenant_id, r.category, r.severity) for r in result if r.occurrences == 1)
+    else:
+        for row in rows:
+            updated = db.execute(
+                update(Alert)
+                .where(and_(Alert.tenant_id == row["tenant_id"], Alert.fingerprint == row["fingerprint"], OPEN_FINGERPRINT))
+                .values(**repeat)
+                .execution_options(synchronize_session=False)
+            )
+            if updated.rowcount == 0:
+                db.execute(insert(Alert).values(**row))
+                inserted.append((row["tenant_id"], row["category"], row["severity"]))
+
+    counts = Counter(inserted)
+    for (tenant_id, category, severity), count in counts.items():
+        count_inserted_alerts(db, tenant_id, category, severity, AlertStatus.OPEN, count)
+    for tenant_id in {tenant_id for tenant_id, _, _ in counts}:
+        mark_written(db, ALERT_STATS, tenant_id)
+    return len(inserted)
+
+
+def raise_alert(
+    db: Session,
+    *,
+    tenant_id: uuid.UUID,
+    company_id: Optional[uuid.UUID],
+    regulation: Optional[str],
+    rule: str,
+    subject: Any,
+    severity: AlertSeverity,
+    message: str,
+    notes: Optional[str] = None,
+    created_by: Optional[uuid.UUID] = None,
+) -> bool:
+    """
+    Insert the alert, or count another occurrence of the open alert with
+    the same fingerprint. Returns True when a new alert was inserted.
+    The caller commits.
+    """
+    return raise_alerts(db, [dict(
+        tenant_id=tenant_id, company_id=company_id, regulation=regulation, rule=rule, subject=subject,
+        severity=severity, message=message, notes=notes, created_by=created_by,
+    )]) == 1
@@ -0,0 +1,199 @@
+"""
+Content-addressed blob store for uploaded files.
+
+Files are hashed while they are streamed to disk and stored once per
+tenant under their SHA-256. Document and Report rows reference a blob by
+content hash; StoredBlob.ref_count tracks how many rows do. The row is
+locked (SELECT ... FOR UPDATE) while a reference is taken or released,
+and when the last one goes the row is deleted and the file is removed
+once the transaction commits. StoredBlob.storage_path is a key in the
+configured storage backend (see app.services.storage), unique to the row,
+so removing a released file never touches the file of a later upload of
+the same content.
+"""
+import hashlib
+import logging
+import uuid
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.uploads import ReceivedUpload
+from app.db.models.stored_blob import StoredBlob
+from app.services.storage import StorageBackend, storage
+from app.utils.file_hash import HASH_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Inserts of a blob row to retry when they race a concurrent upload or
+# release of the same content
+ADOPT_ATTEMPTS = 3
+
+
+class BlobStore:
+    def __init__(self, root: str = "uploads/blobs", backend: Optional[StorageBackend] = None):
+        self.root = Path(root)
+        self.backend = backend or storage
+
+    def key_for(self, tenant_id: uuid.UUID, sha256: str, suffix: str = "") -> str:
+        unique = uuid.uuid4().hex[:8]
+        return (self.root / str(tenant_id) / sha256[:2] / f"{sha256}-{unique}{suffix}").as_posix()
+
+    def store_fileobj(
+        self,
+        db: Session,
+        tenant_id: uuid.UUID,
+        fileobj: BinaryIO,
+        suffix: str = ""
+    ) -> StoredBlob:
+        """
+        Stream a file into the store and add a reference to its blob.
+        If the tenant already holds the same content, the new copy is
+        discarded and the existing blob is returned.
+        """
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = tmp_dir / f"{uuid.uuid4()}.part"
+
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with tmp_path.open("wb") as buffer:
+                for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    buffer.write(chunk)
+            return self._adopt(db, tenant_id, tmp_path, digest.hexdigest(), size, suffix)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def adopt_upload(self, db: Session, tenant_id: uuid.UUID, received: ReceivedUpload) -> StoredBlob:
+        """Add a reference to the blob for a file received by the upload sink"""
+        try:
+            return self._adopt(db, tenant_id, received.path, received.sha256, received.size, received.extension)
+        finally:
+            received.cleanup()
+
+    def _adopt(
+        self,
+        db: Session,
+        tenant_id: uuid.UUID,
+        tmp_path: Path,
+        sha256: str,
+        size: int,
+        suffix: str
+    ) -> StoredBlob:
+        """Move a fully written temp file into place (unless already stored) and take a reference"""
+        key = None  # our copy in the backend, once put
+        for _ in range(ADOPT_ATTEMPTS):
+            blob = self._get_for_update(db, tenant_id, sha256)
+            if blob is not None:
+                break
+            if key is None:
+                key = self.key_for(tenant_id, sha256, suffix)
+                self.backend.put_file(str(tmp_path), key)
+            try:
+                with db.begin_nested():
+                    blob = StoredBlob(
+                        tenant_id=tenant_id,
+                        sha256=sha256,
+                        size=size,
+                        storage_path=key,
+                        ref_count=0
+                    )
+                    db.add(blob)
+                break
+            except IntegrityError:
+                # A concurrent upload of the same content won the insert. Its
+                # row is not necessarily visible yet (or still there), so look
+                # again and insert again if it is missing.
+                blob = None
+        else:
+            self._delete_file(key)
+            raise RuntimeError(
+                f"Could not store blob {sha256} for tenant {tenant_id}: "
+                f"the insert conflicted {ADOPT_ATTEMPTS} times"
+            )
+
+        if key is not None and blob.storage_path != key:
+            # Another upload's row won; nothing references our copy
+            self._delete_file(key)
+        elif key is None and not self.backend.exists(blob.storage_path):
+            # Row survived but the file was lost; restore it from this upload
+            self.backend.put_file(str(tmp_path), blob.storage_path)
+
+        # The row is locked, so the count read with it is current
+        blob.ref_count += 1
+        db.flush()
+        return blob
+
+    def get(self, db: Session, tenant_id: uuid.UUID, sha256: str) -> Optional[StoredBlob]:
+        return db.query(StoredBlob).filter(
+            StoredBlob.tenant_id == tenant_id,
+            StoredBlob.sha256 == sha256
+        ).first()
+
+    def _get_for_update(self, db: Session, tenant_id: uuid.UUID, sha256: str) -> Optional[StoredBlob]:
+        """The blob row, locked until the transaction ends and refreshed from the locked read"""
+        return db.query(StoredBlob).filter(
+            StoredBlob.tenant_id == tenant_id,
+            StoredBlob.sha256 == sha256
+        ).with_for_update().populate_existing().first()
+
+    def release(self, db: Session, tenant_id: uuid.UUID, sha256: str) -> None:
+        """Drop one reference; when none remain, delete the row and, after commit, the file"""
+        blob = self._get_for_update(db, tenant_id, sha256)
+        if blob is None:
+            return
+        if blob.ref_count > 1:
+            blob.ref_count -= 1
+        else:
+            db.delete(blob)
+            _delete_after_commit(db, self.backend, blob.storage_path)
+        db.flush()
+
+    def _delete_file(self, key: str) -> None:
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            logger.warning(f"Could not delete blob file {key}: {e}")
+
+
+def _delete_after_commit(session: Session, backend: StorageBackend, key: str) -> None:
+    """Remove the file when the session commits; a rollback of the (sub)transaction keeps it"""
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    pending: List[Tuple[object, StorageBackend, str]] = session.info.setdefault("blob_store_deleted", [])
+    pending.append((transaction, backend, key))
+
+
+def _within(transaction, ancestor) -> bool:
+    while transaction is not None:
+        if transaction is ancestor:
+            return True
+        transaction = transaction.parent
+    return False
+
+
+@event.listens_for(Session, "after_commit")
+def _delete_released_files(session):
+    # Also fires when a savepoint is released; wait for the real commit
+    if session.in_nested_transaction():
+        return
+    for _, backend, key in session.info.pop("blob_store_deleted", ()):
+        try:
+            backend.delete(key)
+        except Exception as e:
+            logger.warning(f"Could not delete blob file {key}: {e}")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _keep_released_files(session, previous_transaction):
+    pending = session.info.get("blob_store_deleted")
+    if pending:
+        pending[:] = [entry for entry in pending if not _within(entry[0], previous_transaction)]
+
+
+blob_store = BlobStore()
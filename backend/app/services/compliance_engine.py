@@ -0,0 +1,302 @@
+"""
+Rule-driven compliance checks.
+
+Each ComplianceRule declares the alert it raises and compiles to one
+set-based SELECT over every company of a tenant, returning a row per
+finding: the company, the subject the finding is about (a period, a
+balance sheet, a report, a tax type) and the values its message names.
+check_tenant runs every rule for a tenant and upserts the findings as
+fingerprinted alerts (app/services/alert_dedup.py), so a finding that is
+still open counts another occurrence instead of a duplicate alert.
+
+Scans are sharded by tenant: scan_shard checks the tenants with
+tenant_shard(tenant_id, shards) == shard, committing per tenant, so
+shards can run in separate processes or hosts. Each checked tenant's
+compliance score counters are then rebuilt from its alerts, correcting
+any drift in the incrementally maintained counts. scan_all runs the
+nightly full scan over COMPLIANCE_SCAN_WORKERS processes, holding an
+advisory lock so only one full scan runs at a time however many API
+processes schedule it; a single shard can also be run from the command
+line:
+
+    python -m app.services.compliance_engine --shard 0 --shards 4
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, case, exists, func, literal, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.db import locks
+from app.db.models.alert import AlertSeverity
+from app.db.models.balance_sheet import BalanceSheet, BalanceSheetCategory, BalanceSheetItem, BalanceSheetStatus
+from app.db.models.company import Company
+from app.db.models.report import Report
+from app.db.models.report_analysis import ReportAnalysis
+from app.db.models.tax_rate import TaxRate
+from app.db.models.tenant import Tenant
+from app.db.session import SessionLocal, engine
+from app.services.alert_dedup import raise_alerts
+from app.services.compliance_score import rebuild_tenant_scores, regulation_key_index
+
+logger = logging.getLogger(__name__)
+
+# Tolerance for rounding when comparing balance sheet totals
+BALANCE_TOLERANCE = 0.01
+
+
+@dataclass(frozen=True)
+class ComplianceRule:
+    name: str
+    severity: AlertSeverity
+    regulation: str
+    # Formatted with the columns of each finding
+    message: str
+    notes: str
+    # (tenant_id, today) -> SELECT of company_id, subject and the message columns
+    findings: Callable[[uuid.UUID, date], Select]
+
+
+def last_closed_quarter(today: date) -> Tuple[date, date, str]:
+    """Start, end (exclusive) and label of the last quarter that ended before today"""
+    quarter = (today.month - 1) // 3
+    year = today.year
+    if quarter == 0:
+        quarter, year = 4, year - 1
+    start = date(year, 3 * (quarter - 1) + 1, 1)
+    end = date(year + 1, 1, 1) if quarter == 4 else date(year, 3 * quarter + 1, 1)
+    return start, end, f"{year}-Q{quarter}"
+
+
+def _missing_balance_sheets(tenant_id: uuid.UUID, today: date) -> Select:
+    start, end, label = last_closed_quarter(today)
+    return select(Company.id.label("company_id"), literal(label).label("subject")).where(
+        Company.tenant_id == tenant_id,
+        or_(Company.is_active.is_(None), Company.is_active.is_(True)),
+        ~exists().where(
+            BalanceSheet.company_id == Company.id,
+            BalanceSheet.period >= datetime.combine(start, time.min),
+            BalanceSheet.period < datetime.combine(end, time.min),
+        ),
+    )
+
+
+def _unbalanced_balance_sheets(tenant_id: uuid.UUID, today: date) -> Select:
+    def total(*categories):
+        return func.coalesce(func.sum(case(
+            (BalanceSheetItem.category.in_(categories), BalanceSheetItem.amount), else_=0
+        )), 0)
+
+    assets = total(BalanceSheetCategory.ASSETS)
+    liabilities_and_equity = total(BalanceSheetCategory.LIABILITIES, BalanceSheetCategory.EQUITY)
+    return (
+        select(
+            BalanceSheet.company_id, BalanceSheet.id.label("subject"), BalanceSheet.period,
+            assets.label("assets"), liabilities_and_equity.label("liabilities_and_equity"),
+        )
+        .join(Company, Company.id == BalanceSheet.company_id)
+        .join(BalanceSheetItem, BalanceSheetItem.balance_sheet_id == BalanceSheet.id)
+        .where(Company.tenant_id == tenant_id, BalanceSheet.status != BalanceSheetStatus.DRAFT)
+        .group_by(BalanceSheet.id, BalanceSheet.company_id, BalanceSheet.period)
+        .having(func.abs(assets - liabilities_and_equity) > BALANCE_TOLERANCE)
+    )
+
+
+def _overdue_reports(tenant_id: uuid.UUID, today: date) -> Select:
+    due = datetime.combine(today, time.min, tzinfo=timezone.utc) - timedelta(days=settings.COMPLIANCE_REPORT_OVERDUE_DAYS)
+    return select(Report.company_id, Report.id.label("subject"), Report.title).where(
+        Report.tenant_id == tenant_id,
+        Report.status == "draft",
+        Report.created_at < due,
+    )
+
+
+def _expired_tax_rates(tenant_id: uuid.UUID, today: date) -> Select:
+    # Countries each company has had reports analyzed for
+    countries = (
+        select(Report.company_id, ReportAnalysis.country_code)
+        .join(Report, Report.id == ReportAnalysis.report_id)
+        .where(Report.tenant_id == tenant_id)
+        .distinct()
+        .subquery()
+    )
+    current = aliased(TaxRate)
+    # Tax types whose latest rate ended with no rate in force today
+    expired = (
+        select(TaxRate.country_code, TaxRate.tax_type, func.max(TaxRate.effective_to).label("expired_on"))
+        .where(
+            TaxRate.effective_to < today,
+            ~exists().where(
+                current.country_code == TaxRate.country_code,
+                current.tax_type == TaxRate.tax_type,
+                current.effective_from <= today,
+                or_(current.effective_to.is_(None), current.effective_to >= today),
+            ),
+        )
+        .group_by(TaxRate.country_code, TaxRate.tax_type)
+        .subquery()
+    )
+    return select(
+        countries.c.company_id,
+        (expired.c.country_code + ":" + expired.c.tax_type).label("subject"),
+        expired.c.country_code, expired.c.tax_type, expired.c.expired_on,
+    ).join(expired, expired.c.country_code == countries.c.country_code)
+
+
+def _low_analysis_scores(tenant_id: uuid.UUID, today: date) -> Select:
+    latest = (
+        select(ReportAnalysis.report_id, func.max(ReportAnalysis.created_at).label("created_at"))
+        .join(Report, Report.id == ReportAnalysis.report_id)
+        .where(Report.tenant_id == tenant_id)
+        .group_by(ReportAnalysis.report_id)
+        .subquery()
+    )
+    return (
+        select(Report.company_id, Report.id.label("subject"), Report.title, ReportAnalysis.overall_score.label("score"))
+        .join(ReportAnalysis, ReportAnalysis.report_id == Report.id)
+        .join(latest, and_(
+            latest.c.report_id == ReportAnalysis.report_id, latest.c.created_at == ReportAnalysis.created_at
+        ))
+        .where(Report.tenant_id == tenant_id, ReportAnalysis.overall_score < settings.COMPLIANCE_MIN_ANALYSIS_SCORE)
+    )
+
+
+RULES: Sequence[ComplianceRule] = (
+    ComplianceRule(
+        name="missing_balance_sheet",
+        severity=AlertSeverity.CRITICAL,
+        regulation="IFRS IAS 1",
+        message="Missing balance sheet for {subject}",
+        notes="Financial statements must be presented for every reporting period.",
+        findings=_missing_balance_sheets,
+    ),
+    ComplianceRule(
+        name="unbalanced_balance_sheet",
+        severity=AlertSeverity.HIGH,
+        regulation="IFRS IAS 1",
+        message="Balance sheet for {period:%Y-%m-%d} does not balance: assets {assets} vs liabilities and equity {liabilities_and_equity}",
+        notes="Total assets must equal total liabilities plus equity.",
+        findings=_unbalanced_balance_sheets,
+    ),
+    ComplianceRule(
+        name="overdue_report",
+        severity=AlertSeverity.MEDIUM,
+        regulation="SOX Section 404",
+        message="Report '{title}' is overdue for submission",
+        notes="Draft reports must be submitted for review on time.",
+        findings=_overdue_reports,
+    ),
+    ComplianceRule(
+        name="expired_tax_rate",
+        severity=AlertSeverity.MEDIUM,
+        regulation="Tax Code",
+        message="No {tax_type} tax rate in force for {country_code} since {expired_on}",
+        notes="Analyses for this country use an expired tax rate until a current one is published.",
+        findings=_expired_tax_rates,
+    ),
+    ComplianceRule(
+        name="low_analysis_score",
+        severity=AlertSeverity.HIGH,
+        regulation="Tax Code",
+        message="Report '{title}' scored {score} in its latest compliance analysis",
+        notes="The latest analysis of this report is below the required compliance score.",
+        findings=_low_analysis_scores,
+    ),
+)
+
+
+def check_tenant(db: Session, tenant_id: uuid.UUID, today: Optional[date] = None,
+                 rules: Sequence[ComplianceRule] = RULES) -> Dict[str, Dict[str, int]]:
+    """
+    Evaluate the rules for every company of the tenant, one statement per
+    rule, and raise alerts for the findings. Returns findings and new
+    alerts per rule. The caller commits.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    results = {}
+    for rule in rules:
+        alerts = [
+            dict(
+                tenant_id=tenant_id,
+                company_id=finding.company_id,
+                regulation=rule.regulation,
+                rule=rule.name,
+                subject=finding.subject,
+                severity=rule.severity,
+                message=rule.message.format(**finding._mapping),
+                notes=rule.notes,
+            )
+            for finding in db.execute(rule.findings(tenant_id, today))
+        ]
+        results[rule.name] = {"findings": len(alerts), "new_alerts": raise_alerts(db, alerts)}
+    return results
+
+
+def tenant_shard(tenant_id: uuid.UUID, shards: int) -> int:
+    return tenant_id.int % shards
+
+
+def scan_shard(shard: int = 0, shards: int = 1, session_factory: Callable[[], Session] = SessionLocal) -> int:
+    """
+    Check every tenant in the shard and recount its compliance score,
+    committing per tenant. Returns the number of new alerts.
+    """
+    db = session_factory()
+    new_alerts = 0
+    try:
+        regulation_key_index.load(db)
+        tenant_ids = db.execute(select(Tenant.id)).scalars().all()
+        for tenant_id in tenant_ids:
+            if tenant_shard(tenant_id, shards) != shard:
+                continue
+            try:
+                results = check_tenant(db, tenant_id)
+                rebuild_tenant_scores(db, tenant_id, reload_index=False)
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception(f"Compliance check failed for tenant {tenant_id}")
+                continue
+            new_alerts += sum(result["new_alerts"] for result in results.values())
+    finally:
+        db.close()
+    return new_alerts
+
+
+def scan_all(workers: int = 0) -> int:
+    """
+    Check every tenant, one shard per worker process. Returns the number
+    of new alerts, or 0 when a scan started by another process (e.g.
+    another API replica's scheduler) is still running.
+    """
+    workers = workers or settings.COMPLIANCE_SCAN_WORKERS or os.cpu_count() or 1
+    with locks.try_lock(engine, locks.COMPLIANCE_SCAN) as acquired:
+        if not acquired:
+            logger.info("Compliance scan already running elsewhere, skipped")
+            return 0
+        if workers == 1:
+            new_alerts = scan_shard()
+        else:
+            # Spawned workers start clean: no connections, threads or locks
+            # inherited from the API process
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                new_alerts = sum(pool.map(scan_shard, range(workers), [workers] * workers))
+    logger.info(f"Compliance scan completed: {new_alerts} new alerts")
+    return new_alerts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the compliance checks for one shard of the tenants")
+    parser.add_argument("--shard", type=int, default=0)
+    parser.add_argument("--shards", type=int, default=1)
+    args = parser.parse_args()
+    print(f"New alerts: {scan_shard(args.shard, args.shards)}")
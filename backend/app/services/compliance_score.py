@@ -0,0 +1,351 @@
+"""
+Incrementally maintained compliance score.
+
+Alerts name the regulation they concern as free text ("IFRS IAS 1",
+"gdpr"). RegulationKeyIndex maps normalized regulation codes and titles
+to their category, in memory; an alert's category is resolved through it
+when the alert is written and stored on the row.
+
+ComplianceScoreCounter holds each tenant's alert counts per (category,
+severity, status). Session flush events adjust them in the same
+transaction as every ORM insert, update or delete of an alert, so the
+score is computed from a handful of counter rows and the category totals
+of the index instead of scanning alerts and regulations.
+
+Counters of a tenant without a ComplianceScoreState row are rebuilt from
+the alerts on first read (e.g. after the migration). Bulk UPDATE/DELETE
+statements on alerts bypass the flush events: a bulk status change calls
+count_status_change first, alerts inserted by a statement call
+count_inserted_alerts; anything else, and regulation category changes,
+need rebuild_tenant_scores. The nightly compliance scan also rebuilds
+every tenant it checks, so counters that drifted are corrected.
+
+Writers of a tenant's counters hold a per-tenant advisory lock (on
+Postgres) until their transaction ends, taken before any alert row is
+written: a rebuild cannot interleave with increments, and a status
+count cannot be computed from rows another transaction is changing.
+"""
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, attributes
+
+from app.core.config import settings
+from app.db import counters, locks
+from app.db.models.alert import Alert, AlertStatus
+from app.db.models.compliance_score import ComplianceScoreCounter, ComplianceScoreState
+from app.db.models.regulation import Regulation
+
+SEVERITIES = ("critical", "high", "medium", "low")
+ACTIVE_STATUSES = (AlertStatus.OPEN.value, AlertStatus.IN_PROGRESS.value)
+# Penalty points per active alert; one critical alert per regulation scores 0
+SEVERITY_WEIGHTS = {"critical": 10, "high": 5, "medium": 2, "low": 1}
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_regulation_key(value: Optional[str]) -> str:
+    """Lowercase words separated by single spaces: "IFRS-9" -> "ifrs 9" """
+    if not value:
+        return ""
+    return _NON_WORD.sub(" ", value.lower()).strip()
+
+
+class RegulationKeyIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._categories: Dict[str, str] = {}
+        self._partial_keys: List[str] = []
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._category_totals: Dict[str, int] = {}
+        self.total_regulations = 0
+        self._loaded_at: Optional[float] = None
+
+    def load(self, db: Session) -> None:
+        """(Re)build the index from the regulation codes, titles and categories"""
+        categories: Dict[str, str] = {}
+        totals: Counter = Counter()
+        total = 0
+        for code, title, category in db.execute(select(Regulation.code, Regulation.title, Regulation.category)):
+            total += 1
+            if not category:
+                continue
+            totals[category] += 1
+            for key in (normalize_regulation_key(code), normalize_regulation_key(title)):
+                if key:
+                    categories.setdefault(key, category)
+
+        with self._lock:
+            self._categories = categories
+            # Partial matches prefer the most specific (longest) key
+            self._partial_keys = sorted(categories, key=lambda k: (-len(k), k))
+            self._resolved = {}
+            self._category_totals = dict(totals)
+            self.total_regulations = total
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Load the index if it is empty or older than the configured TTL"""
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > settings.REGULATION_KEY_INDEX_TTL_SECONDS:
+            self.load(db)
+
+    def invalidate(self) -> None:
+        """Force a reload on next use"""
+        with self._lock:
+            self._loaded_at = None
+
+    def category_for(self, regulation: Optional[str]) -> Optional[str]:
+        """Category of the regulation an alert names: exact key match, then partial"""
+        key = normalize_regulation_key(regulation)
+        if not key:
+            return None
+        if key in self._resolved:
+            return self._resolved[key]
+
+        category = self._categories.get(key)
+        if category is None:
+            for candidate in self._partial_keys:
+                if candidate in key or key in candidate:
+                    category = self._categories[candidate]
+                    break
+        with self._lock:
+            self._resolved[key] = category
+        return category
+
+    def category_totals(self) -> Dict[str, int]:
+        return dict(self._category_totals)
+
+
+regulation_key_index = RegulationKeyIndex()
+
+
+def _value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+
+def _counter_key(tenant_id, category, severity, status) -> Tuple:
+    return tenant_id, category or "", _value(severity), _value(status)
+
+
+def _previous_key(alert: Alert) -> Tuple:
+    return _counter_key(*(counters.previous_value(alert, name) for name in ("tenant_id", "category", "severity", "status")))
+
+
+def _upsert_counter(connection, key: Tuple, delta: int) -> None:
+    tenant_id, category, severity, status = key
+    counters.increment(
+        connection, ComplianceScoreCounter,
+        dict(tenant_id=tenant_id, category=category, severity=severity, status=status),
+        dict(count=delta),
+        id=uuid.uuid4(),
+    )
+
+
+def lock_tenant_scores(connection, tenant_ids: Iterable[Optional[uuid.UUID]]) -> None:
+    """
+    Hold the tenants' counter locks until the transaction ends. Taken in
+    key order so concurrent writers queue instead of deadlocking.
+    """
+    keys = {locks.lock_key(tenant_id) for tenant_id in tenant_ids if tenant_id is not None}
+    for key in sorted(keys):
+        locks.xact_lock(connection, locks.COMPLIANCE_SCORE_COUNTERS, key)
+
+
+@event.listens_for(Session, "before_flush")
+def _lock_alert_tenants(session, flush_context, instances):
+    tenant_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Alert):
+            tenant_ids.update((obj.tenant_id, counters.previous_value(obj, "tenant_id")))
+    if tenant_ids - {None}:
+        lock_tenant_scores(session.connection(), tenant_ids)
+
+
+@event.listens_for(Session, "before_flush")
+def _categorize_alerts(session, flush_context, instances):
+    alerts = [
+        obj for obj in session.new
+        if isinstance(obj, Alert) and obj.category is None
+    ] + [
+        obj for obj in session.dirty
+        if isinstance(obj, Alert) and attributes.get_history(obj, "regulation").has_changes()
+    ]
+    if not alerts:
+        return
+    with session.no_autoflush:
+        regulation_key_index.ensure_loaded(session)
+    for alert in alerts:
+        alert.category = regulation_key_index.category_for(alert.regulation)
+
+
+@event.listens_for(Session, "after_flush")
+def _count_alerts(session, flush_context):
+    deltas: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, Alert):
+            deltas[_counter_key(obj.tenant_id, obj.category, obj.severity, obj.status)] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Alert):
+            deltas[_previous_key(obj)] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, Alert) and obj not in session.deleted:
+            before = _previous_key(obj)
+            after = _counter_key(obj.tenant_id, obj.category, obj.severity, obj.status)
+            if before != after:
+                deltas[before] -= 1
+                deltas[after] += 1
+
+    connection = None
+    for key, delta in deltas.items():
+        if delta and key[0] is not None:
+            connection = connection or session.connection()
+            _upsert_counter(connection, key, delta)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_regulation_keys(session, flush_context):
+    # Other workers pick up regulation changes within the TTL
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Regulation):
+            regulation_key_index.invalidate()
+            return
+
+
+def rebuild_tenant_scores(db: Session, tenant_id: uuid.UUID, reload_index: bool = True) -> None:
+    """
+    Re-resolve the categories of a tenant's alerts and recount its
+    counters from scratch. The caller commits. Pass reload_index=False
+    when rebuilding many tenants after loading regulation_key_index once.
+    """
+    lock_tenant_scores(db.connection(), [tenant_id])
+    if reload_index:
+        regulation_key_index.load(db)
+
+    regulations = db.execute(select(Alert.regulation).where(Alert.tenant_id == tenant_id).distinct()).scalars().all()
+    for regulation in regulations:
+        db.execute(
+            update(Alert)
+            .where(Alert.tenant_id == tenant_id, Alert.regulation == regulation)
+            .values(category=regulation_key_index.category_for(regulation))
+            .execution_options(synchronize_session=False)
+        )
+
+    db.query(ComplianceScoreCounter).filter(ComplianceScoreCounter.tenant_id == tenant_id).delete(
+        synchronize_session=False
+    )
+    counts = db.execute(
+        select(Alert.category, Alert.severity, Alert.status, func.count())
+        .where(Alert.tenant_id == tenant_id)
+        .group_by(Alert.category, Alert.severity, Alert.status)
+    ).all()
+    for category, severity, status, count in counts:
+        db.add(ComplianceScoreCounter(
+            tenant_id=tenant_id, category=category or "",
+            severity=_value(severity), status=_value(status), count=count,
+        ))
+
+    state = db.get(ComplianceScoreState, tenant_id)
+    if state is None:
+        db.add(ComplianceScoreState(tenant_id=tenant_id, rebuilt_at=datetime.utcnow()))
+    else:
+        state.rebuilt_at = datetime.utcnow()
+    db.flush()
+    # The alerts were updated in SQL; reload any held by the session
+    db.expire_all()
+
+
+def count_status_change(db: Session, tenant_id: uuid.UUID, condition, status: AlertStatus) -> None:
+    """
+    Move the counts of the tenant's alerts matching condition to status,
+    ahead of the bulk UPDATE that sets it, in the same transaction
+    """
+    lock_tenant_scores(db.connection(), [tenant_id])
+    groups = db.execute(
+        select(Alert.category, Alert.severity, Alert.status, func.count())
+        .where(Alert.tenant_id == tenant_id, condition, Alert.status != status)
+        .group_by(Alert.category, Alert.severity, Alert.status)
+    ).all()
+    connection = db.connection()
+    for category, severity, previous_status, count in groups:
+        _upsert_counter(connection, _counter_key(tenant_id, category, severity, previous_status), -count)
+        _upsert_counter(connection, _counter_key(tenant_id, category, severity, status), count)
+
+
+def count_inserted_alerts(db: Session, tenant_id: uuid.UUID, category: Optional[str], severity, status,
+                          count: int) -> None:
+    """Count alerts inserted by a statement instead of through the session"""
+    lock_tenant_scores(db.connection(), [tenant_id])
+    _upsert_counter(db.connection(), _counter_key(tenant_id, category, severity, status), count)
+
+
+def _score(alerts: Dict[str, int], total_regulations: int) -> float:
+    # Penalty relative to the number of regulations, so small categories
+    # with many alerts bottom out at 0 instead of going negative
+    if total_regulations == 0:
+        return 100.0
+    penalty_points = sum(SEVERITY_WEIGHTS[severity] * alerts[severity] for severity in SEVERITIES)
+    penalty_pct = penalty_points / (total_regulations * 10) * 100
+    return max(0.0, 100.0 - penalty_pct)
+
+
+def compliance_score(db: Session, tenant_id: Optional[uuid.UUID]) -> Dict[str, Any]:
+    """Overall and per-category score from the tenant's counters"""
+    if tenant_id is not None and db.get(ComplianceScoreState, tenant_id) is None:
+        rebuild_tenant_scores(db, tenant_id)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent request rebuilt the tenant first
+            db.rollback()
+    regulation_key_index.ensure_loaded(db)
+
+    category_totals = regulation_key_index.category_totals()
+    global_alerts = dict.fromkeys(SEVERITIES, 0)
+    status_counts = dict.fromkeys(ACTIVE_STATUSES, 0)
+    category_alerts = {category: dict.fromkeys(SEVERITIES, 0) for category in category_totals}
+
+    counters = db.execute(
+        select(ComplianceScoreCounter.category, ComplianceScoreCounter.severity,
+               ComplianceScoreCounter.status, ComplianceScoreCounter.count)
+        .where(
+            ComplianceScoreCounter.tenant_id == tenant_id,
+            ComplianceScoreCounter.status.in_(ACTIVE_STATUSES),
+            ComplianceScoreCounter.count != 0,
+        )
+    ).all()
+    for category, severity, status, count in counters:
+        if severity in global_alerts:
+            global_alerts[severity] += count
+        status_counts[status] += count
+        if category in category_alerts and severity in global_alerts:
+            category_alerts[category][severity] += count
+
+    category_scores = {
+        category: {
+            "total_regulations": total,
+            "open_alerts": sum(category_alerts[category].values()),
+            "score": round(_score(category_alerts[category], total), 1),
+        }
+        for category, total in category_totals.items()
+    }
+
+    return {
+        "overall_score": round(_score(global_alerts, regulation_key_index.total_regulations), 1),
+        "total_regulations": regulation_key_index.total_regulations,
+        "alerts": {
+            **global_alerts,
+            "total": sum(global_alerts.values()),
+            "open": status_counts[AlertStatus.OPEN.value],
+            "in_progress": status_counts[AlertStatus.IN_PROGRESS.value],
+        },
+        "category_scores": category_scores,
+        "trend": "stable",
+    }
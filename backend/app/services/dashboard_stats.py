@@ -0,0 +1,154 @@
+"""
+Dashboard statistics for alerts and audit logs.
+
+Each set of statistics is one aggregate statement with conditional
+counts (COUNT(CASE WHEN ... THEN 1 END)) over the tenant's rows, served
+by the (tenant_id, ...) indexes. Results are cached per tenant for
+DASHBOARD_STATS_TTL_SECONDS. Committed ORM writes to Alert or AuditLog
+drop the tenant's entry in this process (bulk statements call
+mark_written); other workers see them once the TTL expires.
+"""
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import case, distinct, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.alert import Alert, AlertSeverity, AlertStatus
+from app.db.models.audit_log import AuditLog
+
+ALERT_STATS = "alerts"
+AUDIT_STATS = "audit_logs"
+
+CRITICAL_ACTIONS = ("delete", "permission_change", "role_change")
+
+
+class TenantStatsCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Any], Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, name: str, tenant_id: Any) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get((name, tenant_id))
+        if entry is None or time.monotonic() - entry[0] > settings.DASHBOARD_STATS_TTL_SECONDS:
+            return None
+        return dict(entry[1])
+
+    def set(self, name: str, tenant_id: Any, stats: Dict[str, Any]) -> None:
+        if settings.DASHBOARD_STATS_TTL_SECONDS <= 0:
+            return
+        with self._lock:
+            self._entries[(name, tenant_id)] = (time.monotonic(), dict(stats))
+
+    def invalidate(self, name: str, tenant_id: Any) -> None:
+        with self._lock:
+            self._entries.pop((name, tenant_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+stats_cache = TenantStatsCache()
+
+_CACHED_MODELS: Dict[type, str] = {Alert: ALERT_STATS, AuditLog: AUDIT_STATS}
+
+
+def mark_written(session: Session, name: str, tenant_id: Any) -> None:
+    """Drop the tenant's cached stats when the session commits"""
+    written: Set[Tuple[str, Any]] = session.info.setdefault("dashboard_stats_written", set())
+    written.add((name, tenant_id))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_tenants(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        name = _CACHED_MODELS.get(type(obj))
+        if name is not None:
+            mark_written(session, name, obj.tenant_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_written_tenants(session):
+    # After the commit, so a concurrent read can't re-cache the old values
+    for name, tenant_id in session.info.pop("dashboard_stats_written", ()):
+        stats_cache.invalidate(name, tenant_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_written_tenants(session, previous_transaction):
+    session.info.pop("dashboard_stats_written", None)
+
+
+def _count_if(condition):
+    return func.count(case((condition, 1)))
+
+
+def alert_stats_statement(tenant_id: uuid.UUID):
+    return select(
+        func.count(Alert.id).label("total"),
+        _count_if(Alert.severity == AlertSeverity.CRITICAL).label("critical"),
+        _count_if(Alert.severity == AlertSeverity.HIGH).label("high"),
+        _count_if(Alert.severity == AlertSeverity.MEDIUM).label("medium"),
+        _count_if(Alert.severity == AlertSeverity.LOW).label("low"),
+        _count_if(Alert.status == AlertStatus.OPEN).label("open"),
+        _count_if(Alert.status == AlertStatus.IN_PROGRESS).label("in_progress"),
+        _count_if(Alert.status == AlertStatus.RESOLVED).label("resolved"),
+        _count_if(Alert.status == AlertStatus.DISMISSED).label("dismissed"),
+    ).where(Alert.tenant_id == tenant_id)
+
+
+def _with_alert_score(stats: Dict[str, Any]) -> Dict[str, Any]:
+    # Score = (resolved + dismissed) / total * 100, penalize critical/high
+    total = stats["total"]
+    if total > 0:
+        resolved_rate = (stats["resolved"] + stats["dismissed"]) / total
+        critical_penalty = (stats["critical"] * 0.3) / total
+        high_penalty = (stats["high"] * 0.15) / total
+        score = max(0, min(100, (resolved_rate * 100) - (critical_penalty * 100) - (high_penalty * 100)))
+    else:
+        score = 100.0
+    return {**stats, "compliance_score": round(score, 1)}
+
+
+async def alert_stats(db: AsyncSession, tenant_id: uuid.UUID) -> Dict[str, Any]:
+    """Alert counts by severity and status, and the resolution score"""
+    cached = stats_cache.get(ALERT_STATS, tenant_id)
+    if cached is not None:
+        return cached
+    row = (await db.execute(alert_stats_statement(tenant_id))).one()
+    stats = _with_alert_score(dict(row._mapping))
+    stats_cache.set(ALERT_STATS, tenant_id, stats)
+    return stats
+
+
+def audit_stats_statement(tenant_id: uuid.UUID, now: datetime):
+    today_start = datetime.combine(now.date(), datetime.min.time())
+    active_since = now - timedelta(hours=24)
+    critical_since = now - timedelta(days=30)
+    return select(
+        func.count(AuditLog.id).label("total_actions"),
+        _count_if(AuditLog.timestamp >= today_start).label("today_actions"),
+        # Users who performed actions in the last 24 hours
+        func.count(distinct(case((AuditLog.timestamp >= active_since, AuditLog.user_id)))).label("active_users"),
+        # Deletes and permission changes in the last 30 days
+        _count_if(
+            AuditLog.action.in_(CRITICAL_ACTIONS) & (AuditLog.timestamp >= critical_since)
+        ).label("critical_actions"),
+    ).where(AuditLog.tenant_id == tenant_id)
+
+
+def audit_stats(db: Session, tenant_id: uuid.UUID) -> Dict[str, Any]:
+    """Audit log activity totals for the dashboard"""
+    cached = stats_cache.get(AUDIT_STATS, tenant_id)
+    if cached is not None:
+        return cached
+    row = db.execute(audit_stats_statement(tenant_id, datetime.utcnow())).one()
+    stats = dict(row._mapping)
+    stats_cache.set(AUDIT_STATS, tenant_id, stats)
+    return stats
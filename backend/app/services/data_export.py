@@ -0,0 +1,435 @@
+"""
+Bulk data export for BI extracts.
+
+Each exportable resource declares its columns, how to scope it to the
+requesting user and a change-time "watermark" column. Rows are streamed
+in (watermark, id) order from a server-side cursor (yield_per), projected
+to the requested columns, as CSV, NDJSON or Parquet.
+
+Pulls are resumable: every export returns an opaque cursor for the last
+row it covers, and passing it back returns only rows changed since. The
+end of a pull is fixed before streaming starts, so the cursor can be
+sent as a response header. Deleted rows are not reported.
+"""
+import base64
+import csv
+import enum
+import io
+import itertools
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, types
+from sqlalchemy.orm import Query, Session
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from app.db.models.alert import Alert
+from app.db.models.audit_log import AuditLog
+from app.db.models.balance_sheet import BalanceSheet, BalanceSheetItem
+from app.db.models.report import Report
+from app.db.models.user import User
+
+EXPORT_BATCH_SIZE = 1000
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+CURSOR_VERSION = 1
+
+Position = Tuple[datetime, uuid.UUID]
+
+
+class ExportError(ValueError):
+    """Invalid export request (unknown column, bad cursor, ...)"""
+
+
+@dataclass(frozen=True)
+class ExportResource:
+    name: str
+    model: Any
+    columns: Dict[str, Any]
+    # Change time used for incremental pulls
+    watermark: Any
+    scope: Callable[[Query, User], Query]
+    admin_only: bool = False
+
+
+def _scope_tenant(model) -> Callable[[Query, User], Query]:
+    def scope(query: Query, user: User) -> Query:
+        return query.filter(model.tenant_id == user.tenant_id)
+    return scope
+
+
+def _scope_reports(query: Query, user: User) -> Query:
+    # Same visibility rules as the reports API
+    if user.role in ["accountant", "auditor"]:
+        return query.filter(Report.submitted_by == user.id)
+    if user.role == "admin":
+        return query.filter(Report.company_id == user.company_id)
+    if user.role != "superadmin":
+        return query.filter(Report.tenant_id == user.tenant_id)
+    return query
+
+
+def _scope_balance_sheet_items(query: Query, user: User) -> Query:
+    query = query.join(BalanceSheet, BalanceSheetItem.balance_sheet_id == BalanceSheet.id)
+    if user.role != "superadmin":
+        query = query.filter(BalanceSheet.company_id == user.company_id)
+    return query
+
+
+def _columns(model, names: Sequence[str]) -> Dict[str, Any]:
+    return {name: getattr(model, name) for name in names}
+
+
+RESOURCES: Dict[str, ExportResource] = {
+    resource.name: resource
+    for resource in [
+        ExportResource(
+            name="alerts",
+            model=Alert,
+            columns=_columns(Alert, [
+                "id", "message", "severity", "status", "regulation", "notes", "resolution_notes",
+                "company_id", "created_by", "assigned_to", "created_at", "updated_at", "resolved_at",
+            ]),
+            watermark=func.coalesce(Alert.updated_at, Alert.created_at),
+            scope=_scope_tenant(Alert),
+        ),
+        ExportResource(
+            name="audit_logs",
+            model=AuditLog,
+            columns=_columns(AuditLog, [
+                "id", "user_id", "action", "resource_type", "resource_id", "details",
+                "ip_address", "user_agent", "success", "timestamp",
+            ]),
+            watermark=AuditLog.timestamp,
+            scope=_scope_tenant(AuditLog),
+            admin_only=True,
+        ),
+        ExportResource(
+            name="reports",
+            model=Report,
+            columns=_columns(Report, [
+                "id", "title", "description", "report_type", "status", "submitted_by", "reviewed_by",
+                "company_id", "file_name", "file_size", "content_hash", "submitted_at", "reviewed_at",
+                "created_at", "updated_at",
+            ]),
+            watermark=Report.updated_at,
+            scope=_scope_reports,
+        ),
+        ExportResource(
+            name="balance_sheet_items",
+            model=BalanceSheetItem,
+            columns={
+                **_columns(BalanceSheetItem, [
+                    "id", "balance_sheet_id", "account_code", "account_name", "amount",
+                    "category", "subcategory", "created_at",
+                ]),
+                "company_id": BalanceSheet.company_id,
+                "period": BalanceSheet.period,
+            },
+            watermark=BalanceSheetItem.created_at,
+            scope=_scope_balance_sheet_items,
+        ),
+    ]
+}
+
+
+def encode_cursor(resource: str, position: Position) -> str:
+    watermark, row_id = position
+    payload = {"v": CURSOR_VERSION, "r": resource, "w": watermark.isoformat(), "id": str(row_id)}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(resource: str, cursor: str) -> Position:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if payload["v"] != CURSOR_VERSION or payload["r"] != resource:
+            raise ValueError("cursor does not belong to this export")
+        return datetime.fromisoformat(payload["w"]), uuid.UUID(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ExportError(f"Invalid cursor: {e}")
+
+
+def resolve_columns(resource: ExportResource, columns: Optional[str]) -> List[str]:
+    if not columns:
+        return list(resource.columns)
+    names = [name.strip() for name in columns.split(",") if name.strip()]
+    unknown = [name for name in names if name not in resource.columns]
+    if unknown:
+        raise ExportError(
+            f"Unknown columns for {resource.name}: {', '.join(unknown)}. "
+            f"Available: {', '.join(resource.columns)}"
+        )
+    return names
+
+
+class ExportPlan:
+    """
+    A bounded slice of a resource: rows after `start` up to and including
+    `end`, both (watermark, id) positions. Build with plan_export.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        resource: ExportResource,
+        user: User,
+        column_names: List[str],
+        start: Optional[Position],
+        end: Optional[Position],
+    ):
+        self.db = db
+        self.resource = resource
+        self.user = user
+        self.column_names = column_names
+        self.start = start
+        self.end = end
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        position = self.end or self.start
+        return encode_cursor(self.resource.name, position) if position else None
+
+    def iter_rows(self) -> Iterator[tuple]:
+        """Yield projected row tuples in position order"""
+        if self.end is None:
+            return
+        resource = self.resource
+        query = self.db.query(
+            *[resource.columns[name] for name in self.column_names],
+            resource.watermark,
+            resource.model.id,
+        ).select_from(resource.model)
+        query = resource.scope(query, self.user)
+        query = _between(query, resource, self.start, self.end)
+        query = query.order_by(resource.watermark, resource.model.id)
+
+        width = len(self.column_names)
+        for row in query.yield_per(EXPORT_BATCH_SIZE):
+            position = (row[width], row[width + 1])
+            if self.start and not _position_after(position, self.start):
+                continue
+            if _position_after(position, self.end):
+                break
+            yield tuple(row[:width])
+
+
+def plan_export(
+    db: Session,
+    resource: ExportResource,
+    user: User,
+    columns: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> ExportPlan:
+    """Validate the request and fix the end position of this pull"""
+    column_names = resolve_columns(resource, columns)
+    start = decode_cursor(resource.name, cursor) if cursor else None
+
+    query = db.query(resource.watermark, resource.model.id).select_from(resource.model)
+    query = resource.scope(query, user)
+    query = _between(query, resource, start, None)
+    query = query.order_by(resource.watermark, resource.model.id)
+
+    end = None
+    if limit:
+        # Position of the limit-th row after the cursor
+        for row in query.yield_per(EXPORT_BATCH_SIZE):
+            position = (row[0], row[1])
+            if start and not _position_after(position, start):
+                continue
+            limit -= 1
+            end = position
+            if limit == 0:
+                break
+    else:
+        last = query.order_by(None).order_by(resource.watermark.desc(), resource.model.id.desc()).first()
+        if last and last[0] is not None and (not start or _position_after((last[0], last[1]), start)):
+            end = (last[0], last[1])
+
+    return ExportPlan(db, resource, user, column_names, start, end)
+
+
+def _between(query: Query, resource: ExportResource, start: Optional[Position], end: Optional[Position]) -> Query:
+    """
+    Coarse SQL range for (start, end]. Bounds are widened by a second and
+    refined in Python: SQLite stores server_default timestamps without
+    microseconds, so exact comparisons against bound datetimes misfire.
+    """
+    query = query.filter(resource.watermark.isnot(None))
+    if start:
+        query = query.filter(resource.watermark > start[0] - timedelta(seconds=1))
+    if end:
+        query = query.filter(resource.watermark < end[0] + timedelta(seconds=1))
+    return query
+
+
+def _position_after(position: Position, other: Position) -> bool:
+    (watermark, row_id), (other_watermark, other_id) = position, other
+    watermark, other_watermark = _comparable(watermark), _comparable(other_watermark)
+    if watermark != other_watermark:
+        return watermark > other_watermark
+    return uuid.UUID(str(row_id)) > uuid.UUID(str(other_id))
+
+
+def _comparable(value: datetime) -> datetime:
+    # Mixed naive/aware values can come back from SQLite; compare as naive UTC
+    if value.tzinfo is not None:
+        return value.replace(tzinfo=None) - value.utcoffset()
+    return value
+
+
+# Serialization
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def _batches(rows: Iterator[tuple]) -> Iterator[List[tuple]]:
+    while True:
+        batch = list(itertools.islice(rows, EXPORT_BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+def stream_csv(plan: ExportPlan) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(plan.column_names)
+    for batch in _batches(plan.iter_rows()):
+        writer.writerows([_plain(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def stream_ndjson(plan: ExportPlan) -> Iterator[bytes]:
+    names = plan.column_names
+    for batch in _batches(plan.iter_rows()):
+        yield "".join(
+            json.dumps(dict(zip(names, (_plain(value) for value in row)))) + "\n"
+            for row in batch
+        ).encode()
+
+
+class _ParquetSink:
+    """Write-only file object handing each written buffer back to the generator"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _arrow_type(column) -> Any:
+    column_type = column.type
+    if isinstance(column_type, types.DateTime):
+        return pa.timestamp("us", tz="UTC" if column_type.timezone else None)
+    if isinstance(column_type, types.Date):
+        return pa.date32()
+    if isinstance(column_type, types.Numeric) and not isinstance(column_type, (types.Float, types.Integer)):
+        return pa.decimal128(column_type.precision or 38, column_type.scale or 0)
+    if isinstance(column_type, types.Integer):
+        return pa.int64()
+    if isinstance(column_type, types.Boolean):
+        return pa.bool_()
+    return pa.string()
+
+
+def _arrow_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def stream_parquet(plan: ExportPlan) -> Iterator[bytes]:
+    """One row group per batch; each is sent as soon as it is written"""
+    schema = pa.schema([
+        (name, _arrow_type(plan.resource.columns[name])) for name in plan.column_names
+    ])
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in _batches(plan.iter_rows()):
+            columns = list(zip(*batch))
+            arrays = [
+                pa.array([_arrow_value(value) for value in values], type=field.type)
+                for values, field in zip(columns, schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+STREAMERS: Dict[str, Callable[[ExportPlan], Iterator[bytes]]] = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "parquet": stream_parquet,
+}
+
+
+def get_streamer(export_format: str) -> Callable[[ExportPlan], Iterator[bytes]]:
+    if export_format not in STREAMERS:
+        raise ExportError(f"Unsupported format {export_format!r}. Use one of: {', '.join(STREAMERS)}")
+    if export_format == "parquet" and pa is None:
+        raise ExportError("Parquet export requires pyarrow")
+    return STREAMERS[export_format]
@@ -5,18 +5,15 @@ from typing import Dict, Any, Optional
 from pathlib import Path
 import pytesseract
 from PIL import Image
-from PyPDF2 import PdfReader
-from pdf2image import convert_from_path
 import openai
 from app.core.config import settings
+from app.services.pdf_ocr import extract_pdf_text_with_ocr
 
 logger = logging.getLogger(__name__)
 
 class DocumentExtractionService:
     def __init__(self):
         openai.api_key = settings.OPENAI_API_KEY
-        self.upload_dir = Path("uploads/documents")
-        self.upload_dir.mkdir(parents=True, exist_ok=True)
     
     def extract_text_from_image(self, image_path: str) -> str:
         """Extract text from an image using OCR"""
@@ -29,23 +26,9 @@ class DocumentExtractionService:
             raise
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text from PDF (handles both text and scanned PDFs)"""
+        """Extract text from PDF (handles text, scanned and mixed PDFs page by page)"""
         try:
-            # Try text extraction first
-            reader = PdfReader(pdf_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            
-            # If no text found, use OCR
-            if len(text.strip()) < 50:
-                logger.info(f"PDF appears to be scanned, using OCR for {pdf_path}")
-                images = convert_from_path(pdf_path)
-                text = ""
-                for i, image in enumerate(images):
-                    text += pytesseract.image_to_string(image) + "\n"
-            
-            return text.strip()
+            return extract_pdf_text_with_ocr(pdf_path).strip()
         except Exception as e:
             logger.error(f"PDF extraction error for {pdf_path}: {str(e)}")
             raise
@@ -0,0 +1,234 @@
+"""
+Background worker pool for document extraction.
+
+Uploads only persist the file and a PENDING Document row; OCR and LLM
+extraction run here, off the API event loop. Status moves
+PENDING -> PROCESSING -> COMPLETED/ERROR and can be polled via
+GET /documents/{id}/status; the uploader is also notified when done.
+
+Several API processes can run workers against the same database. A
+worker claims a document atomically (PENDING -> PROCESSING with its
+worker id in claimed_by) and refreshes heartbeat_at while it works on
+it. Only documents whose heartbeat is older than
+DOCUMENT_EXTRACTION_LEASE_SECONDS are taken back, so a restarting or
+newly started process never takes over documents a live worker is
+still processing. Results are written only while the worker still holds
+the claim.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Set
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.document import Document, DocumentStatus
+from app.db.session import SessionLocal
+from app.services.document_extraction_service import DocumentExtractionService
+from app.services.notification_service import NotificationService
+from app.services.storage import storage
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class DocumentExtractionWorker:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active: Set[uuid.UUID] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.DOCUMENT_EXTRACTION_WORKERS,
+                thread_name_prefix="document-extraction"
+            )
+        return self._executor
+
+    def submit(self, document_id: uuid.UUID) -> None:
+        """Queue a PENDING document for extraction"""
+        self._get_executor().submit(self.process, document_id)
+
+    def process(self, document_id: uuid.UUID) -> None:
+        """Extract one document. Safe to call from any worker: the row is claimed atomically."""
+        db = self.session_factory()
+        try:
+            claimed = db.query(Document).filter(
+                Document.id == document_id,
+                Document.status == DocumentStatus.PENDING
+            ).update({
+                Document.status: DocumentStatus.PROCESSING,
+                Document.claimed_by: self.worker_id,
+                Document.heartbeat_at: _now(),
+            }, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                return
+
+            with self._lock:
+                self._active.add(document_id)
+            document = db.query(Document).filter(Document.id == document_id).first()
+            result = {Document.error_message: None, Document.extracted_data: None}
+            try:
+                extraction_service = DocumentExtractionService()
+                with storage.local_path(document.file_path) as local_file:
+                    extracted_data = extraction_service.process_document(
+                        local_file, document.document_type.value
+                    )
+
+                if "error" in extracted_data:
+                    status = DocumentStatus.ERROR
+                    result[Document.error_message] = extracted_data["error"]
+                else:
+                    status = DocumentStatus.COMPLETED
+                    result[Document.extracted_data] = json.dumps(extracted_data)
+                    result[Document.processed_at] = datetime.now()
+            except Exception as e:
+                logger.error(f"Extraction failed for document {document_id}: {e}")
+                status = DocumentStatus.ERROR
+                result[Document.error_message] = str(e)
+            finally:
+                with self._lock:
+                    self._active.discard(document_id)
+
+            written = db.query(Document).filter(
+                Document.id == document_id,
+                Document.claimed_by == self.worker_id
+            ).update({
+                **result,
+                Document.status: status,
+                Document.claimed_by: None,
+                Document.heartbeat_at: None,
+            }, synchronize_session=False)
+            db.commit()
+            if not written:
+                logger.warning(f"Lost the claim on document {document_id}; result discarded")
+                return
+
+            NotificationService.create_notification(
+                user_id=document.uploaded_by,
+                title="Document Processed" if status == DocumentStatus.COMPLETED else "Document Processing Failed",
+                message=f"'{document.filename}' is {status.value}.",
+                type="success" if status == DocumentStatus.COMPLETED else "error",
+                link="/documents"
+            )
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Document worker error for {document_id}: {e}")
+        finally:
+            db.close()
+
+    def heartbeat(self) -> int:
+        """Refresh the lease on the documents this worker is processing. Returns the number refreshed."""
+        with self._lock:
+            active = list(self._active)
+        if not active:
+            return 0
+        db = self.session_factory()
+        try:
+            refreshed = db.query(Document).filter(
+                Document.id.in_(active),
+                Document.claimed_by == self.worker_id
+            ).update({Document.heartbeat_at: _now()}, synchronize_session=False)
+            db.commit()
+            return refreshed
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Document worker heartbeat failed: {e}")
+            return 0
+        finally:
+            db.close()
+
+    def reclaim_expired(self) -> List[uuid.UUID]:
+        """Put documents whose lease has expired (their worker died) back to PENDING; returns their ids"""
+        expired = _now() - timedelta(seconds=settings.DOCUMENT_EXTRACTION_LEASE_SECONDS)
+        db = self.session_factory()
+        try:
+            ids = [
+                row.id for row in db.query(Document.id).filter(
+                    Document.status == DocumentStatus.PROCESSING,
+                    or_(Document.heartbeat_at.is_(None), Document.heartbeat_at < expired)
+                )
+            ]
+            if ids:
+                # Re-check the lease in the UPDATE: it may have been refreshed since
+                db.query(Document).filter(
+                    Document.id.in_(ids),
+                    Document.status == DocumentStatus.PROCESSING,
+                    or_(Document.heartbeat_at.is_(None), Document.heartbeat_at < expired)
+                ).update({
+                    Document.status: DocumentStatus.PENDING,
+                    Document.claimed_by: None,
+                    Document.heartbeat_at: None,
+                }, synchronize_session=False)
+                db.commit()
+            return ids
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Could not reclaim expired documents: {e}")
+            return []
+        finally:
+            db.close()
+
+    def resume_pending(self) -> int:
+        """
+        Reclaim expired leases and queue every PENDING document left by a
+        previous process (called on startup). Documents live workers
+        are processing keep their claim. Returns the number queued.
+        """
+        self.reclaim_expired()
+        db = self.session_factory()
+        try:
+            # Pending documents another process has queued are skipped by the claim
+            ids = [
+                row.id for row in db.query(Document.id).filter(Document.status == DocumentStatus.PENDING)
+            ]
+        except Exception as e:
+            logger.error(f"Could not resume pending documents: {e}")
+            return 0
+        finally:
+            db.close()
+
+        for document_id in ids:
+            self.submit(document_id)
+        return len(ids)
+
+    def start(self) -> None:
+        """Resume unfinished documents and keep leases fresh until shutdown"""
+        self.resume_pending()
+        if self._heartbeat is None:
+            self._stopped.clear()
+            self._heartbeat = threading.Thread(target=self._run_heartbeat, name="document-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def _run_heartbeat(self) -> None:
+        interval = settings.DOCUMENT_EXTRACTION_LEASE_SECONDS / 3
+        while not self._stopped.wait(interval):
+            self.heartbeat()
+            for document_id in self.reclaim_expired():
+                self.submit(document_id)
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self._heartbeat = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+extraction_worker = DocumentExtractionWorker()
@@ -4,7 +4,7 @@ Supports Excel (.xlsx, .xls) and CSV files
 """
 
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from decimal import Decimal
 import io
 from datetime import datetime
@@ -29,23 +29,25 @@ class FileParserService:
         'equity': ['equity', 'капитал', 'собственный капитал']
     }
     
-    def parse_file(self, file_content: bytes, filename: str) -> Dict:
+    def parse_file(self, file_content: Union[bytes, str], filename: str) -> Dict:
         """
         Parse uploaded file and extract balance sheet data
         
         Args:
-            file_content: File content as bytes
+            file_content: File content as bytes, or path to the file on disk
             filename: Original filename
             
         Returns:
             Dict with parsed data and validation results
         """
         try:
+            source = io.BytesIO(file_content) if isinstance(file_content, bytes) else file_content
+            
             # Determine file type and parse
             if filename.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(io.BytesIO(file_content))
+                df = pd.read_excel(source)
             elif filename.endswith('.csv'):
-                df = pd.read_csv(io.BytesIO(file_content))
+                df = pd.read_csv(source)
             else:
                 return {
                     'success': False,
@@ -1,6 +1,6 @@
 import json
 from typing import Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from app.db.models.regulation import Regulation
 from app.db.models.company import Company
 from app.db.models.impact_analysis import RegulationImpact
@@ -23,7 +23,7 @@ class ImpactService:
             Dict with keys: impact_score (1-10), summary (str), action_items (list)
         """
         # Fetch regulation and company
-        regulation = self.db.query(Regulation).filter(Regulation.id == regulation_id).first()
+        regulation = self.db.query(Regulation).options(undefer(Regulation.content)).filter(Regulation.id == regulation_id).first()
         company = self.db.query(Company).filter(Company.id == company_id).first()
         
         if not regulation or not company:
@@ -0,0 +1,120 @@
+"""
+Shared PDF text extraction.
+
+Pages are read with pypdf. Large files are split into page ranges that a
+process pool extracts in parallel; page text is streamed back in order.
+Extracted text is cached on disk keyed by the file's content hash, so a
+repeat analysis of the same file skips extraction entirely.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+from app.core.config import settings
+from app.utils.file_hash import sha256_file
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class TextCache:
+    """Content-hash keyed text cache stored as plain files"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+text_cache = TextCache(settings.TEXT_CACHE_DIR)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawned workers start clean: no connections, threads or locks
+        # inherited from the API process
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PDF_EXTRACT_WORKERS or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the extraction worker processes (called on app shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract text of pages [start, stop). Runs inside a worker process."""
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def page_count(file_path: str) -> int:
+    return len(PdfReader(file_path).pages)
+
+
+def iter_pdf_pages(file_path: str) -> Iterator[str]:
+    """Yield the text of each page in order, in parallel for large files"""
+    if PdfReader is None:
+        raise RuntimeError("PDF extraction not available. Install pypdf.")
+
+    total = page_count(file_path)
+    if total < settings.PDF_PARALLEL_MIN_PAGES:
+        yield from _extract_page_range(file_path, 0, total)
+        return
+
+    step = settings.PDF_PAGES_PER_TASK
+    starts = list(range(0, total, step))
+    stops = [min(start + step, total) for start in starts]
+    # map() yields results in submission order as each range completes
+    for pages in get_pool().map(_extract_page_range, [file_path] * len(starts), starts, stops):
+        yield from pages
+
+
+def extract_pdf_text(file_path: str, file_hash: Optional[str] = None) -> str:
+    """
+    Return the text layer of a PDF, one line break after each page.
+    Uses the on-disk cache when the same content was extracted before.
+    """
+    key = file_hash or sha256_file(file_path)
+    cached = text_cache.get(key)
+    if cached is not None:
+        return cached
+
+    text = "".join(page + "\n" for page in iter_pdf_pages(file_path))
+    try:
+        text_cache.put(key, text)
+    except OSError as e:
+        logger.warning(f"Could not cache extracted text for {file_path}: {e}")
+    return text
@@ -0,0 +1,92 @@
+"""
+Per-page OCR for scanned and mixed PDFs.
+
+Each page keeps its text layer unless it has fewer than OCR_MIN_PAGE_CHARS
+characters, in which case it is OCR'd. Pages needing OCR are grouped into
+batches of at most OCR_BATCH_PAGES consecutive pages; a worker process
+renders only its batch (first_page/last_page) and runs tesseract on it, so
+memory stays bounded by workers x batch size whatever the page count.
+Batches run in the shared extraction pool (pdf_extraction.get_pool),
+whose workers are spawned rather than forked from the API process.
+"""
+import logging
+from typing import List, Optional, Tuple
+
+import pytesseract
+from pdf2image import convert_from_path
+
+from app.core.config import settings
+from app.services.pdf_extraction import iter_pdf_pages, text_cache, get_pool
+from app.utils.file_hash import sha256_file
+
+logger = logging.getLogger(__name__)
+
+
+def _ocr_page_range(file_path: str, first_page: int, last_page: int, dpi: int) -> List[str]:
+    """Render and OCR pages first_page..last_page (1-based, inclusive). Runs inside a worker process."""
+    images = convert_from_path(file_path, dpi=dpi, first_page=first_page, last_page=last_page)
+    texts = []
+    for image in images:
+        texts.append(pytesseract.image_to_string(image))
+        image.close()
+    return texts
+
+
+def _batches(page_numbers: List[int], batch_size: int) -> List[Tuple[int, int]]:
+    """Split sorted page numbers into runs of consecutive pages, at most batch_size long"""
+    batches = []
+    for page in page_numbers:
+        if batches:
+            first, last = batches[-1]
+            if page == last + 1 and last - first + 1 < batch_size:
+                batches[-1] = (first, page)
+                continue
+        batches.append((page, page))
+    return batches
+
+
+def _run_ocr_batches(file_path: str, batches: List[Tuple[int, int]], dpi: int) -> List[List[str]]:
+    if len(batches) == 1:
+        first, last = batches[0]
+        return [_ocr_page_range(file_path, first, last, dpi)]
+
+    pool = get_pool()
+    return list(pool.map(
+        _ocr_page_range,
+        [file_path] * len(batches),
+        [first for first, _ in batches],
+        [last for _, last in batches],
+        [dpi] * len(batches),
+    ))
+
+
+def extract_pdf_text_with_ocr(file_path: str, file_hash: Optional[str] = None) -> str:
+    """
+    Return the text of a PDF, OCR-ing only the pages without a usable text
+    layer. Results are cached by content hash and DPI.
+    """
+    dpi = settings.OCR_DPI
+    key = f"{file_hash or sha256_file(file_path)}.ocr{dpi}"
+    cached = text_cache.get(key)
+    if cached is not None:
+        return cached
+
+    pages = list(iter_pdf_pages(file_path))
+    needs_ocr = [
+        number for number, text in enumerate(pages, start=1)
+        if len(text.strip()) < settings.OCR_MIN_PAGE_CHARS
+    ]
+
+    if needs_ocr:
+        logger.info(f"OCR of {len(needs_ocr)}/{len(pages)} page(s) for {file_path}")
+        batches = _batches(needs_ocr, settings.OCR_BATCH_PAGES)
+        for (first, last), texts in zip(batches, _run_ocr_batches(file_path, batches, dpi)):
+            for number, text in zip(range(first, last + 1), texts):
+                pages[number - 1] = text
+
+    text = "".join(page + "\n" for page in pages)
+    try:
+        text_cache.put(key, text)
+    except OSError as e:
+        logger.warning(f"Could not cache OCR text for {file_path}: {e}")
+    return text
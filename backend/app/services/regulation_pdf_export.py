@@ -0,0 +1,311 @@
+"""
+PDF export of the regulation catalog.
+
+Regulations are read with yield_per and laid out one batch at a time, so
+only a batch of rows and flowables is held in memory regardless of
+catalog size. Styles and fonts are built once per process.
+
+Rendered files are cached under EXPORT_CACHE_DIR, keyed by tenant,
+filters and a catalog data version (row count + latest change). An
+unchanged catalog is served from the cache; any edit changes the version
+and the next export renders a fresh file, replacing the stale one.
+Exports can also be queued as background jobs and downloaded when ready.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.db.models.regulation import Regulation
+from app.db.session import SessionLocal
+from app.services.regulation_search import search_condition
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.platypus import Frame, PageTemplate, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+except ImportError:
+    SimpleDocTemplate = None
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+
+def pdf_export_available() -> bool:
+    return SimpleDocTemplate is not None
+
+
+def regulation_export_query(
+    db: Session,
+    tenant_id: Optional[uuid.UUID],
+    jurisdiction: Optional[str] = None,
+    search: Optional[str] = None,
+) -> Query:
+    """Regulations visible to a tenant, with the export filters applied"""
+    query = db.query(Regulation)
+
+    if tenant_id:
+        query = query.filter(
+            or_(
+                Regulation.tenant_id == tenant_id,
+                Regulation.tenant_id == None
+            )
+        )
+
+    if jurisdiction:
+        query = query.filter(Regulation.jurisdiction == jurisdiction)
+
+    if search:
+        query = query.filter(search_condition(search, db.get_bind().dialect.name))
+
+    return query
+
+
+@lru_cache(maxsize=1)
+def _fonts() -> tuple:
+    """(regular, bold) font names; registers PDF_FONT_PATH once if configured"""
+    if settings.PDF_FONT_PATH and os.path.exists(settings.PDF_FONT_PATH):
+        pdfmetrics.registerFont(TTFont("ExportFont", settings.PDF_FONT_PATH))
+        return "ExportFont", "ExportFont"
+    return "Helvetica", "Helvetica-Bold"
+
+
+@lru_cache(maxsize=1)
+def _styles() -> Dict[str, object]:
+    regular, bold = _fonts()
+    sample = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle(
+            'CustomTitle',
+            parent=sample['Heading1'],
+            fontName=bold,
+            fontSize=24,
+            textColor=colors.HexColor('#4472C4'),
+            spaceAfter=30,
+        ),
+        "normal": ParagraphStyle('ExportNormal', parent=sample['Normal'], fontName=regular),
+        "table": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), bold),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), regular),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+        ]),
+    }
+
+
+TABLE_HEADER = ["Code", "Title", "Jurisdiction", "Effective Date"]
+
+
+def _table_rows(query: Query) -> Iterator[List[List[str]]]:
+    """Yield batches of table rows from a server-side cursor"""
+    batch = []
+    for reg in query.order_by(Regulation.code, Regulation.id).yield_per(settings.PDF_EXPORT_BATCH_ROWS):
+        batch.append([
+            reg.code,
+            reg.title[:50] + "..." if len(reg.title) > 50 else reg.title,
+            reg.jurisdiction or "",
+            reg.effective_date.strftime("%Y-%m-%d") if reg.effective_date else ""
+        ])
+        if len(batch) >= settings.PDF_EXPORT_BATCH_ROWS:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+if SimpleDocTemplate is not None:
+    class ChunkedDocTemplate(SimpleDocTemplate):
+        """SimpleDocTemplate that lays out flowables batch by batch instead of from one list"""
+
+        def build_batches(self, batches: Iterator[list]) -> None:
+            # Same page setup and layout loop as SimpleDocTemplate.build
+            self._calc()
+            frame = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='normal')
+            self.addPageTemplates([
+                PageTemplate(id='First', frames=frame, pagesize=self.pagesize),
+                PageTemplate(id='Later', frames=frame, pagesize=self.pagesize),
+            ])
+            self._startBuild()
+            canv = self.canv
+            canv._doctemplate = self
+            try:
+                for flowables in batches:
+                    # Split remainders are pushed back onto the list until it drains
+                    while flowables:
+                        self.clean_hanging()
+                        self.handle_flowable(flowables)
+            finally:
+                del canv._doctemplate
+            self._endBuild()
+
+
+def render_regulations_pdf(query: Query, path: str) -> None:
+    """Render the filtered catalog to path"""
+    styles = _styles()
+    col_widths = [1.5*inch, 3.5*inch, 1.5*inch, 1.2*inch]
+
+    def batches():
+        yield [
+            Paragraph("Regulations Export", styles["title"]),
+            Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles["normal"]),
+            Spacer(1, 0.3*inch),
+        ]
+        empty = True
+        for rows in _table_rows(query):
+            empty = False
+            table = Table([TABLE_HEADER] + rows, colWidths=col_widths, repeatRows=1)
+            table.setStyle(styles["table"])
+            yield [table]
+        if empty:
+            table = Table([TABLE_HEADER], colWidths=col_widths)
+            table.setStyle(styles["table"])
+            yield [table]
+
+    ChunkedDocTemplate(path, pagesize=A4).build_batches(batches())
+
+
+def catalog_version(query: Query) -> str:
+    """Changes whenever a regulation in the filtered catalog is added, edited or removed"""
+    count, latest_created, latest_updated = query.with_entities(
+        func.count(Regulation.id),
+        func.max(Regulation.created_at),
+        func.max(Regulation.updated_at),
+    ).one()
+    return f"{count}:{latest_created}:{latest_updated}"
+
+
+class RegulationPdfExporter:
+    def __init__(self, cache_dir: Optional[str] = None, session_factory: Callable[[], Session] = SessionLocal):
+        self.cache_dir = Path(cache_dir or settings.EXPORT_CACHE_DIR) / "regulations"
+        self.session_factory = session_factory
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.PDF_EXPORT_WORKERS,
+                thread_name_prefix="pdf-export"
+            )
+        return self._executor
+
+    def job_id(
+        self,
+        db: Session,
+        tenant_id: Optional[uuid.UUID],
+        jurisdiction: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> str:
+        """
+        "<filter key>.<version key>". The filter part is stable for a tenant
+        and filter set; the version part changes with the catalog.
+        """
+        filters = json.dumps({"jurisdiction": jurisdiction, "search": search}, sort_keys=True)
+        version = catalog_version(regulation_export_query(db, tenant_id, jurisdiction, search))
+        filter_key = hashlib.sha256(filters.encode()).hexdigest()[:16]
+        version_key = hashlib.sha256(version.encode()).hexdigest()[:16]
+        return f"{filter_key}.{version_key}"
+
+    def artifact_path(self, tenant_id: Optional[uuid.UUID], job_id: str) -> Path:
+        # Tenant directory keeps artifacts (and job ids) from crossing tenants
+        return self.cache_dir / str(tenant_id or "global") / f"{job_id}.pdf"
+
+    def status(self, tenant_id: Optional[uuid.UUID], job_id: str) -> Optional[str]:
+        if self.artifact_path(tenant_id, job_id).exists():
+            return READY
+        with self._lock:
+            return self._jobs.get(f"{tenant_id}/{job_id}")
+
+    def render(
+        self,
+        db: Session,
+        tenant_id: Optional[uuid.UUID],
+        job_id: str,
+        jurisdiction: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> Path:
+        """Render unless the artifact exists; returns its path"""
+        path = self.artifact_path(tenant_id, job_id)
+        if path.exists():
+            return path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            render_regulations_pdf(regulation_export_query(db, tenant_id, jurisdiction, search), str(tmp_path))
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        # Older versions of the same export are stale now
+        filter_key = job_id.split(".")[0]
+        for stale in path.parent.glob(f"{filter_key}.*.pdf"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        return path
+
+    def submit(
+        self,
+        tenant_id: Optional[uuid.UUID],
+        job_id: str,
+        jurisdiction: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> str:
+        """Queue a render in the background; returns the job's status"""
+        current = self.status(tenant_id, job_id)
+        if current in (READY, PENDING):
+            return current
+        with self._lock:
+            self._jobs[f"{tenant_id}/{job_id}"] = PENDING
+        self._get_executor().submit(self._run, tenant_id, job_id, jurisdiction, search)
+        return PENDING
+
+    def _run(self, tenant_id, job_id, jurisdiction, search) -> None:
+        db = self.session_factory()
+        try:
+            self.render(db, tenant_id, job_id, jurisdiction, search)
+            state = READY
+        except Exception as e:
+            logger.error(f"Regulation PDF export {job_id} failed: {e}")
+            state = FAILED
+        finally:
+            db.close()
+        with self._lock:
+            if state == READY:
+                self._jobs.pop(f"{tenant_id}/{job_id}", None)
+            else:
+                self._jobs[f"{tenant_id}/{job_id}"] = state
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+regulation_pdf_exporter = RegulationPdfExporter()
@@ -0,0 +1,143 @@
+"""
+Database-side full-text search over the regulation catalog.
+
+Postgres matches the generated ``search_vector`` (GIN) against the query
+parsed with the English, Russian and simple configurations, and uses
+pg_trgm for fuzzy code and title matches; results are ranked with
+ts_rank_cd and highlighted with ts_headline. SQLite uses the
+``regulations_fts`` FTS5 table with bm25 ranking and snippet(). Other
+databases fall back to ILIKE.
+
+The indexes themselves are created with the regulations table (see
+app/db/models/regulation.py) and by migration 0019.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import column, func, literal, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.regulation import Regulation
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_fts = table("regulations_fts", column("regulation_id"), column("code"), column("title"), column("content"))
+_fts_table = literal_column("regulations_fts")
+_search_vector = literal_column("regulations.search_vector")
+
+
+def _ts_query(search: str):
+    """Query terms stemmed for each language the catalog is written in"""
+    queries = [
+        func.websearch_to_tsquery(literal_column(f"'{config}'::regconfig"), search)
+        for config in ("english", "russian", "simple")
+    ]
+    combined = queries[0]
+    for query in queries[1:]:
+        combined = combined.op("||")(query)
+    return combined
+
+
+def fts5_query(search: str) -> Optional[str]:
+    """User input as an FTS5 expression: every term, as a prefix, quoted"""
+    tokens = _TOKEN.findall(search)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _ilike(search: str):
+    return or_(
+        Regulation.title.ilike(f"%{search}%"),
+        Regulation.code.ilike(f"%{search}%"),
+    )
+
+
+def search_condition(search: str, dialect: str):
+    """WHERE clause matching regulations by code, title or content"""
+    if dialect == "postgresql":
+        # ILIKE is served by the trigram indexes
+        return or_(_search_vector.op("@@")(_ts_query(search)), _ilike(search))
+    if dialect == "sqlite":
+        match = fts5_query(search)
+        if match is None:
+            return _ilike(search)
+        matching = select(_fts.c.regulation_id).where(_fts_table.op("MATCH")(match))
+        return or_(Regulation.id.in_(matching), _ilike(search))
+    return or_(_ilike(search), Regulation.content.ilike(f"%{search}%"))
+
+
+def ranked_search_statement(search: str, dialect: str, limit: int):
+    """
+    select(Regulation, rank, snippet) for the best matches, best first.
+    Filter further with .where() before executing.
+    """
+    if dialect == "postgresql":
+        ts_query = _ts_query(search)
+        rank = (func.ts_rank_cd(_search_vector, ts_query) + func.similarity(Regulation.code, search)).label("rank")
+        snippet = func.ts_headline(
+            literal_column("'simple'::regconfig"),
+            func.coalesce(Regulation.content, Regulation.title),
+            ts_query,
+            f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=20, MinWords=5",
+        ).label("snippet")
+        condition = or_(
+            _search_vector.op("@@")(ts_query),
+            Regulation.code.op("%")(search),
+            _ilike(search),
+        )
+        return select(Regulation, rank, snippet).where(condition).order_by(rank.desc(), Regulation.id).limit(limit)
+
+    if dialect == "sqlite":
+        match = fts5_query(search)
+        if match is not None:
+            # bm25 is lower for better matches; weights: id, code, title, content
+            rank = (-func.bm25(_fts_table, 0.0, 10.0, 5.0, 1.0)).label("rank")
+            snippet = func.snippet(_fts_table, 3, HIGHLIGHT_START, HIGHLIGHT_STOP, "…", 16).label("snippet")
+            return (
+                select(Regulation, rank, snippet)
+                .join(_fts, _fts.c.regulation_id == Regulation.id)
+                .where(_fts_table.op("MATCH")(match))
+                .order_by(rank.desc(), Regulation.id)
+                .limit(limit)
+            )
+
+    return (
+        select(Regulation, literal(0.0).label("rank"), literal(None).label("snippet"))
+        .where(search_condition(search, dialect))
+        .order_by(Regulation.code)
+        .limit(limit)
+    )
+
+
+async def search_catalog(
+    db: AsyncSession,
+    search: str,
+    tenant_id: Any = None,
+    jurisdiction: Optional[str] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """Ranked catalog hits with highlighted snippets, visible to the tenant"""
+    statement = ranked_search_statement(search, db.get_bind().dialect.name, limit)
+    if tenant_id:
+        statement = statement.where(or_(Regulation.tenant_id == tenant_id, Regulation.tenant_id == None))
+    if jurisdiction:
+        statement = statement.where(Regulation.jurisdiction == jurisdiction)
+
+    result = await db.execute(statement)
+    return [
+        {
+            "id": regulation.id,
+            "code": regulation.code,
+            "title": regulation.title,
+            "jurisdiction": regulation.jurisdiction,
+            "category": regulation.category,
+            "effective_date": regulation.effective_date,
+            "rank": float(rank or 0),
+            "snippet": snippet,
+        }
+        for regulation, rank, snippet in result.all()
+    ]
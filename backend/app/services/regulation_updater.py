@@ -1,7 +1,7 @@
 import logging
 import random
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from app.db.session import SessionLocal
 from app.db.models.regulation import Regulation
 
@@ -20,7 +20,7 @@ class RegulationUpdaterService:
         
         try:
             # 1. Get all regulations
-            regulations = self.db.query(Regulation).all()
+            regulations = self.db.query(Regulation).options(load_only(Regulation.id, Regulation.code)).all()
             updates_found = 0
             
             for reg in regulations:
@@ -0,0 +1,141 @@
+"""
+Daily report rollups for the analytics dashboards.
+
+ReportDailyRollup rows count reports per (created day, company,
+submitter, status). Rows with status ANALYSES hold the number of
+analyses and the sum of their overall scores per (analysis day,
+company, submitter). Session flush events adjust them in the same
+transaction as every ORM insert, update or delete of a Report or
+ReportAnalysis, so the dashboards read a few rows per day instead of
+every report and analysis.
+
+Bulk UPDATE/DELETE statements on these tables bypass the flush events;
+rebuild_report_rollups recomputes everything from scratch. Days are UTC
+dates (the database session time zone for the rebuild).
+"""
+from collections import defaultdict
+from datetime import date, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func, literal, select
+from sqlalchemy.orm import Session
+
+from app.db import counters
+from app.db.models.report import Report
+from app.db.models.report_analysis import ReportAnalysis
+from app.db.models.report_rollup import ANALYSES, ReportDailyRollup
+
+METRICS = ("report_count", "analysis_count", "scored_count", "score_sum")
+
+
+def utc_day(value) -> Optional[date]:
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _report_key(report: Report, previous: bool) -> Tuple:
+    get = (lambda name: counters.previous_value(report, name)) if previous else (lambda name: getattr(report, name))
+    return utc_day(get("created_at")), get("company_id"), get("submitted_by"), get("status") or "draft"
+
+
+def _analysis_contribution(analysis: ReportAnalysis, previous: bool) -> Tuple[Any, Optional[date], List[int]]:
+    get = (lambda name: counters.previous_value(analysis, name)) if previous else (lambda name: getattr(analysis, name))
+    score = get("overall_score")
+    metrics = [0, 1, 1 if score is not None else 0, score or 0]
+    return get("report_id"), utc_day(get("created_at")), metrics
+
+
+def _report_owners(session, report_ids: Iterable, reports: Iterable[Report]) -> Dict[Any, Tuple]:
+    """(company_id, submitted_by) by report id, from the flush or the database"""
+    owners = {
+        report.id: (counters.previous_value(report, "company_id"), counters.previous_value(report, "submitted_by"))
+        for report in reports
+    }
+    missing = {report_id for report_id in report_ids if report_id not in owners}
+    if missing:
+        rows = session.connection().execute(
+            select(Report.id, Report.company_id, Report.submitted_by).where(Report.id.in_(missing))
+        )
+        owners.update({report_id: (company_id, user_id) for report_id, company_id, user_id in rows})
+    return owners
+
+
+@event.listens_for(Session, "after_flush")
+def _roll_up_reports(session, flush_context):
+    new = [obj for obj in session.new if isinstance(obj, (Report, ReportAnalysis))]
+    deleted = [obj for obj in session.deleted if isinstance(obj, (Report, ReportAnalysis))]
+    dirty = [
+        obj for obj in session.dirty
+        if isinstance(obj, (Report, ReportAnalysis)) and obj not in session.deleted and session.is_modified(obj)
+    ]
+    if not (new or deleted or dirty):
+        return
+
+    deltas: Dict[Tuple, List[int]] = defaultdict(lambda: [0, 0, 0, 0])
+
+    def add(key: Tuple, metrics: List[int], sign: int) -> None:
+        if None in key:
+            return
+        row = deltas[key]
+        for i, value in enumerate(metrics):
+            row[i] += sign * value
+
+    report_metrics = [1, 0, 0, 0]
+    for report in (obj for obj in new if isinstance(obj, Report)):
+        add(_report_key(report, previous=False), report_metrics, 1)
+    for report in (obj for obj in deleted if isinstance(obj, Report)):
+        add(_report_key(report, previous=True), report_metrics, -1)
+    for report in (obj for obj in dirty if isinstance(obj, Report)):
+        before, after = _report_key(report, previous=True), _report_key(report, previous=False)
+        if before != after:
+            add(before, report_metrics, -1)
+            add(after, report_metrics, 1)
+
+    contributions = (
+        [(_analysis_contribution(a, previous=False), 1) for a in new if isinstance(a, ReportAnalysis)]
+        + [(_analysis_contribution(a, previous=True), -1) for a in deleted if isinstance(a, ReportAnalysis)]
+        + [(_analysis_contribution(a, previous=True), -1) for a in dirty if isinstance(a, ReportAnalysis)]
+        + [(_analysis_contribution(a, previous=False), 1) for a in dirty if isinstance(a, ReportAnalysis)]
+    )
+    if contributions:
+        reports = [obj for obj in (*new, *deleted, *dirty) if isinstance(obj, Report)]
+        owners = _report_owners(session, {c[0] for c, _ in contributions}, reports)
+        for (report_id, day, metrics), sign in contributions:
+            company_id, user_id = owners.get(report_id, (None, None))
+            add((day, company_id, user_id, ANALYSES), metrics, sign)
+
+    connection = None
+    for (day, company_id, user_id, status), metrics in deltas.items():
+        if any(metrics):
+            connection = connection or session.connection()
+            counters.increment(
+                connection, ReportDailyRollup,
+                dict(day=day, company_id=company_id, user_id=user_id, status=status),
+                dict(zip(METRICS, metrics)),
+            )
+
+
+def rebuild_report_rollups(db: Session) -> None:
+    """Recompute every rollup row from the reports and analyses. The caller commits."""
+    db.query(ReportDailyRollup).delete(synchronize_session=False)
+
+    columns = ["day", "company_id", "user_id", "status", *METRICS]
+    report_day = func.date(Report.created_at)
+    status = func.coalesce(Report.status, "draft")
+    db.execute(ReportDailyRollup.__table__.insert().from_select(columns, (
+        select(report_day, Report.company_id, Report.submitted_by, status,
+               func.count(), literal(0), literal(0), literal(0))
+        .group_by(report_day, Report.company_id, Report.submitted_by, status)
+    )))
+
+    analysis_day = func.date(ReportAnalysis.created_at)
+    db.execute(ReportDailyRollup.__table__.insert().from_select(columns, (
+        select(analysis_day, Report.company_id, Report.submitted_by, literal(ANALYSES),
+               literal(0), func.count(), func.count(ReportAnalysis.overall_score),
+               func.coalesce(func.sum(ReportAnalysis.overall_score), 0))
+        .join(Report, Report.id == ReportAnalysis.report_id)
+        .group_by(analysis_day, Report.company_id, Report.submitted_by)
+    )))
@@ -0,0 +1,82 @@
+"""
+Background re-analysis of reports after a country's tax rates change.
+
+Revalidation re-runs RAG/LLM analysis for every affected report and can
+take minutes, so POST /report-analysis/revalidate only queues a job here
+and returns its id; the job's status and counts are polled separately.
+At most one job per country is queued or running at a time. Job state
+lives in this process, like the regulation PDF export jobs.
+"""
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.services.report_analyzer import ReportAnalyzer
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class RevalidationJobs:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # One worker: revalidations of different countries run one after another
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="revalidation")
+        return self._executor
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def submit(self, country_code: str) -> Dict[str, Any]:
+        """Queue a revalidation of the country, or return the one already queued or running"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job["country_code"] == country_code and job["status"] in (PENDING, RUNNING):
+                    return dict(job)
+            job = {"job_id": uuid.uuid4().hex, "country_code": country_code, "status": PENDING, "result": None}
+            self._jobs[job["job_id"]] = job
+        self._get_executor().submit(self._run, job["job_id"])
+        return dict(job)
+
+    def _set(self, job_id: str, **fields) -> None:
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _run(self, job_id: str) -> None:
+        self._set(job_id, status=RUNNING)
+        country_code = self._jobs[job_id]["country_code"]
+        db = self.session_factory()
+        try:
+            result = ReportAnalyzer(db).revalidate_country(country_code)
+            self._set(job_id, status=COMPLETED, result={"country_code": country_code, **result})
+            logger.info(f"Revalidation {job_id} for {country_code} completed: {result}")
+        except Exception as e:
+            logger.error(f"Revalidation {job_id} for {country_code} failed: {e}")
+            self._set(job_id, status=FAILED)
+        finally:
+            db.close()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+revalidation_jobs = RevalidationJobs()
@@ -0,0 +1,215 @@
+"""
+Object storage for uploaded files.
+
+Files are addressed by a key (a relative path such as
+"uploads/blobs/<tenant>/ab/<sha256>.pdf"). LocalStorage keeps them on
+disk under a root directory; S3Storage keeps them in an S3-compatible
+bucket (AWS S3, MinIO) so any API node can serve any file.
+
+Callers that need a real file (PDF parsing, OCR, hashing) use
+``local_path``, which is the file itself for local storage and a
+temporary download for S3. Downloads should prefer ``presigned_url`` so
+the bytes never pass through a Python worker.
+"""
+import logging
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+from urllib.parse import quote
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:
+    boto3 = None
+    TransferConfig = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _is_missing(error: "ClientError") -> bool:
+    return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+
+class StorageBackend(ABC):
+    """Interface shared by the storage implementations"""
+
+    @abstractmethod
+    def put_file(self, local_path: str, key: str, content_type: Optional[str] = None) -> None:
+        """Store a local file under key. The local file may be moved."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """
+        Open a stored file for streaming reads. Raises FileNotFoundError
+        when the key is missing and OSError when the backend fails.
+        """
+
+    def iter_chunks(self, key: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        with closing(self.open(key)) as source:
+            yield from iter(lambda: source.read(chunk_size), b"")
+
+    @abstractmethod
+    def local_path(self, key: str):
+        """Context manager yielding a filesystem path holding the file's content"""
+
+    def filesystem_path(self, key: str) -> Optional[str]:
+        """Direct path to the file when it lives on this node's disk, else None"""
+        return None
+
+    def presigned_url(self, key: str, filename: Optional[str] = None, expires_in: Optional[int] = None) -> Optional[str]:
+        """Time-limited URL clients can download from directly, if the backend supports it"""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str = "."):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        # Rows written before storage keys existed hold absolute paths; joining keeps them as-is
+        return self.root / key
+
+    def put_file(self, local_path: str, key: str, content_type: Optional[str] = None) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(local_path), path)
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def open(self, key: str) -> BinaryIO:
+        return self._path(key).open("rb")
+
+    @contextmanager
+    def local_path(self, key: str) -> Iterator[str]:
+        yield str(self._path(key))
+
+    def filesystem_path(self, key: str) -> Optional[str]:
+        return str(self._path(key))
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible storage. Large files go up and down as multipart
+    transfers with parts moved in parallel (S3_MAX_CONCURRENCY).
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        public_endpoint_url: Optional[str] = None,
+        client=None,
+    ):
+        if boto3 is None:
+            raise RuntimeError("boto3 is required for STORAGE_BACKEND=s3")
+
+        def make_client(endpoint: Optional[str]):
+            return boto3.client(
+                "s3",
+                endpoint_url=endpoint or None,
+                region_name=region or None,
+                aws_access_key_id=access_key_id or None,
+                aws_secret_access_key=secret_access_key or None,
+            )
+
+        self.client = client or make_client(endpoint_url)
+        # Presigned URLs must use a host the browser can reach (e.g. localhost
+        # instead of the compose service name); signing itself is offline
+        self.presign_client = make_client(public_endpoint_url) if public_endpoint_url else self.client
+        self.bucket = bucket
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=settings.S3_MAX_CONCURRENCY,
+        )
+
+    def put_file(self, local_path: str, key: str, content_type: Optional[str] = None) -> None:
+        extra_args = {"ContentType": content_type} if content_type else None
+        self.client.upload_file(
+            str(local_path), self.bucket, key,
+            ExtraArgs=extra_args, Config=self.transfer_config,
+        )
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if _is_missing(e):
+                return False
+            raise
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        except ClientError as e:
+            if _is_missing(e):
+                raise FileNotFoundError(f"{key} not found in bucket {self.bucket}") from e
+            raise OSError(f"Could not open {key}: {e}") from e
+        except BotoCoreError as e:
+            raise OSError(f"Could not open {key}: {e}") from e
+
+    @contextmanager
+    def local_path(self, key: str) -> Iterator[str]:
+        fd, tmp_path = tempfile.mkstemp(suffix=Path(key).suffix)
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, key, tmp_path, Config=self.transfer_config)
+            yield tmp_path
+        finally:
+            os.remove(tmp_path)
+
+    def presigned_url(self, key: str, filename: Optional[str] = None, expires_in: Optional[int] = None) -> Optional[str]:
+        params = {"Bucket": self.bucket, "Key": key}
+        if filename:
+            params["ResponseContentDisposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+        return self.presign_client.generate_presigned_url(
+            "get_object",
+            Params=params,
+            ExpiresIn=expires_in or settings.S3_PRESIGN_EXPIRES_SECONDS,
+        )
+
+
+def create_storage() -> StorageBackend:
+    backend = settings.STORAGE_BACKEND.lower()
+    if backend == "s3":
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            public_endpoint_url=settings.S3_PUBLIC_ENDPOINT_URL,
+        )
+    if backend != "local":
+        logger.warning(f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r}, using local storage")
+    return LocalStorage(settings.STORAGE_LOCAL_ROOT)
+
+
+storage = create_storage()
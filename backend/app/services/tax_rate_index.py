@@ -0,0 +1,154 @@
+"""
+In-memory temporal index of tax rates.
+
+Rates are grouped by (country, tax type) into intervals sorted by
+effective_from, so "rate as of date D" is a binary search instead of a
+query. Intervals may overlap (nothing in tax_rates prevents it): the
+lookup walks back from the latest interval starting on or before D to
+the latest one still in force, stopping as soon as no earlier interval
+reaches D. The index is reloaded whenever rates are written through the API
+and at most every TAX_RATE_INDEX_TTL_SECONDS to pick up writes made by
+other workers.
+"""
+import bisect
+import itertools
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.tax_rate import TaxRate
+
+
+@dataclass(frozen=True)
+class TaxRateEntry:
+    """Detached snapshot of a TaxRate row"""
+    id: uuid.UUID
+    country_code: str
+    country_name: str
+    tax_type: str
+    rate: Decimal
+    description: Optional[str]
+    effective_from: date
+    effective_to: Optional[date]
+    source_url: Optional[str]
+    last_updated: Optional[datetime]
+    created_at: Optional[datetime]
+
+    def is_active_on(self, as_of: date) -> bool:
+        return self.effective_from <= as_of and (self.effective_to is None or self.effective_to >= as_of)
+
+
+class TaxRateIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._intervals: Dict[Tuple[str, str], List[TaxRateEntry]] = {}
+        self._starts: Dict[Tuple[str, str], List[date]] = {}
+        # Latest effective_to among the intervals up to each position (date.max if open-ended)
+        self._reach: Dict[Tuple[str, str], List[date]] = {}
+        self._loaded_at: Optional[float] = None
+        self.version = 0
+
+    def load(self, db: Session) -> None:
+        """(Re)build the index from the tax_rates table"""
+        intervals: Dict[Tuple[str, str], List[TaxRateEntry]] = {}
+        for row in db.query(TaxRate).all():
+            entry = TaxRateEntry(
+                id=row.id,
+                country_code=row.country_code.upper(),
+                country_name=row.country_name,
+                tax_type=row.tax_type,
+                rate=row.rate,
+                description=row.description,
+                effective_from=row.effective_from,
+                effective_to=row.effective_to,
+                source_url=row.source_url,
+                last_updated=row.last_updated,
+                created_at=row.created_at,
+            )
+            intervals.setdefault((entry.country_code, entry.tax_type), []).append(entry)
+
+        starts = {}
+        reach = {}
+        for key, entries in intervals.items():
+            entries.sort(key=lambda e: e.effective_from)
+            starts[key] = [e.effective_from for e in entries]
+            reach[key] = list(itertools.accumulate((e.effective_to or date.max for e in entries), max))
+
+        with self._lock:
+            self._intervals = intervals
+            self._starts = starts
+            self._reach = reach
+            self._loaded_at = time.monotonic()
+            self.version += 1
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Load the index if it is empty or older than the configured TTL"""
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > settings.TAX_RATE_INDEX_TTL_SECONDS:
+            self.load(db)
+
+    def invalidate(self) -> None:
+        """Force a reload on next use"""
+        with self._lock:
+            self._loaded_at = None
+
+    def rate_as_of(self, country_code: str, tax_type: str, as_of: date) -> Optional[TaxRateEntry]:
+        """
+        Return the rate in force on a date, or None: of the intervals
+        covering the date, the one starting latest. O(log n) per lookup
+        unless intervals overlap.
+        """
+        key = (country_code.upper(), tax_type)
+        starts = self._starts.get(key)
+        if not starts:
+            return None
+
+        entries = self._intervals[key]
+        reach = self._reach[key]
+        idx = bisect.bisect_right(starts, as_of) - 1
+        while idx >= 0 and reach[idx] >= as_of:
+            if entries[idx].is_active_on(as_of):
+                return entries[idx]
+            idx -= 1
+        return None
+
+    def rates_as_of(self, country_code: str, as_of: date) -> List[TaxRateEntry]:
+        """Return the rate in force on a date for every tax type of a country"""
+        country_code = country_code.upper()
+        rates = []
+        for cc, tax_type in self._intervals:
+            if cc == country_code:
+                entry = self.rate_as_of(cc, tax_type, as_of)
+                if entry:
+                    rates.append(entry)
+        return rates
+
+    def history(self, country_code: str) -> List[TaxRateEntry]:
+        """Return every interval recorded for a country"""
+        country_code = country_code.upper()
+        return [
+            entry
+            for (cc, _), entries in self._intervals.items() if cc == country_code
+            for entry in entries
+        ]
+
+    def countries(self) -> List[Tuple[str, str]]:
+        """Return (code, name) pairs for every country with rate data"""
+        names = {}
+        for entries in self._intervals.values():
+            for entry in entries:
+                names.setdefault(entry.country_code, entry.country_name)
+        return sorted(names.items())
+
+    def tax_types(self) -> List[str]:
+        return sorted({tax_type for _, tax_type in self._intervals})
+
+
+tax_rate_index = TaxRateIndex()
@@ -0,0 +1,107 @@
+import asyncio
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.deps import get_async_db
+from app.db.models.alert import Alert, AlertSeverity, AlertStatus
+from app.core.query_stats import capture_queries
+from app.db.models.regulation import Regulation
+from app.db.session import AsyncSessionLocal, Base, async_database_url, async_engine
+from app.main import app
+
+
+def test_async_database_url():
+    assert async_database_url("postgresql://u:p@db:5432/regai") == "postgresql+asyncpg://u:p@db:5432/regai"
+    assert async_database_url("postgresql+psycopg://u:p@db/regai") == "postgresql+asyncpg://u:p@db/regai"
+    assert async_database_url("sqlite:///./regai.db") == "sqlite+aiosqlite:///./regai.db"
+
+
+def test_reads_through_aiosqlite_session(client: TestClient, tenant_admin, tmp_path):
+    # The real get_async_db / AsyncSessionLocal path on aiosqlite, not the test's sync-backed session.
+    # NullPool: the seeding loop and the test client's loop must not share connections.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}", poolclass=NullPool)
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSessionLocal(bind=engine) as session:
+            session.add_all([
+                Alert(message="Missing filing", severity=AlertSeverity.CRITICAL, tenant_id=tenant_admin.tenant_id),
+                Alert(message="Late report", status=AlertStatus.RESOLVED, tenant_id=tenant_admin.tenant_id),
+                Alert(message="Other tenant", tenant_id=uuid.uuid4()),
+                Regulation(code="B-1", title="Banking", jurisdiction="UZ"),
+            ])
+            await session.commit()
+
+    asyncio.run(seed())
+    app.dependency_overrides.pop(get_async_db)
+    AsyncSessionLocal.configure(bind=engine)
+    try:
+        alerts = client.get("/api/v1/compliance/alerts").json()
+        assert sorted(a["message"] for a in alerts) == ["Late report", "Missing filing"]
+        stats = client.get("/api/v1/compliance/stats").json()
+        assert (stats["total"], stats["critical"], stats["resolved"]) == (2, 1, 1)
+        assert [r["code"] for r in client.get("/api/v1/regulations/list").json()] == ["B-1"]
+        assert client.get("/api/v1/regulations/jurisdictions").json() == {"jurisdictions": ["UZ"]}
+    finally:
+        AsyncSessionLocal.configure(bind=async_engine)
+        asyncio.run(engine.dispose())
+
+
+def test_alert_list_and_stats(client: TestClient, db: Session, tenant_admin):
+    db.add_all([
+        Alert(message="Missing filing", severity=AlertSeverity.CRITICAL, tenant_id=tenant_admin.tenant_id),
+        Alert(message="Late report", severity=AlertSeverity.LOW, status=AlertStatus.RESOLVED,
+              regulation="GDPR", tenant_id=tenant_admin.tenant_id),
+        Alert(message="Other tenant", tenant_id=uuid.uuid4()),
+    ])
+    db.commit()
+
+    alerts = client.get("/api/v1/compliance/alerts", params={"regulation": "gdpr"}).json()
+    assert [a["message"] for a in alerts] == ["Late report"]
+
+    stats = client.get("/api/v1/compliance/stats").json()
+    assert stats["total"] == 2
+    assert stats["critical"] == 1
+    assert stats["resolved"] == 1
+
+
+def test_regulation_list_and_jurisdictions(client: TestClient, db: Session, tenant_admin):
+    db.add_all([
+        Regulation(code="B-1", title="Banking", jurisdiction="UZ"),
+        Regulation(code="A-1", title="Audit", jurisdiction="EU", tenant_id=tenant_admin.tenant_id),
+        Regulation(code="X-1", title="Foreign", jurisdiction="US", tenant_id=uuid.uuid4()),
+    ])
+    db.commit()
+
+    regulations = client.get("/api/v1/regulations/list", params={"sort_by": "code", "sort_order": "asc"}).json()
+    assert [r["code"] for r in regulations] == ["A-1", "B-1"]
+
+    assert client.get("/api/v1/regulations/jurisdictions").json() == {"jurisdictions": ["EU", "UZ"]}
+
+
+def test_regulation_body_loaded_only_in_detail(client: TestClient, db: Session, tenant_admin):
+    regulation = Regulation(code="NK-UZ", title="Tax Code", content="Article 1. " * 5000,
+                            workflow_steps=[{"step": 1, "title": "Register"}])
+    db.add(regulation)
+    db.commit()
+    regulation_id = regulation.id
+    db.expunge_all()
+
+    with capture_queries() as stats:
+        listed = client.get("/api/v1/regulations/list").json()
+    assert [r["code"] for r in listed] == ["NK-UZ"]
+    assert "content" not in listed[0]
+    selects = [shape for shape in stats.shapes if shape.startswith("SELECT regulations.")]
+    assert selects
+    assert not any("regulations.content," in shape or "regulations.workflow_steps" in shape for shape in selects)
+    db.expunge_all()
+
+    detail = client.get(f"/api/v1/regulations/{regulation_id}").json()
+    assert detail["content"].startswith("Article 1.")
+    assert detail["workflow_steps"] == [{"step": 1, "title": "Register"}]
+    assert client.get(f"/api/v1/regulations/{uuid.uuid4()}").status_code == 404
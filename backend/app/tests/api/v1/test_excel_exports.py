@@ -0,0 +1,41 @@
+import io
+import os
+import uuid
+
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+from sqlalchemy.orm import Session
+
+from app.db.models.alert import Alert, AlertSeverity
+from app.utils.excel_export import write_excel_export
+
+
+def test_alerts_export_streams_tenant_rows(client: TestClient, db: Session, tenant_admin):
+    tenant_id = tenant_admin.tenant_id
+
+    for i in range(3):
+        db.add(Alert(message=f"VAT mismatch {i}", severity=AlertSeverity.HIGH, regulation="VAT", tenant_id=tenant_id))
+    db.add(Alert(message="Other tenant", regulation="VAT", tenant_id=uuid.uuid4()))
+    db.commit()
+
+    response = client.get("/api/v1/compliance/export/excel", params={"severity": "high"})
+    assert response.status_code == 200
+    assert "compliance_alerts.xlsx" in response.headers["content-disposition"]
+
+    ws = load_workbook(io.BytesIO(response.content)).active
+    rows = list(ws.iter_rows(values_only=True))
+    assert rows[0][:4] == ("ID", "Severity", "Status", "Regulation")
+    assert ws["A1"].font.bold
+    assert sorted(row[4] for row in rows[1:]) == ["VAT mismatch 0", "VAT mismatch 1", "VAT mismatch 2"]
+
+
+def test_write_excel_export_handles_generators():
+    rows = ([n, f"row {n}"] for n in range(5000))
+    path = write_excel_export("Data", [("N", 10), ("Label", 30)], rows)
+    try:
+        ws = load_workbook(path, read_only=True)["Data"]
+        rows = list(ws.iter_rows(values_only=True))
+        assert len(rows) == 5001
+        assert rows[-1] == (4999, "row 4999")
+    finally:
+        os.remove(path)
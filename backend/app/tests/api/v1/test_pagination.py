@@ -0,0 +1,85 @@
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.models.alert import Alert
+from app.db.models.audit_log import AuditLog
+from app.db.models.regulation import Regulation
+
+
+def _walk(client: TestClient, path: str, params: dict):
+    """Follow X-Next-Cursor to the end; returns the pages"""
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return pages
+
+
+def test_alert_pages_cover_every_row_once(client: TestClient, db: Session, tenant_admin):
+    # server_default timestamps: many rows share a second, so the id breaks ties
+    for i in range(7):
+        db.add(Alert(message=f"Alert {i}", tenant_id=tenant_admin.tenant_id))
+    db.add(Alert(message="Other tenant", tenant_id=uuid.uuid4()))
+    db.commit()
+
+    pages = _walk(client, "/api/v1/compliance/alerts", {"limit": 3})
+    assert [len(page) for page in pages] == [3, 3, 1]
+    ids = [alert["id"] for page in pages for alert in page]
+    assert len(set(ids)) == 7
+
+    first_page = client.get("/api/v1/compliance/alerts", params={"limit": 3, "include_total": True})
+    assert first_page.headers["x-total-count"] == "7"
+    assert "x-total-count" not in client.get("/api/v1/compliance/alerts").headers
+
+
+def test_regulation_pages_with_null_sort_keys(client: TestClient, db: Session, tenant_admin):
+    for code, jurisdiction in [("A", "UZ"), ("B", None), ("C", "EU"), ("D", None), ("E", "UZ")]:
+        db.add(Regulation(code=code, title=code, jurisdiction=jurisdiction))
+    db.commit()
+
+    pages = _walk(client, "/api/v1/regulations/list", {"limit": 2, "sort_by": "jurisdiction", "sort_order": "asc"})
+    rows = [r for page in pages for r in page]
+    assert sorted(r["code"] for r in rows) == ["A", "B", "C", "D", "E"]
+    assert [r["jurisdiction"] for r in rows] == [None, None, "EU", "UZ", "UZ"]
+
+
+def test_audit_log_cursor_pages_skip_the_count(client: TestClient, db: Session, tenant_admin, query_budget):
+    base = datetime(2026, 1, 1)
+    for i in range(5):
+        db.add(AuditLog(tenant_id=tenant_admin.tenant_id, action="view", timestamp=base + timedelta(minutes=i)))
+    db.commit()
+
+    first = client.get("/api/v1/audit-logs/", params={"limit": 2}).json()
+    assert first["total"] == 5
+    assert first["next_cursor"]
+
+    # Later pages: one seek query, no count, no user lookup for system rows
+    with query_budget(1):
+        second = client.get(
+            "/api/v1/audit-logs/",
+            params={"limit": 2, "cursor": first["next_cursor"], "include_total": False},
+        ).json()
+    assert second["total"] is None
+    timestamps = [log["timestamp"] for log in first["logs"] + second["logs"]]
+    assert timestamps == sorted(timestamps, reverse=True)
+    assert len(set(timestamps)) == 4
+
+
+def test_invalid_cursor_is_rejected(client: TestClient, db: Session, tenant_admin):
+    for i in range(2):
+        db.add(Alert(message=f"Alert {i}", tenant_id=tenant_admin.tenant_id))
+    db.commit()
+
+    assert client.get("/api/v1/compliance/alerts", params={"cursor": "not-a-cursor"}).status_code == 400
+
+    cursor = client.get("/api/v1/compliance/alerts", params={"limit": 1}).headers["x-next-cursor"]
+    # Issued for created_at:desc, not usable with another sort
+    response = client.get("/api/v1/compliance/alerts", params={"cursor": cursor, "sort_order": "asc"})
+    assert response.status_code == 400
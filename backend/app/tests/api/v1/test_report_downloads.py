@@ -0,0 +1,133 @@
+import hashlib
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.models.report import Report
+
+CONTENT = b"%PDF-1.4 " + bytes(range(256)) * 4
+
+
+def _make_report(db: Session, tmp_path, content_hash=True) -> Report:
+    file_path = tmp_path / "filing.pdf"
+    file_path.write_bytes(CONTENT)
+    report = Report(
+        title="Annual filing",
+        report_type="financial",
+        submitted_by=uuid.uuid4(),
+        company_id=uuid.uuid4(),
+        tenant_id=uuid.uuid4(),
+        file_path=str(file_path),
+        file_name="filing.pdf",
+        file_size=len(CONTENT),
+        content_hash=hashlib.sha256(CONTENT).hexdigest() if content_hash else None,
+    )
+    db.add(report)
+    db.commit()
+    return report
+
+
+def test_download_sets_strong_etag_and_honours_if_none_match(client: TestClient, superuser_token_headers, db: Session, tmp_path):
+    report = _make_report(db, tmp_path)
+    url = f"/api/v1/reports/{report.id}/download"
+
+    response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == f'"{report.content_hash}"'
+    assert response.headers["accept-ranges"] == "bytes"
+
+    response = client.get(url, headers={**superuser_token_headers, "If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_download_serves_byte_ranges(client: TestClient, superuser_token_headers, db: Session, tmp_path):
+    report = _make_report(db, tmp_path)
+    url = f"/api/v1/reports/{report.id}/download"
+
+    response = client.get(url, headers={**superuser_token_headers, "Range": "bytes=9-24"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[9:25]
+    assert response.headers["content-range"] == f"bytes 9-24/{len(CONTENT)}"
+
+    response = client.get(url, headers={**superuser_token_headers, "Range": "bytes=-10"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[-10:]
+
+    response = client.get(url, headers={**superuser_token_headers, "Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+
+    # A stale If-Range validator gets the full, current file
+    response = client.get(url, headers={**superuser_token_headers, "Range": "bytes=0-3", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_batch_archive_streams_authorized_reports(client: TestClient, superuser_token_headers, db: Session, tmp_path):
+    import io
+    import zipfile
+
+    report = _make_report(db, tmp_path)
+    notes = tmp_path / "notes.txt"
+    notes.write_text("line\n" * 1000)
+    second = Report(
+        title="Notes",
+        report_type="financial",
+        submitted_by=uuid.uuid4(),
+        company_id=uuid.uuid4(),
+        tenant_id=uuid.uuid4(),
+        file_path=str(notes),
+        file_name="filing.pdf",  # duplicate name gets de-duplicated in the archive
+    )
+    missing = Report(
+        title="Missing",
+        report_type="financial",
+        submitted_by=uuid.uuid4(),
+        company_id=uuid.uuid4(),
+        tenant_id=uuid.uuid4(),
+        file_path=str(tmp_path / "gone.pdf"),  # skipped while the archive streams
+        file_name="gone.pdf",
+    )
+    db.add_all([second, missing])
+    db.commit()
+
+    response = client.post(
+        "/api/v1/reports/batch/archive",
+        headers=superuser_token_headers,
+        json=[str(report.id), str(missing.id), str(second.id), str(uuid.uuid4()), "not-a-uuid"],
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.namelist() == ["filing.pdf", "filing (2).pdf"]
+        assert archive.read("filing.pdf") == CONTENT
+        assert archive.getinfo("filing.pdf").compress_type == zipfile.ZIP_STORED
+        assert archive.read("filing (2).pdf") == notes.read_bytes()
+        assert archive.testzip() is None
+
+
+def test_batch_archive_with_nothing_downloadable_is_404(client: TestClient, superuser_token_headers):
+    response = client.post("/api/v1/reports/batch/archive", headers=superuser_token_headers, json=[str(uuid.uuid4())])
+    assert response.status_code == 404
+
+
+def test_download_redirects_to_presigned_url(client: TestClient, superuser_token_headers, db: Session, tmp_path, monkeypatch):
+    from app.api.v1 import reports as reports_api
+    from app.services.storage import LocalStorage
+
+    class PresigningStorage(LocalStorage):
+        def presigned_url(self, key, filename=None, expires_in=None):
+            return f"https://storage.example/{filename}?X-Amz-Signature=abc"
+
+    monkeypatch.setattr(reports_api, "storage", PresigningStorage())
+    report = _make_report(db, tmp_path)
+
+    response = client.get(f"/api/v1/reports/{report.id}/download", headers=superuser_token_headers, follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"] == "https://storage.example/filing.pdf?X-Amz-Signature=abc"
+
+    response = client.get(f"/api/v1/reports/{report.id}/download-url", headers=superuser_token_headers)
+    assert response.json()["url"] == "https://storage.example/filing.pdf?X-Amz-Signature=abc"
@@ -71,3 +71,42 @@ def test_update_tax_rate(client: TestClient, superuser_token_headers, db: Sessio
     # Verify in DB
     db.refresh(tax_rate)
     assert float(tax_rate.rate) == 21.5
+
+def test_get_current_rate_as_of(client: TestClient, normal_user_token_headers, db: Session):
+    db.add_all([
+        TaxRate(country_code="UZ", country_name="Uzbekistan", tax_type="vat",
+                rate=15.0, effective_from=date(2019, 10, 1), effective_to=date(2022, 12, 31)),
+        TaxRate(country_code="UZ", country_name="Uzbekistan", tax_type="vat",
+                rate=12.0, effective_from=date(2023, 1, 1)),
+    ])
+    db.commit()
+
+    response = client.get("/api/v1/tax-rates/current/UZ/vat?as_of=2021-06-30", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert float(response.json()["rate"]) == 15.0
+
+    response = client.get("/api/v1/tax-rates/current/UZ/vat", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert float(response.json()["rate"]) == 12.0
+
+    response = client.get("/api/v1/tax-rates/current/UZ/vat?as_of=2019-01-01", headers=normal_user_token_headers)
+    assert response.status_code == 404
+
+
+def test_current_rate_with_overlapping_intervals(client: TestClient, normal_user_token_headers, db: Session):
+    # A standing rate with a temporary reduced rate recorded on top of it
+    db.add_all([
+        TaxRate(country_code="KZ", country_name="Kazakhstan", tax_type="vat",
+                rate=12.0, effective_from=date(2020, 1, 1)),
+        TaxRate(country_code="KZ", country_name="Kazakhstan", tax_type="vat",
+                rate=8.0, effective_from=date(2021, 1, 1), effective_to=date(2021, 6, 30)),
+    ])
+    db.commit()
+
+    def rate(as_of):
+        response = client.get(f"/api/v1/tax-rates/current/KZ/vat?as_of={as_of}", headers=normal_user_token_headers)
+        return float(response.json()["rate"])
+
+    assert rate("2021-03-31") == 8.0
+    assert rate("2021-09-30") == 12.0
+    assert rate("2020-06-30") == 12.0
@@ -2,20 +2,25 @@ import pytest
 from typing import Generator
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.core.query_stats import capture_queries
 from app.db.session import Base
-from app.core.deps import get_db, get_current_active_user, get_current_active_superuser
+from app.core.deps import get_db, get_async_db, get_current_active_user, get_current_active_superuser
 from app.db.models import User, TaxRate
+from app.services.tax_rate_index import tax_rate_index
+from app.services.compliance_score import regulation_key_index
+from app.services.dashboard_stats import stats_cache
 from unittest.mock import patch
 
 # Mock scheduler before importing app or running tests
 patch('app.rag.scheduler.start_scheduler').start()
 
 from app.main import app
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 
 @asynccontextmanager
 async def mock_lifespan(app):
@@ -48,6 +53,48 @@ def db(db_engine):
     transaction.rollback()
     connection.close()
 
+@pytest.fixture(autouse=True)
+def reset_tax_rate_index():
+    # The index is process-wide; each test starts from its own rolled-back data
+    tax_rate_index.invalidate()
+    yield
+    tax_rate_index.invalidate()
+
+@pytest.fixture(autouse=True)
+def reset_regulation_key_index():
+    regulation_key_index.invalidate()
+    yield
+    regulation_key_index.invalidate()
+
+@pytest.fixture(autouse=True)
+def reset_stats_cache():
+    stats_cache.clear()
+    yield
+    stats_cache.clear()
+
+@pytest.fixture
+def query_budget():
+    """
+    with query_budget(3): client.get(...)
+    fails when the block runs more SQL statements than the budget
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        with capture_queries() as stats:
+            yield stats
+        statements = "\n".join(f"  {n}x {shape}" for shape, n in stats.shapes.most_common())
+        assert stats.count <= max_queries, (
+            f"{stats.count} queries, budget is {max_queries}:\n{statements}"
+        )
+    return budget
+
+class SyncBackedAsyncSession(AsyncSession):
+    """AsyncSession over the test's sync session, so async routes see the same transaction"""
+
+    def __init__(self, sync_session):
+        super().__init__()
+        self.sync_session = self._proxied = sync_session
+
 @pytest.fixture(scope="function")
 def client(db) -> Generator:
     def override_get_db():
@@ -56,7 +103,11 @@ def client(db) -> Generator:
         finally:
             pass
     
+    async def override_get_async_db():
+        yield SyncBackedAsyncSession(db)
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -80,3 +131,12 @@ def superuser_token_headers(client):
     app.dependency_overrides[get_current_active_superuser] = override_get_current_active_superuser
     app.dependency_overrides[get_current_active_user] = override_get_current_active_superuser
     return {"Authorization": "Bearer admin_token"}
+
+@pytest.fixture(scope="function")
+def tenant_admin(client):
+    # Tenant-scoped admin (not persisted); tests add rows under its tenant_id/company_id
+    import uuid
+    user = User(id=uuid.uuid4(), email="tenant-admin@example.com", is_active=True, role="admin",
+                tenant_id=uuid.uuid4(), company_id=uuid.uuid4())
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    return user
@@ -0,0 +1,85 @@
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.models.alert import Alert, AlertSeverity, AlertStatus
+from app.db.models.compliance_score import ComplianceScoreCounter
+from app.services.compliance_score import rebuild_tenant_scores
+
+
+def _counters(db: Session, tenant_id):
+    return {
+        (c.category, c.severity, c.status): c.count
+        for c in db.query(ComplianceScoreCounter).filter(ComplianceScoreCounter.tenant_id == tenant_id)
+        if c.count
+    }
+
+
+def test_bulk_update_by_id_is_set_based(client: TestClient, db: Session, tenant_admin, query_budget):
+    alerts = [Alert(message=f"a{i}", tenant_id=tenant_admin.tenant_id) for i in range(20)]
+    foreign = Alert(message="other tenant", tenant_id=uuid.uuid4())
+    db.add_all([*alerts, foreign])
+    db.commit()
+    client.get("/api/v1/compliance/stats")
+
+    ids = [str(a.id) for a in alerts] + [str(foreign.id), "not-a-uuid"]
+    # status count, two counter upserts per (category, severity, status)
+    # group and the UPDATE; independent of the number of alerts
+    with query_budget(4):
+        response = client.post("/api/v1/compliance/alerts/bulk-update", json={"alert_ids": ids, "status": "resolved"})
+    assert response.json()["updated"] == 20
+
+    db.expire_all()
+    assert all(a.status == AlertStatus.RESOLVED and a.resolved_at is not None for a in alerts)
+    assert foreign.status == AlertStatus.OPEN
+    assert client.get("/api/v1/compliance/stats").json()["resolved"] == 20
+
+
+def test_bulk_update_by_filter(client: TestClient, db: Session, tenant_admin):
+    old = datetime.utcnow() - timedelta(days=120)
+    db.add_all([
+        Alert(message="old low", severity=AlertSeverity.LOW, tenant_id=tenant_admin.tenant_id, created_at=old),
+        Alert(message="old low 2", severity=AlertSeverity.LOW, status=AlertStatus.IN_PROGRESS,
+              tenant_id=tenant_admin.tenant_id, created_at=old),
+        Alert(message="new low", severity=AlertSeverity.LOW, tenant_id=tenant_admin.tenant_id),
+        Alert(message="old high", severity=AlertSeverity.HIGH, tenant_id=tenant_admin.tenant_id, created_at=old),
+        Alert(message="other tenant", severity=AlertSeverity.LOW, tenant_id=uuid.uuid4(), created_at=old),
+    ])
+    db.commit()
+
+    response = client.post("/api/v1/compliance/alerts/bulk-update-by-filter", json={
+        "filter": {"severity": ["low"], "older_than_days": 90},
+        "status": "resolved",
+        "resolution_notes": "Stale",
+    })
+    assert response.json()["updated"] == 2
+    resolved = db.query(Alert).filter(Alert.status == AlertStatus.RESOLVED).all()
+    assert {a.message for a in resolved} == {"old low", "old low 2"}
+    assert all(a.resolution_notes == "Stale" for a in resolved)
+
+    # The counters moved along with the statement
+    incremental = _counters(db, tenant_admin.tenant_id)
+    rebuild_tenant_scores(db, tenant_admin.tenant_id)
+    assert _counters(db, tenant_admin.tenant_id) == incremental
+
+    response = client.post("/api/v1/compliance/alerts/bulk-update-by-filter",
+                           json={"filter": {}, "status": "dismissed"})
+    assert response.status_code == 400
+
+
+def test_bulk_update_requires_changes(client: TestClient, db: Session, tenant_admin):
+    alert = Alert(message="a", tenant_id=tenant_admin.tenant_id)
+    db.add(alert)
+    db.commit()
+
+    for path, selection in (("bulk-update", {"alert_ids": [str(alert.id)]}),
+                            ("bulk-update-by-filter", {"filter": {"severity": ["medium"]}})):
+        response = client.post(f"/api/v1/compliance/alerts/{path}", json=selection)
+        assert response.status_code == 400
+        response = client.post(f"/api/v1/compliance/alerts/{path}", json={**selection, "status": None})
+        assert response.status_code == 400
+
+    db.expire_all()
+    assert alert.status == AlertStatus.OPEN and alert.updated_at is None
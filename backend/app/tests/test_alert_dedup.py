@@ -0,0 +1,59 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.models import User
+from app.db.models.alert import Alert, AlertSeverity, AlertStatus
+from app.db.models.compliance_score import ComplianceScoreCounter
+from app.services.alert_dedup import raise_alert
+from app.services.compliance_score import rebuild_tenant_scores
+
+
+def _counters(db: Session, tenant_id):
+    return {
+        (c.category, c.severity, c.status): c.count
+        for c in db.query(ComplianceScoreCounter).filter(ComplianceScoreCounter.tenant_id == tenant_id)
+        if c.count
+    }
+
+
+def _raise(db: Session, user, rule: str, severity=AlertSeverity.LOW, regulation="ISO 27001"):
+    return raise_alert(db, tenant_id=user.tenant_id, company_id=user.company_id, regulation=regulation,
+                       rule=rule, subject="2025-Q3", severity=severity, message=f"{rule} finding")
+
+
+def test_repeated_alerts_fold_into_open_alerts(client: TestClient, db: Session, tenant_admin):
+    rules = ["policy_review", "cash_flow", "audit_trail"]
+    assert all(_raise(db, tenant_admin, rule) for rule in rules)
+    db.commit()
+    assert client.get("/api/v1/compliance/stats").json()["total"] == 3
+
+    assert not any(_raise(db, tenant_admin, rule) for rule in rules)
+    db.commit()
+    alerts = db.query(Alert).filter(Alert.tenant_id == tenant_admin.tenant_id).all()
+    assert len(alerts) == 3
+    assert all(a.occurrences == 2 and a.last_seen_at >= a.created_at for a in alerts)
+    # Repeats are changes to the alert, like any other update
+    assert all(a.updated_at == a.last_seen_at for a in alerts)
+
+    # A resolved finding opens a new alert the next time it is raised
+    resolved = next(a for a in alerts if a.message == "policy_review finding")
+    client.post("/api/v1/compliance/alerts/bulk-update", json={"alert_ids": [str(resolved.id)], "status": "resolved"})
+    assert _raise(db, tenant_admin, "policy_review")
+    db.commit()
+    assert db.query(Alert).filter(Alert.tenant_id == tenant_admin.tenant_id).count() == 4
+    stats = client.get("/api/v1/compliance/stats").json()
+    assert (stats["total"], stats["low"], stats["open"], stats["resolved"]) == (4, 4, 3, 1)
+
+    incremental = _counters(db, tenant_admin.tenant_id)
+    rebuild_tenant_scores(db, tenant_admin.tenant_id)
+    assert _counters(db, tenant_admin.tenant_id) == incremental
+    assert incremental[("", "low", AlertStatus.OPEN.value)] == 3
+
+
+def test_fingerprints_are_per_tenant(db: Session, tenant_admin):
+    assert _raise(db, tenant_admin, "policy_review")
+    other = User(id=uuid.uuid4(), tenant_id=uuid.uuid4(), company_id=tenant_admin.company_id)
+    assert _raise(db, other, "policy_review")
+    assert not _raise(db, tenant_admin, "policy_review")
@@ -0,0 +1,125 @@
+import time
+import uuid
+from datetime import date
+from unittest.mock import patch
+
+from app.db.models.report import Report
+from app.db.models.report_analysis import ReportAnalysis
+from app.db.models.tax_rate import TaxRate
+from app.services.report_analyzer import ReportAnalyzer
+from app.services.revalidation_jobs import COMPLETED, FAILED, RevalidationJobs
+from app.services.tax_rate_index import tax_rate_index
+
+
+def _make_report(db, tmp_path, content="VAT charged at 20%", tenant_id=None):
+    file_path = tmp_path / f"{uuid.uuid4()}.txt"
+    file_path.write_text(content)
+    report = Report(
+        title="Quarterly VAT",
+        report_type="financial",
+        submitted_by=uuid.uuid4(),
+        company_id=uuid.uuid4(),
+        tenant_id=tenant_id or uuid.uuid4(),
+        file_path=str(file_path),
+    )
+    db.add(report)
+    db.commit()
+    return report
+
+
+@patch("app.services.report_analyzer.query_rag", return_value="ok")
+def test_identical_request_reuses_analysis(mock_rag, db, tmp_path):
+    db.add(TaxRate(country_code="GB", country_name="United Kingdom", tax_type="vat",
+                   rate=20.0, effective_from=date(2020, 1, 1)))
+    db.commit()
+    report = _make_report(db, tmp_path)
+    analyzer = ReportAnalyzer(db)
+
+    first = analyzer.analyze_report(report.id, report.file_path, "GB", ["vat"])
+    second = analyzer.analyze_report(report.id, report.file_path, "GB", ["vat"])
+
+    assert first.id == second.id
+    assert mock_rag.call_count == 1
+    assert first.file_hash and first.rate_version
+
+
+@patch("app.services.report_analyzer.query_rag", return_value="ok")
+def test_same_content_in_other_report_is_copied(mock_rag, db, tmp_path):
+    tenant_id = uuid.uuid4()
+    report_a = _make_report(db, tmp_path, tenant_id=tenant_id)
+    report_b = _make_report(db, tmp_path, tenant_id=tenant_id)
+    analyzer = ReportAnalyzer(db)
+
+    first = analyzer.analyze_report(report_a.id, report_a.file_path, "IT", ["vat"])
+    copy = analyzer.analyze_report(report_b.id, report_b.file_path, "IT", ["vat"])
+
+    assert copy.id != first.id
+    assert copy.report_id == report_b.id
+    assert copy.overall_score == first.overall_score
+    assert mock_rag.call_count == 1
+
+
+@patch("app.services.report_analyzer.query_rag", return_value="ok")
+def test_rate_change_revalidates_only_affected_country(mock_rag, db, tmp_path):
+    rate = TaxRate(country_code="ES", country_name="Spain", tax_type="vat",
+                   rate=21.0, effective_from=date(2020, 1, 1))
+    db.add(rate)
+    db.commit()
+    report_es = _make_report(db, tmp_path)
+    report_pt = _make_report(db, tmp_path)
+    analyzer = ReportAnalyzer(db)
+    analyzer.analyze_report(report_es.id, report_es.file_path, "ES", ["vat"])
+    analyzer.analyze_report(report_pt.id, report_pt.file_path, "PT", ["vat"])
+
+    rate.rate = 22.0
+    db.commit()
+    tax_rate_index.load(db)
+
+    assert analyzer.revalidate_country("PT")["revalidated"] == 0
+    result = analyzer.revalidate_country("ES")
+    assert result["revalidated"] == 1
+    assert db.query(ReportAnalysis).filter(ReportAnalysis.report_id == report_es.id).count() == 2
+    assert analyzer.revalidate_country("ES")["skipped"] == 1
+
+
+@patch("app.services.report_analyzer.query_rag", return_value="ok")
+def test_historical_period_uses_rates_in_force(mock_rag, db, tmp_path):
+    db.add_all([
+        TaxRate(country_code="NL", country_name="Netherlands", tax_type="vat",
+                rate=19.0, effective_from=date(2010, 1, 1), effective_to=date(2012, 9, 30)),
+        TaxRate(country_code="NL", country_name="Netherlands", tax_type="vat",
+                rate=21.0, effective_from=date(2012, 10, 1)),
+    ])
+    db.commit()
+    report = _make_report(db, tmp_path, content="VAT charged at 19%")
+    analyzer = ReportAnalyzer(db)
+
+    historical = analyzer.analyze_report(report.id, report.file_path, "NL", ["vat"], period_end=date(2011, 12, 31))
+    current = analyzer.analyze_report(report.id, report.file_path, "NL", ["vat"])
+
+    assert not [e for e in historical.error_details if e["type"] == "incorrect_rate"]
+    assert [e for e in current.error_details if e["type"] == "incorrect_rate"]
+
+
+@patch("app.services.report_analyzer.query_rag", return_value="ok")
+def test_revalidation_runs_as_background_job(mock_rag, db, tmp_path):
+    rate = TaxRate(country_code="FR", country_name="France", tax_type="vat",
+                   rate=20.0, effective_from=date(2020, 1, 1))
+    db.add(rate)
+    db.commit()
+    report = _make_report(db, tmp_path)
+    ReportAnalyzer(db).analyze_report(report.id, report.file_path, "FR", ["vat"])
+    rate.rate = 21.0
+    db.commit()
+    tax_rate_index.load(db)
+
+    jobs = RevalidationJobs(session_factory=lambda: db)
+    job = jobs.submit("FR")
+    deadline = time.time() + 10
+    while jobs.get(job["job_id"])["status"] not in (COMPLETED, FAILED) and time.time() < deadline:
+        time.sleep(0.05)
+    jobs.shutdown()
+
+    job = jobs.get(job["job_id"])
+    assert job["status"] == COMPLETED
+    assert job["result"]["revalidated"] == 1
@@ -0,0 +1,94 @@
+import hashlib
+import io
+import os
+import uuid
+from unittest.mock import patch
+
+from app.db.models.stored_blob import StoredBlob
+from app.services.blob_store import BlobStore
+
+
+def test_identical_uploads_are_stored_once(db, tmp_path):
+    store = BlobStore(root=str(tmp_path / "blobs"))
+    tenant_id = uuid.uuid4()
+    content = b"%PDF-1.4 invoice INV-2024-001"
+
+    first = store.store_fileobj(db, tenant_id, io.BytesIO(content), ".pdf")
+    second = store.store_fileobj(db, tenant_id, io.BytesIO(content), ".pdf")
+
+    assert first.id == second.id
+    assert second.ref_count == 2
+    assert first.sha256 == hashlib.sha256(content).hexdigest()
+    assert first.size == len(content)
+    assert db.query(StoredBlob).filter(StoredBlob.tenant_id == tenant_id).count() == 1
+    assert not os.listdir(tmp_path / "blobs" / "tmp")
+
+
+def test_blobs_are_scoped_per_tenant(db, tmp_path):
+    store = BlobStore(root=str(tmp_path / "blobs"))
+    content = b"bank statement november"
+
+    a = store.store_fileobj(db, uuid.uuid4(), io.BytesIO(content), ".pdf")
+    b = store.store_fileobj(db, uuid.uuid4(), io.BytesIO(content), ".pdf")
+
+    assert a.id != b.id
+    assert a.storage_path != b.storage_path
+
+
+def test_file_is_deleted_with_last_reference(db, tmp_path):
+    store = BlobStore(root=str(tmp_path / "blobs"))
+    tenant_id = uuid.uuid4()
+    blob = store.store_fileobj(db, tenant_id, io.BytesIO(b"contract"), ".pdf")
+    store.store_fileobj(db, tenant_id, io.BytesIO(b"contract"), ".pdf")
+    path, sha256 = blob.storage_path, blob.sha256
+
+    store.release(db, tenant_id, sha256)
+    assert os.path.exists(path)
+
+    store.release(db, tenant_id, sha256)
+    assert store.get(db, tenant_id, sha256) is None
+    # The file goes with the commit, not before
+    assert os.path.exists(path)
+    db.commit()
+    assert not os.path.exists(path)
+
+
+def test_file_survives_rolled_back_release(db, tmp_path):
+    store = BlobStore(root=str(tmp_path / "blobs"))
+    tenant_id = uuid.uuid4()
+    blob = store.store_fileobj(db, tenant_id, io.BytesIO(b"lease"), ".pdf")
+    path, sha256 = blob.storage_path, blob.sha256
+    db.commit()
+
+    savepoint = db.begin_nested()
+    store.release(db, tenant_id, sha256)
+    savepoint.rollback()
+    db.commit()
+
+    assert os.path.exists(path)
+    assert store.get(db, tenant_id, sha256).ref_count == 1
+
+
+def test_lost_insert_race_retries_and_drops_its_copy(db, tmp_path):
+    store = BlobStore(root=str(tmp_path / "blobs"))
+    tenant_id = uuid.uuid4()
+    content = b"payroll"
+    sha256 = hashlib.sha256(content).hexdigest()
+    winner = StoredBlob(tenant_id=tenant_id, sha256=sha256, size=len(content),
+                        storage_path=store.key_for(tenant_id, sha256, ".pdf"), ref_count=1)
+    lookups = iter([None])
+
+    def get_for_update(db, tenant_id, sha256):
+        # The first lookup misses the row a concurrent upload is inserting
+        if next(lookups, True) is None:
+            db.add(winner)
+            db.flush()
+            return None
+        return BlobStore._get_for_update(store, db, tenant_id, sha256)
+
+    with patch.object(store, "_get_for_update", side_effect=get_for_update):
+        blob = store.store_fileobj(db, tenant_id, io.BytesIO(content), ".pdf")
+
+    assert blob.id == winner.id
+    assert blob.ref_count == 2
+    assert os.listdir(tmp_path / "blobs" / str(tenant_id) / sha256[:2]) == []
@@ -0,0 +1,168 @@
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.models.alert import Alert
+from app.db.models.balance_sheet import BalanceSheet, BalanceSheetCategory, BalanceSheetItem, BalanceSheetStatus
+from app.db.models.company import Company
+from app.db.models.compliance_score import ComplianceScoreCounter
+from app.db.models.report import Report
+from app.db.models.report_analysis import ReportAnalysis
+from app.db.models.tax_rate import TaxRate
+from app.db.models.tenant import Tenant
+from app.services import compliance_engine
+from app.services.compliance_engine import last_closed_quarter, scan_shard
+
+
+def _company(db: Session, tenant_id, name):
+    company = Company(id=uuid.uuid4(), name=name, tenant_id=tenant_id)
+    db.add(company)
+    return company
+
+
+def _seed(db: Session, tenant_id):
+    """One finding per rule across two companies"""
+    today = datetime.now(timezone.utc).date()
+    start, _, _ = last_closed_quarter(today)
+    balanced, reporting = _company(db, tenant_id, f"A {tenant_id}"), _company(db, tenant_id, f"B {tenant_id}")
+
+    # Missing balance sheet: `reporting`; unbalanced balance sheet: `balanced`
+    sheet = BalanceSheet(company_id=balanced.id, period=datetime.combine(start, datetime.min.time()),
+                         status=BalanceSheetStatus.SUBMITTED)
+    db.add(sheet)
+    db.flush()
+    db.add_all([
+        BalanceSheetItem(balance_sheet_id=sheet.id, account_name="Cash", amount=Decimal("100"),
+                         category=BalanceSheetCategory.ASSETS),
+        BalanceSheetItem(balance_sheet_id=sheet.id, account_name="Loans", amount=Decimal("50"),
+                         category=BalanceSheetCategory.LIABILITIES),
+        BalanceSheetItem(balance_sheet_id=sheet.id, account_name="Capital", amount=Decimal("30"),
+                         category=BalanceSheetCategory.EQUITY),
+    ])
+
+    # Overdue draft, and a report whose latest analysis scored low
+    report_fields = dict(report_type="financial", submitted_by=uuid.uuid4(), tenant_id=tenant_id)
+    db.add(Report(title="Late", status="draft", company_id=balanced.id,
+                  created_at=datetime.now(timezone.utc) - timedelta(days=60), **report_fields))
+    scored = Report(title="Scored", status="approved", company_id=reporting.id, **report_fields)
+    db.add(scored)
+    db.flush()
+    now = datetime.now(timezone.utc)
+    db.add_all([
+        ReportAnalysis(report_id=scored.id, country_code="UZ", overall_score=90, created_at=now - timedelta(days=2)),
+        ReportAnalysis(report_id=scored.id, country_code="UZ", overall_score=40, created_at=now),
+    ])
+    db.commit()
+
+
+@pytest.fixture
+def tax_rates(db: Session):
+    today = date.today()
+    db.add_all([
+        # Expired with no successor
+        TaxRate(country_code="UZ", country_name="Uzbekistan", tax_type="vat", rate=Decimal("12"),
+                effective_from=today - timedelta(days=400), effective_to=today - timedelta(days=10)),
+        # Replaced by a current rate
+        TaxRate(country_code="UZ", country_name="Uzbekistan", tax_type="corporate", rate=Decimal("12"),
+                effective_from=today - timedelta(days=400), effective_to=today - timedelta(days=10)),
+        TaxRate(country_code="UZ", country_name="Uzbekistan", tax_type="corporate", rate=Decimal("15"),
+                effective_from=today - timedelta(days=9)),
+    ])
+    db.commit()
+
+
+def test_run_check_evaluates_rules_for_all_companies(client: TestClient, db: Session, tenant_admin, tax_rates):
+    _seed(db, tenant_admin.tenant_id)
+    _seed(db, uuid.uuid4())
+
+    body = client.post("/api/v1/compliance/run-check").json()
+    assert {rule: result["new_alerts"] for rule, result in body["rules"].items()} == {
+        "missing_balance_sheet": 1,
+        "unbalanced_balance_sheet": 1,
+        "overdue_report": 1,
+        "expired_tax_rate": 1,
+        "low_analysis_score": 1,
+    }
+    alerts = db.query(Alert).filter(Alert.tenant_id == tenant_admin.tenant_id).all()
+    assert len(alerts) == 5
+    assert any(a.message == "No vat tax rate in force for UZ since " + str(date.today() - timedelta(days=10))
+               for a in alerts)
+    assert any(a.message == "Report 'Scored' scored 40 in its latest compliance analysis" for a in alerts)
+
+    body = client.post("/api/v1/compliance/run-check").json()
+    assert (body["new_alerts"], body["repeated_alerts"]) == (0, 5)
+    assert db.query(Alert).filter(Alert.tenant_id == tenant_admin.tenant_id).count() == 5
+
+
+def test_scan_shards_cover_every_tenant_once(db: Session, tax_rates):
+    tenants = [Tenant(id=uuid.uuid4(), name=f"Tenant {i}") for i in range(4)]
+    db.add_all(tenants)
+    for tenant in tenants:
+        _seed(db, tenant.id)
+
+    def session_factory():
+        return Session(bind=db.connection())
+
+    shards = 3
+    assert sum(scan_shard(shard, shards, session_factory) for shard in range(shards)) == 5 * len(tenants)
+    for tenant in tenants:
+        assert db.query(Alert).filter(Alert.tenant_id == tenant.id).count() == 5
+
+
+def test_scan_recounts_drifted_score_counters(db: Session, tax_rates):
+    tenant = Tenant(id=uuid.uuid4(), name="Drifted")
+    db.add(tenant)
+    _seed(db, tenant.id)
+    db.add(Alert(message="Manual", tenant_id=tenant.id))
+    db.commit()
+    # Counters missed by a write that bypassed the flush events
+    db.query(ComplianceScoreCounter).filter(ComplianceScoreCounter.tenant_id == tenant.id).update(
+        {ComplianceScoreCounter.count: 0}
+    )
+    db.commit()
+
+    scan_shard(session_factory=lambda: Session(bind=db.connection()))
+
+    counted = db.query(func.sum(ComplianceScoreCounter.count)).filter(
+        ComplianceScoreCounter.tenant_id == tenant.id
+    ).scalar()
+    assert counted == db.query(Alert).filter(Alert.tenant_id == tenant.id).count() == 6
+
+
+def test_scan_all_runs_once_in_spawned_workers(monkeypatch):
+    started = []
+
+    class Pool:
+        def __init__(self, max_workers, mp_context):
+            started.append((max_workers, mp_context.get_start_method()))
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def map(self, fn, shards, counts):
+            return [shard + 1 for shard in shards]
+
+    def scan_lock(acquired):
+        @contextmanager
+        def try_lock(engine, namespace, key=0):
+            yield acquired
+        return try_lock
+
+    monkeypatch.setattr(compliance_engine, "ProcessPoolExecutor", Pool)
+    monkeypatch.setattr(compliance_engine.locks, "try_lock", scan_lock(True))
+    assert compliance_engine.scan_all(workers=3) == 6
+    assert started == [(3, "spawn")]
+
+    # Another process's scan holds the lock
+    monkeypatch.setattr(compliance_engine.locks, "try_lock", scan_lock(False))
+    assert compliance_engine.scan_all(workers=3) == 0
+    assert len(started) == 1
@@ -0,0 +1,113 @@
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.models.alert import Alert, AlertSeverity, AlertStatus
+from app.db.models.compliance_score import ComplianceScoreCounter, ComplianceScoreState
+from app.db.models.regulation import Regulation
+from app.db import locks
+from app.services.compliance_score import lock_tenant_scores, normalize_regulation_key, regulation_key_index
+
+
+@pytest.fixture
+def regulations(db: Session):
+    db.add_all([
+        Regulation(code="IFRS-9", title="Financial Instruments", category="IFRS"),
+        Regulation(code="IAS 1", title="Presentation of Financial Statements", category="IFRS"),
+        Regulation(code="GDPR", title="General Data Protection Regulation", category="Privacy"),
+        Regulation(code="NK-UZ", title="Tax Code"),
+    ])
+    db.commit()
+
+
+def _counts(db: Session, tenant_id):
+    return {
+        (c.category, c.severity, c.status): c.count
+        for c in db.query(ComplianceScoreCounter).filter(ComplianceScoreCounter.tenant_id == tenant_id)
+        if c.count
+    }
+
+
+def test_regulation_keys_are_normalized(db: Session, tenant_admin, regulations):
+    assert normalize_regulation_key("  IFRS-9 ") == "ifrs 9"
+    regulation_key_index.load(db)
+    assert regulation_key_index.category_for("ifrs_9") == "IFRS"
+    assert regulation_key_index.category_for("IFRS IAS 1") == "IFRS"
+    assert regulation_key_index.category_for("GDPR art. 33") == "Privacy"
+    assert regulation_key_index.category_for("SOX 404") is None
+
+
+def test_counters_follow_alert_writes(client: TestClient, db: Session, tenant_admin, regulations):
+    created = client.post("/api/v1/compliance/alerts", json={
+        "message": "Impairment model missing", "severity": "critical", "regulation": "ifrs-9",
+    }).json()
+    assert created["category"] == "IFRS"
+    client.post("/api/v1/compliance/alerts", json={"message": "Breach not reported", "severity": "high",
+                                                   "regulation": "GDPR"})
+    client.post("/api/v1/compliance/alerts", json={"message": "Unknown", "severity": "low", "regulation": "SOX"})
+    assert _counts(db, tenant_admin.tenant_id) == {
+        ("IFRS", "critical", "open"): 1, ("Privacy", "high", "open"): 1, ("", "low", "open"): 1,
+    }
+
+    client.put(f"/api/v1/compliance/alerts/{created['id']}", json={"status": "resolved"})
+    db.expire_all()
+    assert _counts(db, tenant_admin.tenant_id) == {
+        ("IFRS", "critical", "resolved"): 1, ("Privacy", "high", "open"): 1, ("", "low", "open"): 1,
+    }
+
+    score = client.get("/api/v1/compliance-score/score").json()
+    assert score["total_regulations"] == 4
+    assert score["alerts"]["total"] == 2
+    assert score["alerts"]["high"] == 1 and score["alerts"]["critical"] == 0
+    # high (5) + low (1) penalty points out of 4 regulations * 10
+    assert score["overall_score"] == 85.0
+    assert score["category_scores"]["IFRS"] == {"total_regulations": 2, "open_alerts": 0, "score": 100.0}
+    assert score["category_scores"]["Privacy"] == {"total_regulations": 1, "open_alerts": 1, "score": 50.0}
+
+
+def test_score_rebuilds_tenant_without_counters(client: TestClient, db: Session, tenant_admin, regulations,
+                                                query_budget):
+    # Alerts written before the counters existed
+    for severity in (AlertSeverity.CRITICAL, AlertSeverity.MEDIUM):
+        db.add(Alert(message="Legacy", severity=severity, regulation="IAS 1", tenant_id=tenant_admin.tenant_id))
+    db.commit()
+    db.query(ComplianceScoreCounter).delete()
+    db.query(Alert).update({Alert.category: None})
+    db.commit()
+
+    score = client.get("/api/v1/compliance-score/score").json()
+    assert db.get(ComplianceScoreState, tenant_admin.tenant_id) is not None
+    assert score["alerts"]["total"] == 2
+    assert score["category_scores"]["IFRS"]["open_alerts"] == 2
+    assert {alert.category for alert in db.query(Alert)} == {"IFRS"}
+
+    # Later reads only touch the counters, however many alerts there are
+    for _ in range(50):
+        db.add(Alert(message="More", severity=AlertSeverity.LOW, status=AlertStatus.IN_PROGRESS,
+                     regulation="GDPR", tenant_id=tenant_admin.tenant_id))
+    db.commit()
+    with query_budget(3):
+        score = client.get("/api/v1/compliance-score/score").json()
+    assert score["alerts"]["in_progress"] == 50
+    assert score["category_scores"]["Privacy"]["open_alerts"] == 50
+
+
+def test_counter_writers_take_tenant_locks_in_key_order():
+    class PostgresConnection:
+        dialect = postgresql.dialect()
+        statements = []
+
+        def execute(self, statement):
+            compiled = statement.compile(dialect=self.dialect)
+            self.statements.append((str(compiled), list(compiled.params.values())))
+
+    tenants = [uuid.uuid4() for _ in range(3)]
+    lock_tenant_scores(PostgresConnection(), [*tenants, None, tenants[0]])
+
+    assert all("pg_advisory_xact_lock" in sql for sql, _ in PostgresConnection.statements)
+    keys = [params for _, params in PostgresConnection.statements]
+    assert keys == sorted([locks.COMPLIANCE_SCORE_COUNTERS, locks.lock_key(t)] for t in tenants)
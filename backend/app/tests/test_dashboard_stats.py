@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.models.alert import Alert, AlertSeverity, AlertStatus
+from app.db.models.audit_log import AuditLog
+
+
+def test_alert_stats_in_one_cached_query(client: TestClient, db: Session, tenant_admin, query_budget):
+    tenant_id = tenant_admin.tenant_id
+    db.add_all([
+        Alert(message="a", severity=AlertSeverity.CRITICAL, tenant_id=tenant_id),
+        Alert(message="b", severity=AlertSeverity.HIGH, status=AlertStatus.IN_PROGRESS, tenant_id=tenant_id),
+        Alert(message="c", severity=AlertSeverity.LOW, status=AlertStatus.RESOLVED, tenant_id=tenant_id),
+        Alert(message="d", severity=AlertSeverity.LOW, status=AlertStatus.DISMISSED, tenant_id=tenant_id),
+        Alert(message="other tenant", tenant_id=uuid.uuid4()),
+    ])
+    db.commit()
+
+    with query_budget(1):
+        stats = client.get("/api/v1/compliance/stats").json()
+    assert stats == {
+        "total": 4, "critical": 1, "high": 1, "medium": 0, "low": 2,
+        "open": 1, "in_progress": 1, "resolved": 1, "dismissed": 1,
+        "compliance_score": 38.8,
+    }
+
+    with query_budget(0):
+        assert client.get("/api/v1/compliance/stats").json() == stats
+
+    # A write to the tenant's alerts drops the cached stats
+    client.post("/api/v1/compliance/alerts", json={"message": "e", "severity": "medium"})
+    assert client.get("/api/v1/compliance/stats").json()["total"] == 5
+
+
+def test_audit_stats_in_one_query(client: TestClient, db: Session, tenant_admin, query_budget):
+    now = datetime.utcnow()
+    actors = [uuid.uuid4() for _ in range(3)]
+    tenant_id = tenant_admin.tenant_id
+    db.add_all([
+        AuditLog(tenant_id=tenant_id, user_id=actors[0], action="view", timestamp=now),
+        AuditLog(tenant_id=tenant_id, user_id=actors[0], action="delete", timestamp=now),
+        AuditLog(tenant_id=tenant_id, user_id=actors[1], action="update", timestamp=now - timedelta(hours=2)),
+        AuditLog(tenant_id=tenant_id, user_id=None, action="login", timestamp=now),
+        AuditLog(tenant_id=tenant_id, user_id=actors[2], action="role_change", timestamp=now - timedelta(days=3)),
+        AuditLog(tenant_id=tenant_id, user_id=actors[2], action="delete", timestamp=now - timedelta(days=60)),
+        AuditLog(tenant_id=uuid.uuid4(), user_id=actors[1], action="delete", timestamp=now),
+    ])
+    db.commit()
+
+    with query_budget(1):
+        stats = client.get("/api/v1/audit-logs/stats").json()
+    assert stats["total_actions"] == 6
+    assert stats["active_users"] == 2
+    assert stats["critical_actions"] == 2
+    assert stats["today_actions"] >= 2
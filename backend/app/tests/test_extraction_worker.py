@@ -0,0 +1,97 @@
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.db.models.document import Document, DocumentStatus, DocumentType
+from app.services.extraction_worker import DocumentExtractionWorker
+
+
+def _make_document(db, status=DocumentStatus.PENDING):
+    document = Document(
+        company_id=uuid.uuid4(),
+        uploaded_by=uuid.uuid4(),
+        filename="invoice.pdf",
+        file_path="uploads/documents/invoice.pdf",
+        document_type=DocumentType.INVOICE,
+        status=status,
+    )
+    db.add(document)
+    db.commit()
+    return document
+
+
+@patch("app.services.extraction_worker.DocumentExtractionService.process_document",
+       return_value={"invoice_number": "INV-1"})
+def test_worker_completes_pending_document(mock_process, db):
+    document = _make_document(db)
+    worker = DocumentExtractionWorker(session_factory=lambda: db)
+
+    worker.process(document.id)
+
+    document = db.query(Document).filter(Document.id == document.id).one()
+    assert document.status == DocumentStatus.COMPLETED
+    assert json.loads(document.extracted_data) == {"invoice_number": "INV-1"}
+    mock_process.assert_called_once_with("uploads/documents/invoice.pdf", "invoice")
+
+
+@patch("app.services.extraction_worker.DocumentExtractionService.process_document")
+def test_worker_skips_documents_already_claimed(mock_process, db):
+    document = _make_document(db, status=DocumentStatus.PROCESSING)
+    worker = DocumentExtractionWorker(session_factory=lambda: db)
+
+    worker.process(document.id)
+
+    mock_process.assert_not_called()
+
+
+@patch("app.services.extraction_worker.DocumentExtractionService.process_document",
+       return_value={"error": "Could not extract sufficient text from document"})
+def test_worker_records_extraction_errors(mock_process, db):
+    document = _make_document(db)
+    worker = DocumentExtractionWorker(session_factory=lambda: db)
+
+    worker.process(document.id)
+
+    document = db.query(Document).filter(Document.id == document.id).one()
+    assert document.status == DocumentStatus.ERROR
+    assert document.error_message == "Could not extract sufficient text from document"
+
+
+def test_resume_takes_back_only_expired_leases(db):
+    live = _make_document(db, status=DocumentStatus.PROCESSING)
+    stale = _make_document(db, status=DocumentStatus.PROCESSING)
+    live.claimed_by, live.heartbeat_at = "other-host:1:live", datetime.now(timezone.utc)
+    stale.claimed_by = "other-host:2:dead"
+    stale.heartbeat_at = datetime.now(timezone.utc) - timedelta(seconds=settings.DOCUMENT_EXTRACTION_LEASE_SECONDS + 1)
+    db.commit()
+    worker = DocumentExtractionWorker(session_factory=lambda: db)
+
+    live_id, stale_id = live.id, stale.id
+
+    with patch.object(worker, "submit") as submit:
+        assert worker.resume_pending() == 1
+    submit.assert_called_once_with(stale_id)
+
+    live = db.query(Document).filter(Document.id == live_id).one()
+    stale = db.query(Document).filter(Document.id == stale_id).one()
+    assert (live.status, live.claimed_by) == (DocumentStatus.PROCESSING, "other-host:1:live")
+    assert (stale.status, stale.claimed_by) == (DocumentStatus.PENDING, None)
+
+
+def test_worker_discards_result_after_losing_its_claim(db):
+    document_id = _make_document(db).id
+    worker = DocumentExtractionWorker(session_factory=lambda: db)
+
+    def reclaimed_meanwhile(*args):
+        db.query(Document).filter(Document.id == document_id).update({Document.claimed_by: "other-host:3:new"})
+        return {"invoice_number": "INV-1"}
+
+    with patch("app.services.extraction_worker.DocumentExtractionService.process_document",
+               side_effect=reclaimed_meanwhile):
+        worker.process(document_id)
+
+    document = db.query(Document).filter(Document.id == document_id).one()
+    assert document.status == DocumentStatus.PROCESSING
+    assert document.extracted_data is None
@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+from reportlab.pdfgen import canvas
+
+from app.core.config import settings
+from app.services import pdf_extraction
+from app.services.pdf_extraction import TextCache, extract_pdf_text
+
+
+def _make_pdf(path, pages):
+    pdf = canvas.Canvas(str(path))
+    for i in range(pages):
+        pdf.drawString(72, 720, f"Page {i + 1} VAT 12%")
+        pdf.showPage()
+    pdf.save()
+
+
+def test_extract_pdf_text_is_cached(tmp_path):
+    pdf_path = tmp_path / "statement.pdf"
+    _make_pdf(pdf_path, 3)
+
+    with patch.object(pdf_extraction, "text_cache", TextCache(str(tmp_path / "cache"))):
+        text = extract_pdf_text(str(pdf_path))
+        assert [line for line in text.splitlines() if line] == [f"Page {i} VAT 12%" for i in (1, 2, 3)]
+
+        with patch.object(pdf_extraction, "iter_pdf_pages") as mock_iter:
+            assert extract_pdf_text(str(pdf_path)) == text
+            mock_iter.assert_not_called()
+
+
+def test_large_pdf_is_extracted_in_page_order(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "filing.pdf"
+    _make_pdf(pdf_path, 7)
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(settings, "PDF_PAGES_PER_TASK", 3)
+    monkeypatch.setattr(settings, "PDF_EXTRACT_WORKERS", 2)
+
+    try:
+        pages = list(pdf_extraction.iter_pdf_pages(str(pdf_path)))
+        # Workers are spawned, not forked from the multithreaded API process
+        assert pdf_extraction.get_pool()._mp_context.get_start_method() == "spawn"
+    finally:
+        pdf_extraction.shutdown_pool()
+
+    assert [p.strip() for p in pages] == [f"Page {i} VAT 12%" for i in range(1, 8)]
+
+
+def test_ocr_batches_group_consecutive_pages():
+    from app.services.pdf_ocr import _batches
+
+    assert _batches([1, 2, 3, 4, 5, 8, 9, 12], 3) == [(1, 3), (4, 5), (8, 9), (12, 12)]
+    assert _batches([], 4) == []
+
+
+def test_mixed_pdf_only_ocrs_pages_without_text(tmp_path):
+    from app.services import pdf_ocr
+
+    pdf_path = tmp_path / "mixed.pdf"
+    pdf = canvas.Canvas(str(pdf_path))
+    pdf.drawString(72, 720, "Opening balance 1,000.00 carried forward")
+    pdf.showPage()
+    pdf.showPage()  # scanned page: no text layer
+    pdf.drawString(72, 720, "Closing balance 2,500.00 carried forward")
+    pdf.showPage()
+    pdf.save()
+
+    with patch.object(pdf_ocr, "text_cache", TextCache(str(tmp_path / "cache"))), \
+            patch.object(pdf_ocr, "_ocr_page_range", return_value=["Scanned deposit 1,500.00"]) as mock_ocr:
+        text = pdf_ocr.extract_pdf_text_with_ocr(str(pdf_path))
+
+    mock_ocr.assert_called_once_with(str(pdf_path), 2, 2, settings.OCR_DPI)
+    assert [line for line in text.splitlines() if line] == [
+        "Opening balance 1,000.00 carried forward",
+        "Scanned deposit 1,500.00",
+        "Closing balance 2,500.00 carried forward",
+    ]
@@ -0,0 +1,64 @@
+import logging
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core import query_stats
+from app.core.config import settings
+from app.db.models import User
+from app.db.models.audit_log import AuditLog
+
+
+def _add_logs(db: Session, tenant_id, users: int, per_user: int):
+    for i in range(users):
+        actor = User(id=uuid.uuid4(), email=f"actor{i}@example.com", hashed_password="x", tenant_id=tenant_id)
+        db.add(actor)
+        for _ in range(per_user):
+            db.add(AuditLog(tenant_id=tenant_id, user_id=actor.id, action="update"))
+    db.commit()
+
+
+def test_statement_shape_collapses_parameter_lists():
+    assert query_stats.statement_shape("SELECT *\n  FROM t WHERE id IN (?, ?, ?)") == \
+        query_stats.statement_shape("SELECT * FROM t WHERE id IN (?, ?)")
+    assert query_stats.statement_shape("SELECT * FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s)") == \
+        "SELECT * FROM t WHERE id IN (?)"
+
+
+def test_audit_log_page_query_count_is_constant(client: TestClient, db: Session, tenant_admin, query_budget):
+    _add_logs(db, tenant_admin.tenant_id, users=5, per_user=3)
+
+    # count + page + one batched user lookup, however many authors are on the page
+    with query_budget(3):
+        response = client.get("/api/v1/audit-logs/")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 15
+    assert {log["user_email"] for log in body["logs"]} == {f"actor{i}@example.com" for i in range(5)}
+
+
+def test_debug_headers(client: TestClient, tenant_admin, monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_STATS_HEADERS", True)
+    response = client.get("/api/v1/compliance/stats")
+    assert int(response.headers["x-db-query-count"]) > 0
+    assert float(response.headers["x-db-query-time"]) >= 0
+
+    monkeypatch.setattr(settings, "QUERY_STATS_HEADERS", False)
+    assert "x-db-query-count" not in client.get("/api/v1/compliance/stats").headers
+
+
+def test_repeated_statements_are_logged_as_n_plus_one(db: Session, caplog):
+    stats = query_stats.QueryStats()
+    token = query_stats._request_stats.set(stats)
+    try:
+        for i in range(4):
+            db.execute(text("SELECT :value"), {"value": i})
+    finally:
+        query_stats._request_stats.reset(token)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_stats"):
+        query_stats.report_request(stats, "GET", "/things", threshold=3)
+    assert stats.count == 4
+    assert "ran 4 times" in caplog.text
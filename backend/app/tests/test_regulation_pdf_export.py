@@ -0,0 +1,68 @@
+import io
+import time
+import uuid
+
+from pypdf import PdfReader
+
+from app.core.config import settings
+from app.db.models.regulation import Regulation
+from app.services.regulation_pdf_export import READY, RegulationPdfExporter
+
+
+def _add_regulations(db, tenant_id, count, start=0):
+    for i in range(start, start + count):
+        db.add(Regulation(code=f"UZ-{i:04d}", title=f"Tax Code article {i}", jurisdiction="UZ", tenant_id=tenant_id))
+    db.commit()
+
+
+def test_catalog_renders_in_batches(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_EXPORT_BATCH_ROWS", 40)
+    tenant_id = uuid.uuid4()
+    _add_regulations(db, tenant_id, 130)
+    exporter = RegulationPdfExporter(cache_dir=str(tmp_path))
+
+    job_id = exporter.job_id(db, tenant_id)
+    path = exporter.render(db, tenant_id, job_id)
+
+    reader = PdfReader(str(path))
+    text = "".join(page.extract_text() for page in reader.pages)
+    assert len(reader.pages) > 1
+    assert "UZ-0000" in text and "UZ-0129" in text
+
+
+def test_unchanged_catalog_is_served_from_cache(db, tmp_path):
+    tenant_id = uuid.uuid4()
+    _add_regulations(db, tenant_id, 3)
+    exporter = RegulationPdfExporter(cache_dir=str(tmp_path))
+
+    job_id = exporter.job_id(db, tenant_id, jurisdiction="UZ")
+    path = exporter.render(db, tenant_id, job_id, jurisdiction="UZ")
+    mtime = path.stat().st_mtime_ns
+
+    assert exporter.job_id(db, tenant_id, jurisdiction="UZ") == job_id
+    assert exporter.render(db, tenant_id, job_id, jurisdiction="UZ").stat().st_mtime_ns == mtime
+    # Other tenants never see this artifact
+    assert exporter.status(uuid.uuid4(), job_id) is None
+
+    _add_regulations(db, tenant_id, 1, start=3)
+    new_job_id = exporter.job_id(db, tenant_id, jurisdiction="UZ")
+    assert new_job_id != job_id
+    exporter.render(db, tenant_id, new_job_id, jurisdiction="UZ")
+    assert not path.exists()
+
+
+def test_background_job_produces_artifact(db, tmp_path):
+    tenant_id = uuid.uuid4()
+    _add_regulations(db, tenant_id, 5)
+    exporter = RegulationPdfExporter(cache_dir=str(tmp_path), session_factory=lambda: db)
+    job_id = exporter.job_id(db, tenant_id)
+
+    exporter.submit(tenant_id, job_id)
+    deadline = time.time() + 10
+    while exporter.status(tenant_id, job_id) != READY and time.time() < deadline:
+        time.sleep(0.05)
+    exporter.shutdown()
+
+    assert exporter.status(tenant_id, job_id) == READY
+    content = exporter.artifact_path(tenant_id, job_id).read_bytes()
+    assert "UZ-0004" in PdfReader(io.BytesIO(content)).pages[0].extract_text()
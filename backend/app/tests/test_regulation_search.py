@@ -0,0 +1,63 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.models.regulation import Regulation
+from app.services.regulation_search import fts5_query, ranked_search_statement
+
+
+def _seed(db: Session):
+    db.add_all([
+        Regulation(code="IFRS-9", title="Financial Instruments",
+                   content="Classification and measurement of financial assets and impairment."),
+        Regulation(code="NK-UZ-2020", title="Tax Code of Uzbekistan",
+                   content="Qo'shilgan qiymat solig'i (VAT) is charged on taxable turnover."),
+        Regulation(code="FZ-152", title="О персональных данных",
+                   content="Обработка персональных данных допускается с согласия субъекта."),
+        Regulation(code="INT-1", title="Internal impairment policy", tenant_id=uuid.uuid4(),
+                   content="Impairment review of another tenant."),
+    ])
+    db.commit()
+
+
+def test_catalog_search_ranks_and_highlights_content(client: TestClient, db: Session, tenant_admin):
+    _seed(db)
+
+    hits = client.get("/api/v1/regulations/catalog-search", params={"q": "impairment"}).json()
+    assert [hit["code"] for hit in hits] == ["IFRS-9"]
+    assert "<mark>impairment</mark>" in hits[0]["snippet"]
+
+    # Prefix terms, Cyrillic text, and codes
+    assert [h["code"] for h in client.get("/api/v1/regulations/catalog-search", params={"q": "персональн"}).json()] == ["FZ-152"]
+    assert [h["code"] for h in client.get("/api/v1/regulations/catalog-search", params={"q": "NK-UZ"}).json()] == ["NK-UZ-2020"]
+
+
+def test_list_filter_searches_content_and_follows_edits(client: TestClient, db: Session, tenant_admin):
+    _seed(db)
+
+    codes = [r["code"] for r in client.get("/api/v1/regulations/list", params={"search": "turnover"}).json()]
+    assert codes == ["NK-UZ-2020"]
+
+    regulation = db.query(Regulation).filter(Regulation.code == "NK-UZ-2020").one()
+    regulation.content = "Excise duties on imported goods."
+    db.commit()
+    assert client.get("/api/v1/regulations/list", params={"search": "turnover"}).json() == []
+    assert len(client.get("/api/v1/regulations/list", params={"search": "excise"}).json()) == 1
+
+    db.delete(regulation)
+    db.commit()
+    assert client.get("/api/v1/regulations/list", params={"search": "excise"}).json() == []
+
+
+def test_fts5_query_quotes_user_input():
+    assert fts5_query('tax "code" OR -x') == '"tax"* "code"* "OR"* "x"*'
+    assert fts5_query("  --  ") is None
+
+
+def test_postgres_statement_uses_search_vector_and_trigrams():
+    sql = str(ranked_search_statement("tax code", "postgresql", 10).compile(dialect=postgresql.dialect()))
+    assert "regulations.search_vector @@" in sql
+    assert "websearch_to_tsquery('russian'::regconfig" in sql
+    assert "ts_headline" in sql and "similarity(regulations.code" in sql
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.models.report import Report
+from app.db.models.report_analysis import ReportAnalysis
+from app.db.models.report_rollup import ReportDailyRollup
+from app.services.report_rollups import rebuild_report_rollups
+
+
+@pytest.fixture
+def accountant(db: Session, tenant_admin):
+    # Personal analytics only cover the accountant's own reports
+    tenant_admin.role = "accountant"
+    tenant_admin.hashed_password = "x"
+    db.add(tenant_admin)
+    db.commit()
+    return tenant_admin
+
+
+def _report(user, created_at, status="draft"):
+    return Report(title="Q report", report_type="financial", status=status, submitted_by=user.id,
+                  company_id=user.company_id, tenant_id=user.tenant_id, created_at=created_at)
+
+
+def _rollups(db: Session):
+    return {
+        (r.day, r.company_id, r.user_id, r.status): (r.report_count, r.analysis_count, r.scored_count, r.score_sum)
+        for r in db.query(ReportDailyRollup)
+        if any((r.report_count, r.analysis_count, r.scored_count, r.score_sum))
+    }
+
+
+def test_rollups_follow_report_and_analysis_writes(db: Session, accountant):
+    now = datetime.now(timezone.utc)
+    reports = [_report(accountant, now), _report(accountant, now, "submitted"),
+               _report(accountant, now - timedelta(days=40), "approved")]
+    db.add_all(reports)
+    db.flush()
+    analysis = ReportAnalysis(report_id=reports[0].id, country_code="UZ", created_at=now)
+    db.add_all([
+        analysis,
+        ReportAnalysis(report_id=reports[2].id, country_code="UZ", overall_score=60, created_at=now - timedelta(days=40)),
+    ])
+    db.commit()
+
+    # Score set on an expired instance, status change, and a deletion
+    analysis.overall_score = 90
+    reports[0].status = "submitted"
+    db.delete(reports[1])
+    db.commit()
+
+    incremental = _rollups(db)
+    rebuild_report_rollups(db)
+    db.commit()
+    assert _rollups(db) == incremental
+    assert incremental[(now.date(), accountant.company_id, accountant.id, "submitted")] == (1, 0, 0, 0)
+    assert incremental[(now.date(), accountant.company_id, accountant.id, "")] == (0, 1, 1, 90)
+
+
+def test_personal_analytics_from_rollups(client: TestClient, db: Session, accountant, query_budget):
+    now = datetime.now(timezone.utc)
+    for days_ago, status, score in [(0, "draft", None), (0, "rejected", 80), (1, "approved", 100), (400, "approved", 40)]:
+        report = _report(accountant, now - timedelta(days=days_ago), status)
+        db.add(report)
+        db.flush()
+        db.add(ReportAnalysis(report_id=report.id, country_code="UZ", overall_score=score,
+                              created_at=now - timedelta(days=days_ago)))
+    db.commit()
+
+    # user refresh + rollups (3) + the two action item lists; no per-report or per-month queries
+    with query_budget(6):
+        body = client.get("/api/v1/analytics/personal").json()
+    assert body["total_reports"] == 4
+    assert body["status_breakdown"]["approved"] == 2
+    assert body["avg_compliance_score"] == round((80 + 100 + 40) / 3, 1)
+    assert len(body["compliance_trends"]) == 6
+    assert body["compliance_trends"][-1]["month"] == now.strftime("%b %Y")
+    assert sum(month["count"] for month in body["compliance_trends"]) == 3
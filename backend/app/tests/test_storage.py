@@ -0,0 +1,152 @@
+import io
+import os
+import time
+import uuid
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.services.blob_store import BlobStore
+from app.services.storage import LocalStorage
+
+
+def test_local_storage_round_trip(tmp_path):
+    storage = LocalStorage(str(tmp_path / "store"))
+    source = tmp_path / "upload.part"
+    source.write_bytes(b"trial balance")
+
+    storage.put_file(str(source), "uploads/blobs/t/ab/abc.pdf")
+
+    assert not source.exists()
+    assert storage.exists("uploads/blobs/t/ab/abc.pdf")
+    assert b"".join(storage.iter_chunks("uploads/blobs/t/ab/abc.pdf", chunk_size=4)) == b"trial balance"
+    with storage.local_path("uploads/blobs/t/ab/abc.pdf") as path:
+        assert open(path, "rb").read() == b"trial balance"
+    assert storage.presigned_url("uploads/blobs/t/ab/abc.pdf") is None
+
+    storage.delete("uploads/blobs/t/ab/abc.pdf")
+    assert not storage.exists("uploads/blobs/t/ab/abc.pdf")
+
+
+def test_blob_store_writes_keys_relative_to_backend(db, tmp_path):
+    backend = LocalStorage(str(tmp_path))
+    store = BlobStore(root="uploads/blobs", backend=backend)
+    tenant_id = uuid.uuid4()
+
+    blob = store.store_fileobj(db, tenant_id, io.BytesIO(b"ledger"), ".pdf")
+
+    assert blob.storage_path.startswith(f"uploads/blobs/{tenant_id}/")
+    assert (tmp_path / blob.storage_path).read_bytes() == b"ledger"
+
+    store.release(db, tenant_id, blob.sha256)
+    db.commit()
+    assert not backend.exists(blob.storage_path)
+
+
+def _s3_storage(**kwargs):
+    boto3 = pytest.importorskip("boto3")
+    from app.services.storage import S3Storage
+
+    client = boto3.client("s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test",
+                          endpoint_url=kwargs.pop("endpoint_url", "http://minio:9000"))
+    return S3Storage(bucket="regai-uploads", client=client, **kwargs)
+
+
+def test_s3_storage_uploads_large_files_in_parts(tmp_path):
+    from boto3.s3.transfer import TransferConfig
+    from botocore.stub import ANY, Stubber
+
+    storage = _s3_storage()
+    # Sequential transfer so the stubbed responses are consumed in order
+    storage.transfer_config = TransferConfig(multipart_threshold=5 * 1024 * 1024,
+                                             multipart_chunksize=5 * 1024 * 1024, use_threads=False)
+    source = tmp_path / "ledger.pdf"
+    source.write_bytes(b"x" * (11 * 1024 * 1024))
+
+    with Stubber(storage.client) as stub:
+        stub.add_response("create_multipart_upload", {"UploadId": "u1"},
+                          {"Bucket": "regai-uploads", "Key": "uploads/ledger.pdf", "ContentType": "application/pdf"})
+        for part in (1, 2, 3):
+            stub.add_response("upload_part", {"ETag": f'"e{part}"'},
+                              {"Bucket": "regai-uploads", "Key": "uploads/ledger.pdf", "UploadId": "u1",
+                               "PartNumber": part, "Body": ANY})
+        stub.add_response("complete_multipart_upload", {},
+                          {"Bucket": "regai-uploads", "Key": "uploads/ledger.pdf", "UploadId": "u1",
+                           "MultipartUpload": {"Parts": [{"ETag": f'"e{p}"', "PartNumber": p} for p in (1, 2, 3)]}})
+        storage.put_file(str(source), "uploads/ledger.pdf", content_type="application/pdf")
+        stub.assert_no_pending_responses()
+
+
+def test_s3_storage_open_exists_delete():
+    from botocore.exceptions import ClientError
+    from botocore.response import StreamingBody
+    from botocore.stub import Stubber
+
+    storage = _s3_storage()
+    key = {"Bucket": "regai-uploads", "Key": "uploads/a.pdf"}
+    with Stubber(storage.client) as stub:
+        stub.add_response("head_object", {"ContentLength": 6}, key)
+        stub.add_client_error("head_object", service_error_code="404", http_status_code=404, expected_params=key)
+        stub.add_client_error("head_object", service_error_code="AccessDenied", http_status_code=403,
+                              expected_params=key)
+        stub.add_response("get_object", {"Body": StreamingBody(io.BytesIO(b"ledger"), 6)}, key)
+        stub.add_response("delete_object", {}, key)
+        stub.add_client_error("get_object", service_error_code="NoSuchKey", http_status_code=404,
+                              expected_params=key)
+        stub.add_client_error("get_object", service_error_code="SlowDown", http_status_code=503,
+                              expected_params=key)
+
+        assert storage.exists("uploads/a.pdf")
+        assert not storage.exists("uploads/a.pdf")
+        with pytest.raises(ClientError):
+            storage.exists("uploads/a.pdf")
+        assert b"".join(storage.iter_chunks("uploads/a.pdf", chunk_size=4)) == b"ledger"
+        storage.delete("uploads/a.pdf")
+        # Mapped to OSError, so a ZIP being streamed skips the entry
+        with pytest.raises(FileNotFoundError):
+            storage.open("uploads/a.pdf")
+        with pytest.raises(OSError):
+            storage.open("uploads/a.pdf")
+        stub.assert_no_pending_responses()
+
+
+def test_s3_storage_presigned_url_uses_public_endpoint():
+    storage = _s3_storage(public_endpoint_url="http://localhost:9000", region="us-east-1",
+                          access_key_id="test", secret_access_key="test")
+
+    url = urlparse(storage.presigned_url("uploads/a b.pdf", filename="Q3 ledger.pdf", expires_in=60))
+    query = parse_qs(url.query)
+
+    assert url.netloc == "localhost:9000"
+    assert url.path == "/regai-uploads/uploads/a%20b.pdf"
+    assert 0 < int(query["Expires"][0]) - time.time() <= 60
+    assert query["Signature"]
+    assert query["response-content-disposition"] == ["attachment; filename*=utf-8''Q3%20ledger.pdf"]
+
+
+@pytest.mark.skipif(not os.environ.get("S3_TEST_ENDPOINT_URL"),
+                    reason="set S3_TEST_ENDPOINT_URL (and S3_TEST_BUCKET) to run against MinIO/S3")
+def test_s3_storage_round_trip_against_server(tmp_path):
+    from app.services.storage import S3Storage
+
+    storage = S3Storage(
+        bucket=os.environ.get("S3_TEST_BUCKET", "regai-uploads"),
+        endpoint_url=os.environ["S3_TEST_ENDPOINT_URL"],
+        region=os.environ.get("S3_TEST_REGION", "us-east-1"),
+        access_key_id=os.environ.get("S3_TEST_ACCESS_KEY_ID", "minioadmin"),
+        secret_access_key=os.environ.get("S3_TEST_SECRET_ACCESS_KEY", "minioadmin"),
+    )
+    key = f"tests/{uuid.uuid4().hex}.bin"
+    source = tmp_path / "upload.part"
+    source.write_bytes(os.urandom(9 * 1024 * 1024))
+    expected = source.read_bytes()
+
+    storage.put_file(str(source), key)
+    try:
+        assert storage.exists(key)
+        assert b"".join(storage.iter_chunks(key)) == expected
+        with storage.local_path(key) as path:
+            assert open(path, "rb").read() == expected
+    finally:
+        storage.delete(key)
+    assert not storage.exists(key)
@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.uploads import BodySizeLimitMiddleware, UploadSink
+
+
+def _receive(sink, content, filename, max_size=1024):
+    upload = UploadFile(file=io.BytesIO(content), filename=filename)
+    return asyncio.run(sink.receive(upload, allowed_extensions={".pdf", ".csv"}, max_size=max_size))
+
+
+def test_upload_is_streamed_and_hashed(tmp_path):
+    sink = UploadSink(tmp_dir=str(tmp_path), chunk_size=8)
+    content = b"%PDF-1.4 quarterly filing"
+
+    received = _receive(sink, content, "filing.pdf")
+
+    assert received.size == len(content)
+    assert received.sha256 == hashlib.sha256(content).hexdigest()
+    assert received.path.read_bytes() == content
+    received.cleanup()
+    assert not os.listdir(tmp_path)
+
+
+def test_oversized_upload_is_rejected_while_streaming(tmp_path):
+    sink = UploadSink(tmp_dir=str(tmp_path), chunk_size=8)
+
+    with pytest.raises(HTTPException) as exc:
+        _receive(sink, b"%PDF" + b"0" * 100, "big.pdf", max_size=32)
+
+    assert exc.value.status_code == 413
+    assert not os.listdir(tmp_path)
+
+
+def test_content_must_match_extension(tmp_path):
+    sink = UploadSink(tmp_dir=str(tmp_path))
+
+    with pytest.raises(HTTPException) as exc:
+        _receive(sink, b"MZ\x90\x00 not a pdf", "invoice.pdf")
+    assert exc.value.status_code == 415
+
+    with pytest.raises(HTTPException) as exc:
+        _receive(sink, b"%PDF-1.4", "invoice.exe")
+    assert exc.value.status_code == 400
+
+
+def _limited_app():
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return app
+
+
+def test_body_limit_applies_to_declared_and_chunked_bodies(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", 1024)
+    client = TestClient(_limited_app())
+    boundary = "regai"
+    head = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.pdf\"\r\n"
+            "Content-Type: application/pdf\r\n\r\n").encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+    def chunked(size):
+        # A generator body is sent chunked, without Content-Length
+        yield head
+        for _ in range(size // 256):
+            yield b"0" * 256
+        yield tail
+
+    response = client.post("/upload", content=head + b"0" * 4096 + tail, headers=headers)
+    assert response.status_code == 413
+
+    response = client.post("/upload", content=chunked(4096), headers=headers)
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body too large"}
+
+    response = client.post("/upload", content=chunked(512), headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"size": 512}
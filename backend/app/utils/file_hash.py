@@ -0,0 +1,15 @@
+"""
+File hashing helpers used to key caches on file content
+"""
+import hashlib
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+def sha256_file(file_path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Return the hex SHA-256 digest of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
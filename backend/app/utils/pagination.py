@@ -0,0 +1,179 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered by (sort key, id) and each page starts strictly after
+the last row of the previous one, so the database seeks to it through an
+index ending in (sort key, id) instead of counting past skipped rows:
+page 1000 costs the same as page 1.
+
+The cursor for the next page is returned in the X-Next-Cursor header. It
+is an opaque token bound to the sort it was issued for. `skip` keeps
+working for clients that page by offset. Totals are only counted on
+request (X-Total-Count).
+"""
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, String, Text, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+
+CURSOR_VERSION = 1
+
+# Nullable sort keys sort NULL as these (first ascending, last descending)
+_NULL_SENTINELS = {
+    DateTime: datetime(1970, 1, 1),
+    String: "",
+    Text: "",
+}
+
+# SQLite keeps timestamps as text, with or without fractional seconds;
+# normalize both sides so they compare as times
+_SQLITE_TIMESTAMP = "%Y-%m-%d %H:%M:%f"
+
+
+@dataclass
+class Keyset:
+    """Sort column plus unique tie-breaker defining a page order"""
+    column: Any
+    id_column: Any
+    descending: bool = True
+
+    @property
+    def name(self) -> str:
+        return f"{self.column.key}:{'desc' if self.descending else 'asc'}"
+
+    @property
+    def _column(self):
+        return self.column.property.columns[0]
+
+    def _sentinel(self) -> Any:
+        # Columns filled by a default are never NULL in practice; keeping
+        # them bare lets the (…, sort key, id) indexes serve the ORDER BY
+        column = self._column
+        if not column.nullable or column.default is not None or column.server_default is not None:
+            return None
+        for type_, sentinel in _NULL_SENTINELS.items():
+            if isinstance(column.type, type_):
+                return sentinel
+        return None
+
+    def _key(self, value_or_column, dialect: str):
+        expr = value_or_column
+        sentinel = self._sentinel()
+        if sentinel is not None:
+            expr = func.coalesce(expr, literal(sentinel, self._column.type))
+        if dialect == "sqlite" and isinstance(self._column.type, DateTime):
+            expr = func.strftime(_SQLITE_TIMESTAMP, expr)
+        return expr
+
+    def sort_expression(self, dialect: str):
+        return self._key(self.column, dialect)
+
+    def value_expression(self, value: Any, dialect: str):
+        if value is None:
+            sentinel = self._sentinel()
+            value = sentinel if sentinel is not None else value
+        return self._key(literal(value, self._column.type), dialect)
+
+
+def encode_cursor(keyset: Keyset, row: Any) -> str:
+    value = getattr(row, keyset.column.key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = {"v": CURSOR_VERSION, "s": keyset.name, "k": value, "id": str(getattr(row, keyset.id_column.key))}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(keyset: Keyset, cursor: str) -> Tuple[Any, Any]:
+    """(sort value, id) of the row the cursor points after"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if payload["v"] != CURSOR_VERSION or payload["s"] != keyset.name:
+            raise ValueError("cursor was issued for a different sort order")
+        value = payload["k"]
+        if value is not None and isinstance(keyset._column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        row_id = payload["id"]
+        if keyset.id_column.property.columns[0].type.python_type is uuid.UUID:
+            row_id = uuid.UUID(row_id)
+        return value, row_id
+    except (ValueError, KeyError, TypeError, NotImplementedError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def _dialect(db) -> str:
+    return db.get_bind().dialect.name
+
+
+def _page_query(query, keyset: Keyset, cursor: Optional[str], limit: int, skip: int, dialect: str):
+    sort_key = keyset.sort_expression(dialect)
+    if cursor:
+        value, row_id = decode_cursor(keyset, cursor)
+        row = tuple_(sort_key, keyset.id_column)
+        after = tuple_(keyset.value_expression(value, dialect), literal(row_id, keyset.id_column.type))
+        query = query.where(row < after if keyset.descending else row > after)
+    elif skip:
+        query = query.offset(skip)
+
+    if keyset.descending:
+        query = query.order_by(sort_key.desc(), keyset.id_column.desc())
+    else:
+        query = query.order_by(sort_key.asc(), keyset.id_column.asc())
+    # One extra row tells whether there is a next page
+    return query.limit(limit + 1)
+
+
+def _split_page(rows: Sequence[Any], keyset: Keyset, limit: int) -> Tuple[List[Any], Optional[str]]:
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(keyset, rows[-1])
+
+
+def keyset_page(
+    db: Session,
+    query: Query,
+    keyset: Keyset,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """One page of an ORM query and the cursor of the page after it (None on the last page)"""
+    rows = _page_query(query, keyset, cursor, limit, skip, _dialect(db)).all()
+    return _split_page(rows, keyset, limit)
+
+
+async def keyset_page_async(
+    db: AsyncSession,
+    statement,
+    keyset: Keyset,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """keyset_page for a select() on an AsyncSession"""
+    rows = await db.scalars(_page_query(statement, keyset, cursor, limit, skip, _dialect(db)))
+    return _split_page(rows.all(), keyset, limit)
+
+
+def count_query(query: Query) -> int:
+    return query.order_by(None).count()
+
+
+async def count_statement(db: AsyncSession, statement) -> int:
+    return await db.scalar(select(func.count()).select_from(statement.order_by(None).subquery()))
+
+
+def set_page_headers(response: Response, next_cursor: Optional[str], total: Optional[int] = None) -> None:
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
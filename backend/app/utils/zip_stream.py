@@ -0,0 +1,109 @@
+"""
+Stream ZIP archives without a temp file or an in-memory archive
+"""
+import os
+import zipfile
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional
+
+ZIP_CHUNK_SIZE = 64 * 1024
+
+# Formats that are already compressed gain nothing from deflate
+STORED_EXTENSIONS = {".pdf", ".xlsx", ".xls", ".docx", ".zip", ".png", ".jpg", ".jpeg"}
+
+
+@dataclass
+class ZipEntry:
+    path: str
+    arcname: str
+    modified: Optional[datetime] = None
+    size: Optional[int] = None
+
+
+class _ChunkBuffer:
+    """Write-only, non-seekable sink; zipfile falls back to data descriptors"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def compression_for(filename: str) -> int:
+    ext = os.path.splitext(filename)[1].lower()
+    return zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def unique_arcname(name: str, used: set) -> str:
+    """Return name, or "name (2).ext" etc. when it is already in the archive"""
+    candidate = name
+    stem, ext = os.path.splitext(name)
+    counter = 2
+    while candidate in used:
+        candidate = f"{stem} ({counter}){ext}"
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+def _open_local(path: str) -> BinaryIO:
+    return open(path, "rb")
+
+
+def stream_zip(
+    entries: Iterable[ZipEntry],
+    chunk_size: int = ZIP_CHUNK_SIZE,
+    open_file: Callable[[str], BinaryIO] = _open_local,
+) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of the given files chunk by chunk. Memory stays at
+    roughly one chunk plus the central directory, regardless of file sizes.
+    open_file reads an entry's path (e.g. storage.open for object storage)
+    and raises OSError for files it cannot open. Entries whose file cannot
+    be opened, or whose first chunk cannot be read, are skipped.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode="w") as archive:
+        for entry in entries:
+            try:
+                source = open_file(entry.path)
+            except OSError:
+                continue
+            with closing(source):
+                # Read ahead of the entry header, so a failure here leaves no partial entry
+                try:
+                    chunk = source.read(chunk_size)
+                except OSError:
+                    continue
+                modified = entry.modified or datetime.now()
+                info = zipfile.ZipInfo(entry.arcname, date_time=modified.timetuple()[:6])
+                info.compress_type = compression_for(entry.arcname)
+                # Known size lets zipfile pick zip64 only when needed
+                if entry.size is not None:
+                    info.file_size = entry.size
+                with archive.open(info, mode="w", force_zip64=entry.size is None) as dest:
+                    while chunk:
+                        dest.write(chunk)
+                        data = buffer.drain()
+                        if data:
+                            yield data
+                        chunk = source.read(chunk_size)
+            data = buffer.drain()
+            if data:
+                yield data
+    # Central directory
+    data = buffer.drain()
+    if data:
+        yield data
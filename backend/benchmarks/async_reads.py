@@ -0,0 +1,79 @@
+"""
+Concurrency benchmark for the read endpoints.
+
+Fires N concurrent clients at a running API and reports throughput and
+latency percentiles per endpoint. Run it against a local Postgres-backed
+server with a single worker so sync (threadpool) and async routes are
+compared on equal footing:
+
+    uvicorn app.main:app --workers 1 --port 8000
+    python benchmarks/async_reads.py --token "$TOKEN" --concurrency 50 --requests 2000
+
+Compare the numbers with the same run against a checkout where the
+routes still use the sync session; the async routes should hold
+throughput as concurrency rises past the threadpool size (40).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+ENDPOINTS = [
+    "/api/v1/reports/",
+    "/api/v1/regulations/list",
+    "/api/v1/regulations/jurisdictions",
+    "/api/v1/compliance/alerts",
+    "/api/v1/compliance/stats",
+]
+
+
+async def run_endpoint(client: httpx.AsyncClient, path: str, concurrency: int, total: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "path": path,
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def main(args) -> None:
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, limits=limits, timeout=60) as client:
+        print(f"{'endpoint':40} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+        for path in args.endpoints or ENDPOINTS:
+            result = await run_endpoint(client, path, args.concurrency, args.requests)
+            print(f"{result['path']:40} {result['rps']:9.1f} {result['p50']:9.1f} {result['p95']:9.1f} {result['errors']:7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", help="Bearer token of a user with data to read")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+    parser.add_argument("endpoints", nargs="*", help="Paths to hit (default: the ported read endpoints)")
+    asyncio.run(main(parser.parse_args()))
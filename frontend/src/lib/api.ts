@@ -30,4 +30,16 @@ api.interceptors.response.use(
     }
 );
 
+// Loads every page of a keyset-paged list endpoint by following X-Next-Cursor
+export async function fetchAllPages<T = any>(path: string, params: Record<string, string> = {}): Promise<T[]> {
+    const items: T[] = [];
+    let cursor: string | undefined;
+    do {
+        const res = await api.get(path, { params: { ...params, ...(cursor && { cursor }) } });
+        items.push(...res.data);
+        cursor = res.headers['x-next-cursor'];
+    } while (cursor);
+    return items;
+}
+
 export default api;
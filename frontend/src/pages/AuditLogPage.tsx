@@ -10,6 +10,8 @@ export default function AuditLogPage() {
     const [loading, setLoading] = useState(true);
     const [total, setTotal] = useState(0);
     const [page, setPage] = useState(0);
+    // cursors[n] opens page n; the total is only counted for the first page
+    const [cursors, setCursors] = useState<(string | null)[]>([null]);
     const [stats, setStats] = useState<any>(null);
     const [filters, setFilters] = useState({
         action: '',
@@ -22,8 +24,9 @@ export default function AuditLogPage() {
         try {
             setLoading(true);
             const params = new URLSearchParams({
-                skip: String(page * 50),
                 limit: '50',
+                include_total: String(page === 0),
+                ...(page > 0 && cursors[page] && { cursor: cursors[page] as string }),
                 ...(filters.action && { action: filters.action }),
                 ...(filters.user_id && { user_id: filters.user_id }),
                 ...(filters.start_date && { start_date: filters.start_date }),
@@ -32,7 +35,10 @@ export default function AuditLogPage() {
 
             const response = await api.get(`/audit-logs?${params}`);
             setLogs(response.data.logs || []);
-            setTotal(response.data.total || 0);
+            if (page === 0) {
+                setTotal(response.data.total || 0);
+            }
+            setCursors(prev => [...prev.slice(0, page + 1), response.data.next_cursor || null]);
 
             // Fetch stats
             const statsResponse = await api.get('/audit-logs/stats');
@@ -323,7 +329,7 @@ export default function AuditLogPage() {
                                 variant="outline"
                                 size="sm"
                                 onClick={() => setPage(p => p + 1)}
-                                disabled={(page + 1) * 50 >= total}
+                                disabled={!cursors[page + 1]}
                             >
                                 Next
                             </Button>
@@ -16,6 +16,14 @@ export default function DocumentsPage() {
         fetchDocuments();
     }, []);
 
+    // Extraction runs in the background; refresh while any document is still in flight
+    useEffect(() => {
+        const inFlight = documents.some((doc) => doc.status === 'pending' || doc.status === 'processing');
+        if (!inFlight) return;
+        const timer = setTimeout(fetchDocuments, 3000);
+        return () => clearTimeout(timer);
+    }, [documents]);
+
     const fetchDocuments = async () => {
         try {
             const res = await api.get('/documents');
@@ -41,7 +49,7 @@ export default function DocumentsPage() {
 
             toast({
                 title: 'Success',
-                description: `${file.name} uploaded and processed successfully!`
+                description: `${file.name} uploaded and queued for processing.`
             });
 
             fetchDocuments();
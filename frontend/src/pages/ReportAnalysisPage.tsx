@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useLocation } from 'react-router-dom';
-import api from '../lib/api';
+import api, { fetchAllPages } from '../lib/api';
 import { Button } from '@/components/ui/button';
 import { useToast } from '@/components/ui/use-toast';
 import { CheckCircle, XCircle, AlertTriangle, Loader2 } from 'lucide-react';
@@ -49,8 +49,8 @@ export default function ReportAnalysisPage() {
 
     const fetchReports = async () => {
         try {
-            const res = await api.get('/reports/');
-            setReports(res.data.filter((r: any) => r.file_path && r.status !== 'draft'));
+            const reports = await fetchAllPages('/reports/');
+            setReports(reports.filter((r: any) => r.file_path && r.status !== 'draft'));
         } catch (error) {
             console.error('Failed to fetch reports', error);
         }
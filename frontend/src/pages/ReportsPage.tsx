@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useLocation, useNavigate } from 'react-router-dom';
-import api from '../lib/api';
+import api, { fetchAllPages } from '../lib/api';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { useAuth } from '../context/AuthContext';
@@ -59,9 +59,9 @@ export default function ReportsPage() {
 
     const fetchReports = async () => {
         try {
-            const res = await api.get('/reports/');
-            setAllReports(res.data);
-            setReports(res.data);
+            const reports = await fetchAllPages('/reports/');
+            setAllReports(reports);
+            setReports(reports);
         } catch (error) {
             console.error('Failed to fetch reports', error);
         }
@@ -187,13 +187,18 @@ export default function ReportsPage() {
 
     const handleDownload = async (reportId: string) => {
         try {
-            const response = await api.get(`/reports/${reportId}/download`, {
-                responseType: 'blob'
-            });
-            const url = window.URL.createObjectURL(new Blob([response.data]));
+            // With object storage the file comes straight from a presigned URL
+            const direct = await api.get(`/reports/${reportId}/download-url`);
             const link = document.createElement('a');
-            link.href = url;
-            link.setAttribute('download', 'report');
+            if (direct.data.url) {
+                link.href = direct.data.url;
+            } else {
+                const response = await api.get(`/reports/${reportId}/download`, {
+                    responseType: 'blob'
+                });
+                link.href = window.URL.createObjectURL(new Blob([response.data]));
+            }
+            link.setAttribute('download', direct.data.file_name || 'report');
             document.body.appendChild(link);
             link.click();
             link.remove();
@@ -247,17 +252,22 @@ export default function ReportsPage() {
         if (selectedReports.length === 0) return;
 
         try {
-            const res = await api.post('/reports/batch/download', selectedReports);
+            // One request: the server streams a ZIP of every report we may download
+            const res = await api.post('/reports/batch/archive', selectedReports, {
+                responseType: 'blob',
+            });
+            const url = window.URL.createObjectURL(new Blob([res.data]));
+            const link = document.createElement('a');
+            link.href = url;
+            link.setAttribute('download', 'reports.zip');
+            document.body.appendChild(link);
+            link.click();
+            link.remove();
+            window.URL.revokeObjectURL(url);
             toast({
                 title: "Success",
-                description: `Prepared ${res.data.count} report(s) for download`,
+                description: `Downloaded ${selectedReports.length} report(s)`,
             });
-
-            // Download each
-            for (const report of res.data.reports) {
-                window.open(`http://localhost:8000${report.download_url}`, '_blank');
-                await new Promise(resolve => setTimeout(resolve, 300));
-            }
             setSelectedReports([]);
         } catch (error: any) {
             toast({